@@ -6,7 +6,11 @@ Notar OpenAI API til að búa til íslenskar lýsingar
 
 import json
 import os
-from typing import Dict, List
+import sys
+from typing import Dict, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "etl"))
+from search_index import SearchIndex
 
 # Forgangsröðun - Helstu ferðamannastaðir sem þurfa lýsingar
 PRIORITY_PLACES = {
@@ -144,13 +148,9 @@ def load_places_master():
         return json.load(f)
 
 
-def find_place_by_name(places: List[Dict], name: str) -> Dict:
-    """Find a place by name (case insensitive, partial match)"""
-    name_lower = name.lower()
-    for place in places:
-        if name_lower in place['name'].lower() or place['name'].lower() in name_lower:
-            return place
-    return None
+def find_place_by_name(index: SearchIndex, name: str) -> Optional[Dict]:
+    """Find a place by name (Icelandic-folded exact, partial or typo match)"""
+    return index.find_name(name)
 
 
 def add_descriptions_to_places():
@@ -160,6 +160,7 @@ def add_descriptions_to_places():
     places = data['places']
     
     print(f'📍 Heildarstaðir: {len(places)}')
+    index = SearchIndex.build(places)
     
     updated_count = 0
     not_found = []
@@ -167,7 +168,7 @@ def add_descriptions_to_places():
     print('\n✏️ Bæti við lýsingum...\n')
     
     for place_name, description in DESCRIPTIONS_IS.items():
-        place = find_place_by_name(places, place_name)
+        place = find_place_by_name(index, place_name)
         if place:
             place['description'] = description
             place['description_is'] = description  # Icelandic version
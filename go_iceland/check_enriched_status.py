@@ -3,28 +3,38 @@
 
 import json
 import os
+import sys
 
-enriched_file = 'data/iceland_places_enriched.json'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "etl"))
+from facets import FacetIndex
+from poi_store import read_store
 
-if not os.path.exists(enriched_file):
+enriched_file = 'data/iceland_places_enriched.json'
+enriched_store = 'data/iceland_places_enriched.parquet'
+
+if os.path.exists(enriched_store):
+    # Columnar copy (etl/poi_store.py): only read the columns this report needs
+    data = read_store(enriched_store, columns=['name', 'category', 'images', 'content', 'description'])
+elif os.path.exists(enriched_file):
+    with open(enriched_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+else:
     print(f"❌ File not found: {enriched_file}")
     exit(1)
 
-with open(enriched_file, 'r', encoding='utf-8') as f:
-    data = json.load(f)
-
 print(f"\n📊 ENRICHED PLACES STATUS:")
 print(f"  Total places: {len(data)}")
 
 # Count enriched places
-with_images = sum(1 for p in data if p.get('images') and len(p.get('images', [])) > 0)
-with_desc = sum(1 for p in data if p.get('content') or p.get('description'))
+index = FacetIndex.build(data)
+with_images = index.count(has_images=True)
+with_desc = index.count(has_description=True)
 
 print(f"  With images: {with_images}/{len(data)} ({with_images*100//len(data)}%)")
 print(f"  With description: {with_desc}/{len(data)} ({with_desc*100//len(data)}%)")
 
 # Show sample with images
-samples_with_images = [p for p in data if p.get('images') and len(p.get('images', [])) > 0]
+samples_with_images = index.find(has_images=True)
 if samples_with_images:
     sample = samples_with_images[0]
     print(f"\n📍 Sample enriched place: {sample.get('name', 'Unknown')}")
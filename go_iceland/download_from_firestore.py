@@ -1,6 +1,7 @@
 """
 Download all data from Firestore to local JSON files
 """
+import argparse
 import json
 import os
 import sys
@@ -11,17 +12,28 @@ import requests
 PROJECT_ID = "go-iceland"
 BASE_URL = f"https://firestore.googleapis.com/v1/projects/{PROJECT_ID}/databases/(default)/documents"
 
-def download_collection(collection_name):
-    """Download entire collection from Firestore"""
+def download_collection(collection_name, fields=None):
+    """
+    Download entire collection from Firestore
+
+    Args:
+        collection_name: Collection to download
+        fields: Optional list of field paths (e.g. ["name", "content.en.description"]).
+                Sent as mask.fieldPaths so the server only returns those fields,
+                and used as the decoder projection.
+    """
     print(f"\n📥 Downloading {collection_name}...")
     
     url = f"{BASE_URL}/{collection_name}"
+    projection = build_projection(fields) if fields else None
     
     all_docs = []
     page_token = None
     
     while True:
         params = {"pageSize": 300}
+        if fields:
+            params["mask.fieldPaths"] = list(fields)
         if page_token:
             params["pageToken"] = page_token
         
@@ -38,7 +50,7 @@ def download_collection(collection_name):
         print(f"  Downloaded {len(documents)} documents...")
         
         for doc in documents:
-            all_docs.append(parse_firestore_doc(doc))
+            all_docs.append(parse_firestore_doc(doc, projection))
         
         page_token = data.get("nextPageToken")
         if not page_token:
@@ -47,13 +59,30 @@ def download_collection(collection_name):
     print(f"✅ Total: {len(all_docs)} documents")
     return all_docs
 
-def parse_firestore_doc(doc):
+def build_projection(fields):
+    """
+    Turn dotted field paths into a nested projection tree.
+    None means "keep everything below this key".
+
+    ["name", "content.en.description"] → {"name": None, "content": {"en": {"description": None}}}
+    """
+    projection = {}
+    for path in fields:
+        node = projection
+        parts = path.split(".")
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:
+                # A shorter path already selects the whole subtree
+                break
+            node = node.setdefault(part, child)
+        else:
+            node[parts[-1]] = None
+    return projection
+
+def parse_firestore_doc(doc, projection=None):
     """Parse Firestore document to normal Python dict"""
-    fields = doc.get("fields", {})
-    result = {}
-    
-    for key, value in fields.items():
-        result[key] = parse_firestore_value(value)
+    result = parse_firestore_value({"mapValue": doc}, projection) or {}
     
     # Add document ID
     doc_path = doc.get("name", "")
@@ -62,42 +91,83 @@ def parse_firestore_doc(doc):
     
     return result
 
-def parse_firestore_value(value):
-    """Parse Firestore value to Python value"""
-    if "stringValue" in value:
-        return value["stringValue"]
-    elif "integerValue" in value:
-        return int(value["integerValue"])
-    elif "doubleValue" in value:
-        return float(value["doubleValue"])
-    elif "booleanValue" in value:
-        return value["booleanValue"]
-    elif "arrayValue" in value:
-        values = value["arrayValue"].get("values", [])
-        return [parse_firestore_value(v) for v in values]
-    elif "mapValue" in value:
-        fields = value["mapValue"].get("fields", {})
-        return {k: parse_firestore_value(v) for k, v in fields.items()}
-    elif "nullValue" in value:
-        return None
-    elif "timestampValue" in value:
-        return value["timestampValue"]
-    else:
-        return None
+# Scalar Firestore REST value types → decoder
+# bytesValue stays base64 and referenceValue stays a document path so output is JSON-safe
+SCALAR_DECODERS = {
+    "nullValue": lambda raw: None,
+    "booleanValue": bool,
+    "integerValue": int,
+    "doubleValue": float,
+    "timestampValue": str,
+    "stringValue": str,
+    "bytesValue": str,
+    "referenceValue": str,
+    "geoPointValue": lambda raw: {"lat": raw.get("latitude", 0.0), "lng": raw.get("longitude", 0.0)},
+}
+
+def parse_firestore_value(value, projection=None):
+    """
+    Parse Firestore value to Python value
+
+    Iterative (no recursion limit on deep maps) and dispatches on SCALAR_DECODERS.
+    Map keys outside the projection are skipped without being decoded.
+    """
+    root = [None]
+    stack = [(root, 0, value, projection)]
+    
+    while stack:
+        target, key, value, proj = stack.pop()
+        if not value:
+            target[key] = None
+            continue
+        
+        # A Firestore value has exactly one type key
+        type_key, raw = next(iter(value.items()))
+        
+        if type_key == "mapValue":
+            out = {}
+            target[key] = out
+            items = raw.get("fields", {}).items()
+            if proj is not None:
+                items = [(k, v) for k, v in items if k in proj]
+            # Pushed in reverse so keys are inserted in their original order
+            for k, v in reversed(list(items)):
+                stack.append((out, k, v, proj[k] if proj is not None else None))
+        elif type_key == "arrayValue":
+            values = raw.get("values", [])
+            out = [None] * len(values)
+            target[key] = out
+            for i in range(len(values) - 1, -1, -1):
+                stack.append((out, i, values[i], proj))
+        else:
+            decoder = SCALAR_DECODERS.get(type_key)
+            target[key] = decoder(raw) if decoder else None
+    
+    return root[0]
 
 def main():
+    parser = argparse.ArgumentParser(description="Download Firestore collections to JSON")
+    parser.add_argument("--fields", nargs="+", help="Only download these field paths (e.g. name images content.en.description)")
+    args = parser.parse_args()
+    
+    # Partial downloads must not overwrite the full master files
+    places_file = "data/iceland_places_fields.json" if args.fields else "data/iceland_places_master.json"
+    trails_file = "data/iceland_trails_fields.json" if args.fields else "data/iceland_trails.json"
+    
     print("="*80)
     print("🔄 DOWNLOADING ALL DATA FROM FIRESTORE")
+    if args.fields:
+        print(f"   Fields: {', '.join(args.fields)}")
     print("="*80)
     
     # Download places
-    places = download_collection("places")
+    places = download_collection("places", args.fields)
     if places:
         # Save to data directory
         os.makedirs("data", exist_ok=True)
-        with open("data/iceland_places_master.json", "w", encoding="utf-8") as f:
+        with open(places_file, "w", encoding="utf-8") as f:
             json.dump(places, f, indent=2, ensure_ascii=False)
-        print(f"\n💾 Saved {len(places)} places to data/iceland_places_master.json")
+        print(f"\n💾 Saved {len(places)} places to {places_file}")
         
         # Check what we got
         with_images = sum(1 for p in places if p.get("images") and len(p.get("images", [])) > 0)
@@ -109,11 +179,11 @@ def main():
         print(f"  With content: {with_content}")
     
     # Download trails
-    trails = download_collection("trails")
+    trails = download_collection("trails", args.fields)
     if trails:
-        with open("data/iceland_trails.json", "w", encoding="utf-8") as f:
+        with open(trails_file, "w", encoding="utf-8") as f:
             json.dump(trails, f, indent=2, ensure_ascii=False)
-        print(f"\n💾 Saved {len(trails)} trails to data/iceland_trails.json")
+        print(f"\n💾 Saved {len(trails)} trails to {trails_file}")
         
         # Check trails
         with_images = sum(1 for t in trails if t.get("images") and len(t.get("images", [])) > 0)
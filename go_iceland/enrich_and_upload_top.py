@@ -5,11 +5,16 @@ Handpicked listi af helstu ferðamannastöðum
 """
 
 import json
+import os
+import sys
 import time
 import requests
 from pathlib import Path
 from typing import Dict, Optional
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "etl"))
+from names import NameMatcher, wiki_title
+
 # Bestu staðirnir á Íslandi (handpicked)
 TOP_PLACES = [
     "Gullfoss", "Geysir", "Þingvellir", "Skógafoss", "Seljalandsfoss",
@@ -32,27 +37,14 @@ def load_places():
     with open('data/iceland_clean.json', 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def find_place(places, search_name):
-    """Finnur stað eftir nafni"""
-    search_lower = search_name.lower()
-    
-    # Exact match first
-    for p in places:
-        if p.get('name', '').lower() == search_lower:
-            return p
-    
-    # Partial match
-    for p in places:
-        name = p.get('name', '').lower()
-        if search_lower in name or name in search_lower:
-            return p
-    
-    return None
+def find_place(places_by_name: NameMatcher, search_name):
+    """Finnur stað eftir nafni (exact match first, then partial)"""
+    return places_by_name.match(search_name)
 
 def get_wikipedia_info(place_name):
     """Sækir Wikipedia upplýsingar"""
     try:
-        url = f"https://is.wikipedia.org/api/rest_v1/page/summary/{place_name.replace(' ', '_')}"
+        url = f"https://is.wikipedia.org/api/rest_v1/page/summary/{wiki_title(place_name)}"
         response = requests.get(url, timeout=5, headers={'User-Agent': 'GoIceland/1.0'})
         
         if response.status_code == 200:
@@ -65,7 +57,7 @@ def get_wikipedia_info(place_name):
             }
         elif response.status_code == 404:
             # Try English
-            url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{place_name.replace(' ', '_')}"
+            url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{wiki_title(place_name)}"
             response = requests.get(url, timeout=5, headers={'User-Agent': 'GoIceland/1.0'})
             if response.status_code == 200:
                 data = response.json()
@@ -118,6 +110,7 @@ def main():
     print('=' * 60)
     
     places = load_places()
+    places_by_name = NameMatcher(((p.get('name', ''), p) for p in places), partial=True)
     enriched_places = {}
     
     found = 0
@@ -126,7 +119,7 @@ def main():
     for place_name in TOP_PLACES:
         print(f'\n🔍 Searching: {place_name}')
         
-        place = find_place(places, place_name)
+        place = find_place(places_by_name, place_name)
         
         if place:
             found += 1
@@ -5,16 +5,21 @@ Enrichar alla staði með Wikipedia descriptions, images og history
 """
 
 import json
+import os
+import sys
 import time
 import requests
 from pathlib import Path
 from typing import Dict, Optional, List
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "etl"))
+from names import wiki_title
+
 def get_wikipedia_info(place_name: str, category: str = None) -> Dict:
     """Sækir Wikipedia upplýsingar"""
     try:
         # Clean name for Wikipedia
-        wiki_name = place_name.replace(' ', '_')
+        wiki_name = wiki_title(place_name)
         
         # Try Icelandic first
         url = f"https://is.wikipedia.org/api/rest_v1/page/summary/{wiki_name}"
@@ -5,11 +5,16 @@ Myndir, opening hours, phone, website, reviews
 """
 
 import json
+import os
+import sys
 import time
 import requests
 from pathlib import Path
 from typing import Dict, List
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "etl"))
+from names import NameMatcher, wiki_title
+
 def get_osm_details(lat: float, lng: float, name: str) -> Dict:
     """Sækir OSM details fyrir veitingastað"""
     try:
@@ -30,11 +35,12 @@ def get_osm_details(lat: float, lng: float, name: str) -> Dict:
             data = response.json()
             
             # Find closest match by name
+            wanted = NameMatcher([name], partial=True)
             for element in data.get('elements', []):
                 tags = element.get('tags', {})
                 osm_name = tags.get('name', '')
                 
-                if name.lower() in osm_name.lower() or osm_name.lower() in name.lower():
+                if wanted.match(osm_name):
                     return {
                         'phone': tags.get('phone', tags.get('contact:phone')),
                         'website': tags.get('website', tags.get('contact:website')),
@@ -56,7 +62,7 @@ def get_wikipedia_image(place_name: str) -> Dict:
     """Sækir mynd frá Wikipedia"""
     try:
         # Try Icelandic
-        url = f"https://is.wikipedia.org/api/rest_v1/page/summary/{place_name.replace(' ', '_')}"
+        url = f"https://is.wikipedia.org/api/rest_v1/page/summary/{wiki_title(place_name)}"
         response = requests.get(url, timeout=5, headers={'User-Agent': 'GoIceland/1.0'})
         
         if response.status_code == 200:
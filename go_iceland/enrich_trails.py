@@ -5,11 +5,16 @@ Bætir við lýsingum, myndum og öllum upplýsingum um hiking trails
 """
 
 import json
+import os
+import sys
 import time
 import requests
 from pathlib import Path
 from typing import Dict, List
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "etl"))
+from names import NameMatcher
+
 # Famous Icelandic hiking trails
 FAMOUS_TRAILS = {
     'Laugavegur': 'Laugavegur er eitt vinsælasta gönguleiðin á Íslandi, 55 km leið frá Landmannalaugum til Þórsmerkur í gegnum náttúrulega og fjölbreytta náttúru með litríkum fjöllum, laugum og jöklum.',
@@ -24,16 +29,13 @@ FAMOUS_TRAILS = {
     'Dettifoss': 'Gönguleiðir að Dettifossi, öflugasta fossi Evrópu.',
 }
 
+FAMOUS_TRAIL_MATCHER = NameMatcher(FAMOUS_TRAILS)
+
 def get_trail_description(trail_name: str) -> str:
     """Sækir eða býr til lýsingu á gönguleið"""
     
     # Check if it's a famous trail
-    for famous_name, desc in FAMOUS_TRAILS.items():
-        if famous_name.lower() in trail_name.lower():
-            return desc
-    
-    # Generic descriptions based on difficulty
-    return ''
+    return FAMOUS_TRAIL_MATCHER.match(trail_name) or ''
 
 def enrich_trail(trail: Dict) -> Dict:
     """Enrichar gönguleið"""
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - parallel_map benchmark
+Times the CPU-bound per-record stages at different worker counts
+
+The raw POIs are repeated until the dataset has --records entries, so the
+scaling can be checked at full-Nordic sizes without fetching anything.
+
+Usage:
+    python etl/bench_parallel.py
+    python etl/bench_parallel.py --records 500000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import time
+from itertools import cycle, islice
+
+from enrich_pois import clean_poi
+from json_io import read_json
+from parallel import parallel_map
+from utils_geohash import add_geohash_levels
+
+RAW = "./data/iceland_raw.json"
+
+
+def clean_and_geohash(poi):
+    return add_geohash_levels(clean_poi(poi))
+
+
+def run(records, workers, chunk_size):
+    start = time.perf_counter()
+    count = sum(1 for _ in parallel_map(clean_and_geohash, records, workers, chunk_size))
+    return count, time.perf_counter() - start
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cpus})
+
+    parser = argparse.ArgumentParser(description="Benchmark parallel_map worker scaling")
+    parser.add_argument("--input", default=RAW, help="Raw POI file to sample from")
+    parser.add_argument("--records", type=int, default=100000, help="Dataset size")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers, help="Worker counts to try")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Records per task")
+    args = parser.parse_args()
+
+    raw = read_json(args.input)
+    records = list(islice(cycle(raw), args.records))
+
+    print(f"⏱️  clean_poi + add_geohash_levels over {len(records)} records ({cpus} CPUs)")
+    print(f"{'workers':>8s} {'seconds':>9s} {'records/s':>11s} {'speedup':>8s}")
+
+    baseline = None
+    for workers in args.workers:
+        count, seconds = run(records, workers, args.chunk_size)
+        baseline = baseline or seconds
+        print(f"{workers:8d} {seconds:9.2f} {count / seconds:11.0f} {baseline / seconds:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
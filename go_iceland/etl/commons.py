@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Commons Client
+Batched, disk-cached Wikimedia Commons lookups
+
+Three lookups, each answered with imageinfo (URL, thumbnail, size) in the
+same request:
+
+    resolve(titles)        File: titles, MAX_TITLES (50) per request
+    search(name)           generator=search on "<name> Iceland"
+    geosearch(lat, lng)    generator=geosearch, files within a radius
+
+Answers are cached in data/.commons_cache.json, keyed by title, query and
+rounded coordinate, so a re-run of the image stage makes no requests for
+POIs it has already seen. Only requests that hit the network are
+rate-limited.
+
+Usage:
+    client = CommonsClient()
+    client.resolve(["File:Gullfoss.jpg", "File:Dettifoss.jpg"])   # {title: info or None}
+    client.geosearch(64.3271, -20.1199, radius=500)               # [info, ...]
+    client.save()
+"""
+import os
+import sys
+import time
+from urllib.parse import unquote, urlsplit
+
+import requests
+
+from json_io import read_json, write_json
+
+API_URL = "https://commons.wikimedia.org/w/api.php"
+CACHE_FILE = "./data/.commons_cache.json"
+USER_AGENT = "GoIceland/1.0 (https://github.com/savargeir-byte/GoIceland)"
+
+MAX_TITLES = 50
+THUMB_WIDTH = 800
+REQUEST_DELAY = 0.2
+GEO_RADIUS = 500          # metres (API max 10000)
+GEO_PRECISION = 4         # decimal places in the geosearch cache key (~10 m)
+
+
+def commons_titles(value):
+    """
+    File: titles in an OSM wikimedia_commons value, a Commons URL or an
+    images[] entry ("File:A.jpg;File:B.jpg", ".../wiki/File:A.jpg").
+    Category: values are not images and are ignored.
+    """
+    if not isinstance(value, str):
+        return []
+    titles = []
+    for part in value.split(";"):
+        part = part.strip()
+        if part.startswith(("http://", "https://")):
+            parts = urlsplit(part)
+            if "commons.wikimedia.org" not in parts.netloc or "/wiki/" not in parts.path:
+                continue
+            part = unquote(parts.path.split("/wiki/", 1)[1])
+        prefix, _, name = part.partition(":")
+        if prefix.lower() in ("file", "image") and name.strip():
+            name = name.strip().replace("_", " ")
+            titles.append(f"File:{name[:1].upper()}{name[1:]}")
+    return titles
+
+
+def _info(page):
+    """imageinfo for one API page, or None"""
+    if "missing" in page or "invalid" in page or not page.get("imageinfo"):
+        return None
+    ii = page["imageinfo"][0]
+    if not ii.get("url"):
+        return None
+    return {
+        "title": page.get("title"),
+        "url": ii["url"],
+        "thumb": ii.get("thumburl"),
+        "width": ii.get("width"),
+        "height": ii.get("height"),
+        "mime": ii.get("mime"),
+    }
+
+
+class CommonsClient:
+    """Commons API client with an on-disk answer cache"""
+
+    def __init__(self, session=None, cache_path=CACHE_FILE, thumb_width=THUMB_WIDTH, delay=REQUEST_DELAY):
+        self.session = session or requests.Session()
+        self.session.headers.setdefault("User-Agent", USER_AGENT)
+        self.cache_path = cache_path
+        self.thumb_width = thumb_width
+        self.delay = delay
+        self.requests = 0
+        self.cache = {"titles": {}, "search": {}, "geo": {}}
+        if cache_path and os.path.exists(cache_path):
+            self.cache.update(read_json(cache_path))
+
+    def save(self):
+        if self.cache_path:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            write_json(self.cache_path, self.cache)
+
+    def _query(self, **params):
+        """One API call with imageinfo on the result pages; returns (pages, query)"""
+        params.update({
+            "action": "query",
+            "format": "json",
+            "formatversion": 2,
+            "prop": "imageinfo",
+            "iiprop": "url|size|mime",
+            "iiurlwidth": self.thumb_width,
+            "maxlag": 5,
+        })
+        if self.requests and self.delay:
+            time.sleep(self.delay)
+        self.requests += 1
+        response = self.session.get(API_URL, params=params, timeout=30)
+        response.raise_for_status()
+        body = response.json()
+        # maxlag, rate limits and bad parameters come back as HTTP 200 with an error body
+        if "error" in body:
+            error = body["error"]
+            raise RuntimeError(f"{error.get('code')}: {error.get('info')}")
+        query = body.get("query", {})
+        return query.get("pages", []), query
+
+    def resolve(self, titles):
+        """
+        {title: info or None} for File: titles, MAX_TITLES per request.
+        Missing files map to None. Titles that could not be looked up
+        (request failed, no page in the answer) also map to None but are
+        not cached, so they are tried again next time.
+        """
+        cached = self.cache["titles"]
+        todo = [t for t in dict.fromkeys(titles) if t not in cached]
+        for start in range(0, len(todo), MAX_TITLES):
+            batch = todo[start:start + MAX_TITLES]
+            try:
+                pages, query = self._query(titles="|".join(batch), redirects=1)
+            except Exception as e:
+                print(f"⚠️  Commons imageinfo error ({len(batch)} titles): {e}", file=sys.stderr)
+                continue
+            by_title = {page.get("title"): _info(page) for page in pages}
+            # Requested title -> normalized -> redirect target
+            aliases = {}
+            for step in query.get("normalized", []) + query.get("redirects", []):
+                aliases[step["from"]] = step["to"]
+            for title in batch:
+                target = title
+                for _ in range(3):
+                    if target not in aliases:
+                        break
+                    target = aliases[target]
+                if target in by_title:
+                    cached[title] = by_title[target]
+        return {title: cached.get(title) for title in titles}
+
+    def search(self, name, limit=3):
+        """Files matching "<name> Iceland" (Commons full-text search)"""
+        key = f"{name.strip().lower()}|{limit}"
+        if key not in self.cache["search"]:
+            try:
+                pages, _ = self._query(generator="search", gsrsearch=f"{name} Iceland",
+                                       gsrnamespace=6, gsrlimit=limit)
+            except Exception as e:
+                print(f"⚠️  Commons search error for '{name}': {e}", file=sys.stderr)
+                return []
+            pages = sorted(pages, key=lambda p: p.get("index", 0))
+            self.cache["search"][key] = [info for info in map(_info, pages) if info]
+        return self.cache["search"][key]
+
+    def geosearch(self, lat, lng, radius=GEO_RADIUS, limit=3):
+        """Geotagged files within radius metres of (lat, lng), nearest first"""
+        key = f"{round(lat, GEO_PRECISION)},{round(lng, GEO_PRECISION)}|{radius}|{limit}"
+        if key not in self.cache["geo"]:
+            try:
+                pages, _ = self._query(generator="geosearch", ggscoord=f"{lat}|{lng}",
+                                       ggsradius=min(radius, 10000), ggsnamespace=6, ggslimit=limit)
+            except Exception as e:
+                print(f"⚠️  Commons geosearch error at {lat},{lng}: {e}", file=sys.stderr)
+                return []
+            pages = sorted(pages, key=lambda p: p.get("index", 0))
+            self.cache["geo"][key] = [info for info in map(_info, pages) if info]
+        return self.cache["geo"][key]
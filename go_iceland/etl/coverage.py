@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Coverage Report
+Completeness metrics for every dataset in one streaming pass
+
+For each record the engine evaluates every metric once (images, any
+description, en/is/zh descriptions, geohash, map, services, coordinates)
+and aggregates totals per dataset, per category and per region into
+data/coverage_report.json.
+
+Runs are incremental: a dataset whose size and mtime are unchanged is
+taken from data/.coverage_state.json as-is, and inside a changed dataset
+only records whose content hash changed are re-evaluated.
+
+Usage:
+    python etl/coverage.py                      # default datasets
+    python etl/coverage.py data/iceland_trails_enriched.json --full
+"""
+import argparse
+import hashlib
+import os
+import time
+
+from json_io import encode, is_ndjson, iter_records, read_json, write_json
+
+REPORT = "./data/coverage_report.json"
+STATE = "./data/.coverage_state.json"
+STATE_VERSION = 1
+
+DEFAULT_DATASETS = [
+    "data/iceland_clean_geohash.json",
+    "data/iceland_places_enriched.json",
+    "iceland_places_master.json",
+    "data/firestore_top_places.json",
+    "data/iceland_trails_enriched.json",
+    "data/firestore_trails_enriched.json",
+]
+
+LANGUAGES = ("en", "is", "zh")
+
+
+def _non_empty(value):
+    if isinstance(value, str):
+        return bool(value.strip())
+    if isinstance(value, dict):
+        return any(_non_empty(v) for v in value.values())
+    return bool(value)
+
+
+def language_descriptions(record):
+    """Languages with a non-empty description (content.{lang} or description.{lang})"""
+    found = set()
+    for field in ("content", "description", "descriptions"):
+        value = record.get(field)
+        if not isinstance(value, dict):
+            continue
+        for lang in LANGUAGES:
+            text = value.get(lang)
+            if isinstance(text, dict):
+                text = text.get("description")
+            if _non_empty(text):
+                found.add(lang)
+    return found
+
+
+def evaluate(record):
+    """All metrics for one record, as {metric: bool}"""
+    langs = language_descriptions(record)
+    media = record.get("media") if isinstance(record.get("media"), dict) else {}
+    location = record.get("location") if isinstance(record.get("location"), dict) else {}
+    metrics = {
+        "images": _non_empty(record.get("images")) or _non_empty(media.get("images")),
+        "description": bool(langs) or any(
+            _non_empty(record.get(k)) for k in ("description", "descriptions", "content")
+        ),
+        "geohash": _non_empty(record.get("geohash") or location.get("geohash")),
+        "map": _non_empty(record.get("mapPreview") or record.get("mapImage") or record.get("map_preview")),
+        "services": _non_empty(record.get("services")),
+        "coordinates": any(record.get(k) is not None for k in ("lat", "latitude", "coordinates", "start", "startLat")),
+    }
+    for lang in LANGUAGES:
+        metrics[f"description_{lang}"] = lang in langs
+    return metrics
+
+
+METRICS = list(evaluate({}))
+
+
+def _mask(metrics):
+    return sum(1 << i for i, name in enumerate(METRICS) if metrics[name])
+
+
+def _unmask(mask):
+    return [name for i, name in enumerate(METRICS) if mask >> i & 1]
+
+
+def record_hash(record):
+    return hashlib.blake2b(encode(record), digest_size=8).hexdigest()
+
+
+def iter_dataset(path):
+    """Records from a list, NDJSON, a {"places": [...]} document (incl. tag-coded dumps) or an {id: record} map"""
+    if is_ndjson(path):
+        yield from iter_records(path)
+        return
+    data = read_json(path)
+    if isinstance(data, dict) and isinstance(data.get("places"), list):
+        yield from data["places"]
+    elif isinstance(data, dict):
+        yield from (r for r in data.values() if isinstance(r, dict))
+    else:
+        yield from data
+
+
+def _empty_counts():
+    return {"total": 0, **{name: 0 for name in METRICS}}
+
+
+def aggregate(entries):
+    """Totals per dataset, category and region from [mask, category, region] entries"""
+    summary = {"total": _empty_counts(), "by_category": {}, "by_region": {}}
+    for mask, category, region in entries:
+        buckets = (
+            summary["total"],
+            summary["by_category"].setdefault(category or "unknown", _empty_counts()),
+            summary["by_region"].setdefault(region or "unknown", _empty_counts()),
+        )
+        names = _unmask(mask)
+        for bucket in buckets:
+            bucket["total"] += 1
+            for name in names:
+                bucket[name] += 1
+    return summary
+
+
+def scan_dataset(path, previous):
+    """
+    Evaluate one dataset, reusing previous per-record results where the hash matches.
+
+    Returns:
+        (state entry, stats dict)
+    """
+    old_records = (previous or {}).get("records", {})
+    records = {}
+    evaluated = 0
+
+    for i, record in enumerate(iter_dataset(path)):
+        key = str(record.get("id") or record.get("osm_id") or f"#{i}")
+        if key in records:
+            key = f"{key}#{i}"
+        digest = record_hash(record)
+        cached = old_records.get(key)
+        if cached and cached[0] == digest:
+            records[key] = cached
+            continue
+        mask = _mask(evaluate(record))
+        records[key] = [digest, mask, record.get("category") or record.get("type"), record.get("region")]
+        evaluated += 1
+
+    summary = aggregate(entry[1:] for entry in records.values())
+    return {"records": records, "summary": summary}, {"records": len(records), "evaluated": evaluated}
+
+
+def build_report(paths, state_path=STATE, full=False):
+    """
+    Coverage for every existing dataset in paths.
+
+    Returns:
+        Report dict (also what gets written to data/coverage_report.json)
+    """
+    state = {} if full or not os.path.exists(state_path) else read_json(state_path)
+    if state.get("version") != STATE_VERSION:
+        state = {"version": STATE_VERSION, "datasets": {}}
+
+    report = {"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "metrics": METRICS, "datasets": {}}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        st = os.stat(path)
+        key = f"{st.st_size}:{st.st_mtime_ns}"
+        previous = state["datasets"].get(path)
+
+        if previous and previous["key"] == key:
+            entry, stats = previous, {"records": len(previous["records"]), "evaluated": 0}
+        else:
+            entry, stats = scan_dataset(path, previous)
+            entry["key"] = key
+            state["datasets"][path] = entry
+
+        print(f"   {path}: {stats['records']} records ({stats['evaluated']} evaluated)")
+        report["datasets"][path] = entry["summary"]
+
+    os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+    write_json(state_path, state)
+    return report
+
+
+def print_summary(report):
+    for path, summary in report["datasets"].items():
+        total = summary["total"]
+        n = total["total"] or 1
+        print(f"\n📦 {path} ({total['total']} records)")
+        for name in METRICS:
+            print(f"   {name:18s}: {total[name]:5d} ({total[name] * 100 // n}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-pass completeness report for GO ICELAND datasets")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_DATASETS, help="Dataset files")
+    parser.add_argument("--output", default=REPORT, help="Report path")
+    parser.add_argument("--full", action="store_true", help="Ignore cached results and re-evaluate everything")
+    args = parser.parse_args()
+
+    print("📊 COVERAGE REPORT")
+    print("=" * 60)
+    report = build_report(args.paths, full=args.full)
+    print_summary(report)
+
+    write_json(args.output, report, pretty=True)
+    print(f"\n💾 Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
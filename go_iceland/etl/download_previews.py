@@ -1,12 +1,16 @@
 """
 GO ICELAND - Map Preview Downloader
 Downloads Mapbox static map previews for each POI
+
+With MAP_TILES set (an XYZ tile directory or .mbtiles file), previews are
+rendered offline by etl/static_maps.py instead - no token, no rate limit.
 """
 import requests
-import json
 import os
 from time import sleep
 
+from json_io import read_json
+
 MAPBOX_TOKEN = os.getenv("MAPBOX_TOKEN")
 INPUT = "./data/iceland_clean.json"
 OUTPUT_DIR = "./previews"
@@ -38,13 +42,22 @@ def download_preview(poi):
         return None
 
 def main():
+    if os.getenv("MAP_TILES"):
+        from static_maps import render_all
+
+        places = read_json(INPUT)
+        print(f"Rendering {len(places)} previews from {os.environ['MAP_TILES']}...")
+        written, skipped, no_coordinates, missing = render_all(places, os.environ["MAP_TILES"], OUTPUT_DIR)
+        print(f"\n✅ {written} rendered, {skipped} skipped (exist), {no_coordinates} without coordinates, "
+              f"{missing} missing tiles -> {OUTPUT_DIR}")
+        return
+
     if not MAPBOX_TOKEN:
         print("❌ MAPBOX_TOKEN not found in environment")
         print("Set it with: $env:MAPBOX_TOKEN='your_token'")
         return
 
-    with open(INPUT, encoding="utf-8") as f:
-        places = json.load(f)
+    places = read_json(INPUT)
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
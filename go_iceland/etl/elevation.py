@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Elevation
+Elevation profiles, gain/loss and Naismith durations for trails from a local DEM
+
+The DEM is a single-band GeoTIFF in geographic coordinates (lat/lng, e.g.
+Copernicus GLO-30 tiles mosaicked over Iceland), stored uncompressed so
+it can be memory-mapped: pixels are read straight from the page cache and
+a multi-GB raster costs no RAM. Prepare one with GDAL:
+
+    gdalbuildvrt iceland.vrt Copernicus_DSM_*.tif
+    gdal_translate -co COMPRESS=NONE -co TILED=YES -co BIGTIFF=IF_SAFER iceland.vrt data/iceland_dem.tif
+
+Every trail polyline is resampled every SAMPLE_SPACING_M and each sample
+is bilinearly interpolated from the four surrounding pixels (nodata
+pixels are left out of the weights). From the profile:
+
+    elevation_gain_m / elevation_loss_m   climbs and drops larger than CLIMB_THRESHOLD_M
+    max_elevation_m / min_elevation_m
+    elevation_profile                     [{"km", "m"}, ...], at most PROFILE_POINTS
+                                          (maps, as Firestore rejects nested arrays)
+
+Trails that had no elevation gain also get duration_hours from Naismith's
+rule (5 km/h plus 1 h per 600 m of ascent) and a re-derived difficulty.
+
+Usage:
+    python etl/elevation.py
+    python etl/elevation.py data/iceland_trails_pois.json data/iceland_trails_elevation.json --dem data/iceland_dem.tif
+
+    dem = open_dem()
+    dem.sample(64.3271, -20.1199)            # metres, or None off the raster
+"""
+import argparse
+import math
+import mmap
+import os
+import struct
+import time
+from functools import partial
+
+from json_io import console, iter_records, write_records
+from parallel import parallel_map
+from trail_pois import trail_points
+
+INPUT = "./data/iceland_trails_pois.json"
+OUTPUT = "./data/iceland_trails_elevation.json"
+DEM_FILE = "./data/iceland_dem.tif"
+
+SAMPLE_SPACING_M = 25
+# Smaller ups and downs are DEM noise, not climbing
+CLIMB_THRESHOLD_M = 5
+PROFILE_POINTS = 200
+# Share of samples that must fall on the DEM for the stats to count
+MIN_COVERAGE = 0.8
+NAISMITH_KMH = 5.0
+NAISMITH_CLIMB_M_PER_HOUR = 600
+
+_M_PER_DEG = 111320.0
+
+# TIFF field type -> (struct code, size)
+_TYPES = {1: ("B", 1), 2: ("s", 1), 3: ("H", 2), 4: ("I", 4), 5: ("II", 8), 6: ("b", 1), 7: ("B", 1),
+          8: ("h", 2), 9: ("i", 4), 10: ("ii", 8), 11: ("f", 4), 12: ("d", 8), 16: ("Q", 8), 17: ("q", 8),
+          18: ("Q", 8)}
+# (SampleFormat, BitsPerSample) -> struct code
+_PIXEL_FORMATS = {(1, 8): "B", (1, 16): "H", (1, 32): "I", (2, 8): "b", (2, 16): "h", (2, 32): "i",
+                  (3, 32): "f", (3, 64): "d"}
+
+_WIDTH, _HEIGHT, _BITS, _COMPRESSION = 256, 257, 258, 259
+_STRIP_OFFSETS, _SAMPLES, _ROWS_PER_STRIP, _PLANAR = 273, 277, 278, 284
+_TILE_WIDTH, _TILE_LENGTH, _TILE_OFFSETS, _SAMPLE_FORMAT = 322, 323, 324, 339
+_PIXEL_SCALE, _TIEPOINT, _GEO_KEYS, _GDAL_NODATA = 33550, 33922, 34735, 42113
+_MODEL_TYPE_KEY, _RASTER_TYPE_KEY = 1024, 1025
+_GEOGRAPHIC, _PIXEL_IS_POINT = 2, 2
+
+
+def _read_ifd(mm, order, offset, big):
+    """{tag: tuple of values} for the first image directory"""
+    count_fmt, entry_fmt, entry_size, inline = ("Q", "HHQ", 20, 8) if big else ("H", "HHI", 12, 4)
+    (count,) = struct.unpack_from(order + count_fmt, mm, offset)
+    offset += struct.calcsize(order + count_fmt)
+    tags = {}
+    for i in range(count):
+        at = offset + i * entry_size
+        tag, kind, n = struct.unpack_from(order + entry_fmt, mm, at)
+        if kind not in _TYPES:
+            continue
+        code, size = _TYPES[kind]
+        value_at = at + struct.calcsize(order + entry_fmt)
+        if size * n > inline:
+            (value_at,) = struct.unpack_from(order + ("Q" if big else "I"), mm, value_at)
+        if kind == 2:
+            tags[tag] = (bytes(mm[value_at:value_at + n]).rstrip(b"\0").decode("ascii", "replace"),)
+        else:
+            tags[tag] = struct.unpack_from(f"{order}{n * len(code)}{code[0]}", mm, value_at)
+    return tags
+
+
+class DEM:
+    """Memory-mapped single-band GeoTIFF in lat/lng, sampled bilinearly"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self):
+        mm = self._mm
+        order = {b"II": "<", b"MM": ">"}.get(bytes(mm[:2]))
+        if order is None:
+            raise ValueError(f"{self.path} is not a TIFF file")
+        version = struct.unpack_from(order + "H", mm, 2)[0]
+        if version == 42:
+            ifd = struct.unpack_from(order + "I", mm, 4)[0]
+        elif version == 43:
+            ifd = struct.unpack_from(order + "Q", mm, 8)[0]
+        else:
+            raise ValueError(f"{self.path}: unknown TIFF version {version}")
+        tags = _read_ifd(mm, order, ifd, version == 43)
+
+        if tags.get(_COMPRESSION, (1,))[0] != 1:
+            raise ValueError(f"{self.path} is compressed; rewrite it with gdal_translate -co COMPRESS=NONE")
+        self.width, self.height = tags[_WIDTH][0], tags[_HEIGHT][0]
+        bits = tags.get(_BITS, (8,))[0]
+        pixel = _PIXEL_FORMATS.get((tags.get(_SAMPLE_FORMAT, (1,))[0], bits))
+        if pixel is None:
+            raise ValueError(f"{self.path}: unsupported sample format ({bits}-bit)")
+        self._pixel = struct.Struct(order + pixel)
+        # Band 1 of pixel-interleaved data; band-separate planes start with band 1 anyway
+        samples = tags.get(_SAMPLES, (1,))[0] if tags.get(_PLANAR, (1,))[0] == 1 else 1
+        self._stride = self._pixel.size * samples
+
+        if _TILE_OFFSETS in tags:
+            self._tile = (tags[_TILE_WIDTH][0], tags[_TILE_LENGTH][0])
+            self._offsets = tags[_TILE_OFFSETS]
+            self._tiles_across = -(-self.width // self._tile[0])
+        else:
+            self._tile = None
+            self._offsets = tags[_STRIP_OFFSETS]
+            self._rows_per_strip = min(tags.get(_ROWS_PER_STRIP, (self.height,))[0], self.height)
+
+        keys = tags.get(_GEO_KEYS, ())
+        geo_keys = {keys[i]: keys[i + 3] for i in range(4, len(keys) - 3, 4) if keys[i + 1] == 0}
+        if geo_keys.get(_MODEL_TYPE_KEY) != _GEOGRAPHIC:
+            raise ValueError(f"{self.path} is not in lat/lng; reproject it with gdalwarp -t_srs EPSG:4326")
+        if _PIXEL_SCALE not in tags or _TIEPOINT not in tags:
+            raise ValueError(f"{self.path} has no georeferencing (ModelPixelScale/ModelTiepoint)")
+        scale_x, scale_y = tags[_PIXEL_SCALE][:2]
+        col0, row0, _, lng0, lat0, _ = tags[_TIEPOINT][:6]
+        # Bilinear weights are relative to pixel centres
+        centre = 0.0 if geo_keys.get(_RASTER_TYPE_KEY) == _PIXEL_IS_POINT else 0.5
+        self._transform = (lng0, lat0, scale_x, scale_y, col0 - centre, row0 - centre)
+
+        nodata = tags.get(_GDAL_NODATA, ("",))[0].strip()
+        self.nodata = float(nodata) if nodata and nodata.lower() != "nan" else None
+
+    def bounds(self):
+        """(south, west, north, east) of the raster"""
+        lng0, lat0, sx, sy, col0, row0 = self._transform
+        west = lng0 - (col0 + 0.5) * sx
+        north = lat0 + (row0 + 0.5) * sy
+        return north - self.height * sy, west, north, west + self.width * sx
+
+    def _value(self, row, col):
+        if self._tile is None:
+            strip, row_in = divmod(row, self._rows_per_strip)
+            offset = self._offsets[strip] + (row_in * self.width + col) * self._stride
+        else:
+            tile_w, tile_h = self._tile
+            tile = (row // tile_h) * self._tiles_across + col // tile_w
+            offset = self._offsets[tile] + ((row % tile_h) * tile_w + col % tile_w) * self._stride
+        value = self._pixel.unpack_from(self._mm, offset)[0]
+        if value != value or value == self.nodata:
+            return None
+        return value
+
+    def sample(self, lat, lng):
+        """Bilinearly interpolated elevation in metres, or None off the raster / over nodata"""
+        lng0, lat0, sx, sy, col0, row0 = self._transform
+        x = (lng - lng0) / sx + col0
+        y = (lat0 - lat) / sy + row0
+        # Half a pixel beyond the outer centres clamps to the edge pixel
+        if not (-0.5 <= x <= self.width - 0.5 and -0.5 <= y <= self.height - 0.5):
+            return None
+        x = min(max(x, 0.0), self.width - 1.0)
+        y = min(max(y, 0.0), self.height - 1.0)
+        c = min(int(x), max(self.width - 2, 0))
+        r = min(int(y), max(self.height - 2, 0))
+        fx, fy = x - c, y - r
+
+        total = weight = 0.0
+        for dr, dc, w in ((0, 0, (1 - fx) * (1 - fy)), (0, 1, fx * (1 - fy)),
+                          (1, 0, (1 - fx) * fy), (1, 1, fx * fy)):
+            if w <= 0 or r + dr >= self.height or c + dc >= self.width:
+                continue
+            value = self._value(r + dr, c + dc)
+            if value is not None:
+                total += w * value
+                weight += w
+        return total / weight if weight > 0 else None
+
+    def sample_many(self, points):
+        return [self.sample(lat, lng) for lat, lng in points]
+
+    def close(self):
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+
+def open_dem(path=DEM_FILE):
+    """DEM at path, or None when there is no DEM file"""
+    return DEM(path) if path and os.path.exists(path) else None
+
+
+def resample(points, spacing_m=SAMPLE_SPACING_M):
+    """
+    Points every spacing_m along the polyline (plus every vertex).
+
+    Returns:
+        ([(lat, lng), ...], [distance along in metres, ...])
+    """
+    samples = [tuple(points[0])]
+    along = [0.0]
+    distance = 0.0
+    for (alat, alng), (blat, blng) in zip(points, points[1:]):
+        kx = _M_PER_DEG * math.cos(math.radians((alat + blat) / 2))
+        length = math.hypot((blng - alng) * kx, (blat - alat) * _M_PER_DEG)
+        steps = max(1, math.ceil(length / spacing_m))
+        for k in range(1, steps + 1):
+            t = k / steps
+            samples.append((alat + (blat - alat) * t, alng + (blng - alng) * t))
+            along.append(distance + length * t)
+        distance += length
+    return samples, along
+
+
+def climb(elevations, threshold=CLIMB_THRESHOLD_M):
+    """(gain, loss) in metres, counting only moves of at least threshold from the last turning point"""
+    gain = loss = 0.0
+    reference = None
+    for value in elevations:
+        if value is None:
+            continue
+        if reference is None:
+            reference = value
+        elif value - reference >= threshold:
+            gain += value - reference
+            reference = value
+        elif reference - value >= threshold:
+            loss += reference - value
+            reference = value
+    return gain, loss
+
+
+def naismith_hours(distance_km, gain_m):
+    """Naismith's rule: 5 km/h plus 1 h per 600 m of ascent"""
+    return distance_km / NAISMITH_KMH + gain_m / NAISMITH_CLIMB_M_PER_HOUR
+
+
+def elevation_stats(points, dem, spacing_m=SAMPLE_SPACING_M):
+    """
+    Elevation fields for a polyline, or None when the trail is mostly off the DEM.
+    """
+    if len(points) < 2:
+        return None
+    samples, along = resample(points, spacing_m)
+    elevations = dem.sample_many(samples)
+    valid = [(d, e) for d, e in zip(along, elevations) if e is not None]
+    if len(valid) < MIN_COVERAGE * len(samples):
+        return None
+
+    gain, loss = climb(elevations)
+    step = max(1, math.ceil(len(valid) / PROFILE_POINTS))
+    profile = valid[::step]
+    if profile[-1] is not valid[-1]:
+        profile.append(valid[-1])
+    heights = [e for _, e in valid]
+    return {
+        "elevation_gain_m": round(gain),
+        "elevation_loss_m": round(loss),
+        "max_elevation_m": round(max(heights)),
+        "min_elevation_m": round(min(heights)),
+        "elevation_profile": [{"km": round(d / 1000, 3), "m": round(e, 1)} for d, e in profile],
+    }
+
+
+# One memory map per worker process
+_DEMS = {}
+
+
+def annotate_trail(trail, dem_path=DEM_FILE):
+    """
+    Add elevation fields to one trail. Trails without an elevation gain
+    (everything but the hand-written ones) also get a Naismith
+    duration_hours; existing gains are kept.
+    """
+    dem = _DEMS.get(dem_path)
+    if dem is None:
+        dem = _DEMS[dem_path] = DEM(dem_path)
+    stats = elevation_stats(trail_points(trail, endpoints=False), dem)
+    if stats is None:
+        return trail
+    if trail.get("elevation_gain_m"):
+        stats.pop("elevation_gain_m")
+    elif trail.get("distance_km"):
+        trail["duration_hours"] = round(naismith_hours(trail["distance_km"], stats["elevation_gain_m"]), 1)
+    trail.update(stats)
+    return trail
+
+
+def main():
+    # Imported here: fetch_iceland_trails imports this module for its own stats
+    from fetch_iceland_trails import determine_difficulty
+
+    parser = argparse.ArgumentParser(description="Elevation profiles and gain for trails from a local DEM")
+    parser.add_argument("input", nargs="?", default=INPUT)
+    parser.add_argument("output", nargs="?", default=OUTPUT)
+    parser.add_argument("--dem", default=DEM_FILE, help="Uncompressed lat/lng GeoTIFF")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    out = console(args.output)
+    dem = DEM(args.dem)
+    south, west, north, east = dem.bounds()
+    print(f"⛰️  DEM {dem.width}x{dem.height} ({south:.2f},{west:.2f} - {north:.2f},{east:.2f})", file=out)
+    dem.close()
+
+    start = time.time()
+    trails = list(iter_records(args.input))
+    # Trails whose gain (and so duration and difficulty) comes from the DEM
+    missing = [not trail.get("elevation_gain_m") for trail in trails]
+    work = partial(annotate_trail, dem_path=args.dem)
+    stats = {"profiled": 0, "gain": 0}
+
+    def process():
+        for trail, filled in zip(parallel_map(work, trails, args.workers, chunk_size=50), missing):
+            if trail.get("elevation_profile"):
+                stats["profiled"] += 1
+                if filled:
+                    stats["gain"] += 1
+                    trail["difficulty"] = determine_difficulty(trail.get("distance_km") or 0,
+                                                               trail["elevation_gain_m"])
+            yield trail
+
+    write_records(args.output, process())
+    print(f"✅ {stats['profiled']} of {len(trails)} trails profiled, {stats['gain']} with DEM gain "
+          f"and duration in {time.time() - start:.1f}s -> {args.output}", file=out)
+
+
+if __name__ == "__main__":
+    main()
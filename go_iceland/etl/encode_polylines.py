@@ -5,9 +5,11 @@ Converts trail polylines from nested arrays to encoded strings
 Uses Google's Polyline Algorithm (used by Google Maps, Mapbox, etc.)
 """
 
-import json
 from pathlib import Path
 
+from json_io import read_json, write_records
+from records import Trail
+
 def encode_polyline(coordinates):
     """
     Encode a list of [lat, lng] coordinates into a polyline string.
@@ -55,12 +57,37 @@ def encode_polyline(coordinates):
     
     return ''.join(encoded)
 
+def decode_polyline(encoded):
+    """
+    Decode a polyline string back into [(lat, lng), ...] (inverse of encode_polyline).
+    """
+    points = []
+    index = lat = lng = 0
+    length = len(encoded or '')
+    
+    while index < length:
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                chunk = ord(encoded[index]) - 63
+                index += 1
+                result |= (chunk & 0x1f) << shift
+                shift += 5
+                if chunk < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        points.append((lat / 1e5, lng / 1e5))
+    
+    return points
+
 def convert_trails_polylines(input_file, output_file):
     """Convert all trail polylines to encoded strings"""
     print(f"📖 Loading trails from: {input_file}")
     
-    with open(input_file, 'r', encoding='utf-8') as f:
-        trails = json.load(f)
+    trails = read_json(input_file)
     
     print(f"✅ Loaded {len(trails)} trails")
     print(f"🔄 Encoding polylines...")
@@ -68,47 +95,46 @@ def convert_trails_polylines(input_file, output_file):
     converted = 0
     errors = 0
     
-    for trail in trails:
+    output = []
+    for data in trails:
         try:
-            # Get polyline array
-            polyline = trail.get('polyline', [])
+            # Validates and accepts pairs, {lat, lng} dicts or flattened polylines
+            trail = Trail.from_dict(data)
+        except ValueError as e:
+            errors += 1
+            print(f"   ❌ Error encoding trail {data.get('id')}: {e}")
+            output.append(data)
+            continue
+        
+        points = trail.points()
+        trail_dict = trail.to_dict()
+        output.append(trail_dict)
+        
+        if points:
+            # Encode polyline
+            trail_dict['polyline_encoded'] = encode_polyline(points)
             
-            if polyline and isinstance(polyline, list):
-                # Encode polyline
-                encoded = encode_polyline(polyline)
-                
-                # Replace with encoded string
-                trail['polyline_encoded'] = encoded
-                
-                # Keep simplified points for quick preview (first, last, midpoint)
-                if len(polyline) >= 3:
-                    trail['polyline_preview'] = [
-                        polyline[0],
-                        polyline[len(polyline) // 2],
-                        polyline[-1]
-                    ]
-                else:
-                    trail['polyline_preview'] = polyline
-                
-                # Remove full polyline array to save space
-                del trail['polyline']
-                
-                converted += 1
-                
-                if converted % 50 == 0:
-                    print(f"   ✅ {converted}/{len(trails)} encoded...")
+            # Keep simplified points for quick preview (first, last, midpoint)
+            if len(points) >= 3:
+                preview = [points[0], points[len(points) // 2], points[-1]]
             else:
-                errors += 1
-                print(f"   ⚠️ Trail {trail.get('id')} has no polyline")
-                
-        except Exception as e:
+                preview = points
+            trail_dict['polyline_preview'] = [list(point) for point in preview]
+            
+            # Remove full polyline array to save space
+            del trail_dict['polyline']
+            
+            converted += 1
+            
+            if converted % 50 == 0:
+                print(f"   ✅ {converted}/{len(trails)} encoded...")
+        else:
             errors += 1
-            print(f"   ❌ Error encoding trail {trail.get('id')}: {e}")
+            print(f"   ⚠️ Trail {trail.id} has no polyline")
     
     # Save converted trails
     print(f"\n💾 Saving to: {output_file}")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(trails, f, ensure_ascii=False, indent=2)
+    write_records(output_file, output)
     
     print(f"\n✅ Conversion complete!")
     print(f"   📊 {converted} trails encoded")
@@ -8,11 +8,13 @@ Sources:
 3. Auto-generated saga & culture context
 """
 
-import json
 import time
 import requests
 from datetime import datetime
 
+from json_io import write_records
+from osm_tags import read_places
+
 
 def get_wikipedia_summary(place_name, lang="is"):
     """
@@ -182,8 +184,7 @@ def enrich_all_places():
     
     # Load raw data
     print("📖 Loading raw places...")
-    with open("data/iceland_places_raw.json", "r", encoding="utf-8") as f:
-        places = json.load(f)
+    places = read_places("data/iceland_places_raw.json")
     
     print(f"✅ Loaded {len(places)} places")
     print()
@@ -242,8 +243,7 @@ def enrich_all_places():
     output_file = "data/iceland_places_enriched.json"
     print()
     print(f"💾 Saving to {output_file}")
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(places, f, indent=2, ensure_ascii=False)
+    write_records(output_file, places)
     
     # Statistics
     print()
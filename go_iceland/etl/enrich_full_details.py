@@ -5,7 +5,6 @@ Sækir sögu, lýsingar, þjónustu og allar upplýsingar um staði
 Frá OSM, Wikipedia, Visit Iceland
 """
 
-import json
 import time
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -13,6 +12,12 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from json_io import write_records
+from names import NameMatcher, wiki_title
+from osm_tags import read_places
+from wiki_extracts import ExtractStore
+from wikidata import WikidataIndex
+
 # Wikipedia API
 WIKI_API = "https://is.wikipedia.org/api/rest_v1/page/summary/"
 WIKI_EN_API = "https://en.wikipedia.org/api/rest_v1/page/summary/"
@@ -24,12 +29,27 @@ adapter = HTTPAdapter(max_retries=retry)
 session.mount('http://', adapter)
 session.mount('https://', adapter)
 
+# Local Wikidata index (etl/wikidata.py ingest) gives exact Wikipedia titles
+try:
+    WIKIDATA = WikidataIndex.open()
+except FileNotFoundError:
+    WIKIDATA = None
+
+# Local Wikipedia extracts (etl/wiki_extracts.py ingest) avoid the API entirely
+try:
+    EXTRACTS = ExtractStore.open()
+except FileNotFoundError:
+    EXTRACTS = None
+
 
-def get_wikipedia_summary(place_name: str, lang: str = 'is') -> Optional[Dict]:
-    """Sækir Wikipedia summary fyrir stað"""
+def get_wikipedia_summary(place_name: str, lang: str = 'is', titles: Optional[Dict] = None) -> Optional[Dict]:
+    """Sækir Wikipedia summary fyrir stað (titles: Wikidata sitelinks, annars giskað út frá nafni)"""
+    titles = titles or {}
+    if lang not in titles and 'en' in titles:
+        lang = 'en'
     try:
         api = WIKI_API if lang == 'is' else WIKI_EN_API
-        url = f"{api}{place_name.replace(' ', '_')}"
+        url = f"{api}{wiki_title(titles.get(lang, place_name))}"
         
         headers = {'User-Agent': 'GoIceland/1.0 (Educational app)'}
         response = session.get(url, headers=headers, timeout=5)
@@ -37,6 +57,7 @@ def get_wikipedia_summary(place_name: str, lang: str = 'is') -> Optional[Dict]:
         if response.status_code == 200:
             data = response.json()
             return {
+                'lang': lang,
                 'title': data.get('title'),
                 'summary': data.get('extract'),
                 'thumbnail': data.get('thumbnail', {}).get('source'),
@@ -46,7 +67,7 @@ def get_wikipedia_summary(place_name: str, lang: str = 'is') -> Optional[Dict]:
         elif response.status_code == 404:
             # Try English if Icelandic not found
             if lang == 'is':
-                return get_wikipedia_summary(place_name, 'en')
+                return get_wikipedia_summary(place_name, 'en', titles)
         
         return None
     except Exception as e:
@@ -54,6 +75,21 @@ def get_wikipedia_summary(place_name: str, lang: str = 'is') -> Optional[Dict]:
         return None
 
 
+def get_local_summary(place: Dict) -> Optional[Dict]:
+    """Sama og get_wikipedia_summary, úr staðbundnu extract-safni"""
+    page = EXTRACTS.lookup(place) if EXTRACTS else None
+    if not page:
+        return None
+    return {
+        'lang': page['lang'],
+        'title': page['title'],
+        'summary': page['extract'],
+        'thumbnail': None,
+        'coordinates': {'lat': page['lat'], 'lon': page['lng']} if page['lat'] is not None else None,
+        'description': None
+    }
+
+
 def enrich_place_services(tags: Dict) -> Dict:
     """Útbýr services object frá OSM tags"""
     services = {
@@ -104,6 +140,11 @@ def enrich_place_services(tags: Dict) -> Dict:
     return services
 
 
+# Crowd level for famous places (matched on normalized name tokens)
+FAMOUS_PLACES = NameMatcher(['gullfoss', 'geysir', 'blue lagoon', 'skógafoss', 'seljalandsfoss',
+                             'jökulsárlón', 'reynisfjara', 'thingvellir'])
+
+
 def enrich_visit_info(category: str, tags: Dict) -> Dict:
     """Best time to visit, crowds, fees"""
     visit_info = {
@@ -134,11 +175,7 @@ def enrich_visit_info(category: str, tags: Dict) -> Dict:
     visit_info['suggested_duration'] = duration_map.get(category, '30-60 minutes')
     
     # Crowd level for famous places
-    famous = ['gullfoss', 'geysir', 'blue lagoon', 'skógafoss', 'seljalandsfoss', 
-              'jökulsárlón', 'reynisfjara', 'thingvellir']
-    
-    place_name = tags.get('name', '').lower()
-    if any(f in place_name for f in famous):
+    if FAMOUS_PLACES.match(tags.get('name', '')):
         visit_info['crowds'] = 'High (especially mid-day)'
     
     return visit_info
@@ -202,8 +239,11 @@ def enrich_single_place(place: Dict) -> Dict:
     print(f"   🔍 Enriching: {name} ({category})")
     
     # 1. Get Wikipedia data
-    wiki_data = get_wikipedia_summary(name)
-    time.sleep(0.5)  # Rate limiting
+    qid, wikidata = WIKIDATA.lookup(place) if WIKIDATA else (None, None)
+    wiki_data = get_local_summary(place)
+    if not wiki_data:
+        wiki_data = get_wikipedia_summary(name, titles=wikidata['sitelinks'] if wikidata else None)
+        time.sleep(0.5)  # Rate limiting
     
     # 2. Build enriched place
     enriched = {
@@ -252,7 +292,11 @@ def enrich_single_place(place: Dict) -> Dict:
     # Add Wikipedia as source if found
     if wiki_data:
         enriched['sources'].append('wikipedia')
-        enriched['wikipedia_url'] = f"https://is.wikipedia.org/wiki/{name.replace(' ', '_')}"
+        enriched['wikipedia_url'] = f"https://{wiki_data['lang']}.wikipedia.org/wiki/{wiki_title(wiki_data['title'] or name)}"
+    if qid:
+        enriched['wikidata'] = qid
+        if wikidata['heritage']:
+            enriched['heritage'] = WIKIDATA.heritage(wikidata)
     
     # Add image field for backward compatibility
     if enriched['media']['hero_image']:
@@ -272,11 +316,8 @@ def enrich_all_places(input_file: str, output_file: str):
     
     print(f"📖 Reading places from: {input_file}")
     
-    with open(input_path, 'r', encoding='utf-8') as f:
-        places = json.load(f)
-    
-    if isinstance(places, dict):
-        places = [places]
+    # Plain lists, single objects and tag-coded raw dumps
+    places = read_places(input_path)
     
     print(f"🔥 Enriching {len(places)} places with full details...")
     print("   → Wikipedia summaries")
@@ -300,8 +341,7 @@ def enrich_all_places(input_file: str, output_file: str):
     output_path = Path(output_file)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(enriched_places, f, indent=2, ensure_ascii=False)
+    write_records(output_path, enriched_places)
     
     print(f"\n✅ Enriched data saved to: {output_file}")
     print(f"📊 Total places: {len(enriched_places)}")
@@ -2,10 +2,12 @@
 GO ICELAND - POI Enrichment
 Cleans and enriches raw OSM data with categories, descriptions, and metadata
 """
-import json
 import hashlib
 import re
 
+from json_io import console, iter_records, stage_paths, write_records
+from parallel import parallel_map
+
 INPUT = "./data/iceland_raw.json"
 OUTPUT = "./data/iceland_clean.json"
 
@@ -123,68 +125,65 @@ def parse_opening_hours(hours_str):
         return {"type": "raw", "value": hours_str}
 
 def deduplicate(pois):
-    """Remove duplicate POIs based on rounded coordinates"""
+    """Drop duplicate POIs based on rounded coordinates (streams; only the seen keys are kept)"""
     seen = set()
-    unique = []
-    
+
     for p in pois:
         key = (round(p["lat"], 4), round(p["lng"], 4), p["name"])
         if key not in seen:
             seen.add(key)
-            unique.append(p)
-    
-    return unique
+            yield p
+
+def clean_poi(p):
+    """Turn one raw OSM POI into the clean schema"""
+    cat = get_category(p["category"])
+    region = get_region(p["lat"], p["lng"])
+    poi_id = generate_id(p["name"], p["lat"], p["lng"])
+
+    # Parse opening hours
+    opening_hours_raw = p.get("opening_hours")
+    opening_hours_parsed = parse_opening_hours(opening_hours_raw)
+
+    return {
+        "id": poi_id,
+        "name": p["name"],
+        "lat": p["lat"],
+        "lng": p["lng"],
+        "category": cat,
+        "region": region,
+        "rating": p.get("rating"),
+        "description": p.get("description"),
+        "thumbnail": p.get("thumbnail"),
+        "website": p.get("website"),
+        "wikipedia": p.get("wikipedia"),
+        "wikidata": p.get("wikidata"),
+        "phone": p.get("phone"),
+        "opening_hours": opening_hours_parsed,
+        "opening_hours_raw": opening_hours_raw,
+        "cuisine": p.get("cuisine"),
+        "stars": p.get("stars"),
+        "email": p.get("email"),
+        "address": {
+            "street": p.get("addr_street"),
+            "city": p.get("addr_city"),
+            "postcode": p.get("addr_postcode")
+        } if any([p.get("addr_street"), p.get("addr_city"), p.get("addr_postcode")]) else None,
+        "popularity": 0.5  # Default popularity score
+    }
 
-def main():
-    with open(INPUT, encoding="utf-8") as f:
-        raw = json.load(f)
+def enrich(raw):
+    """Clean (on all cores) and deduplicate a stream of raw POIs"""
+    return deduplicate(parallel_map(clean_poi, raw))
 
-    clean = []
+def main():
+    # python etl/enrich_pois.py [input] [output]; "-" = NDJSON on stdin/stdout
+    source, target = stage_paths(INPUT, OUTPUT)
+    out = console(target)
 
-    for p in raw:
-        cat = get_category(p["category"])
-        region = get_region(p["lat"], p["lng"])
-        poi_id = generate_id(p["name"], p["lat"], p["lng"])
+    count = write_records(target, enrich(iter_records(source)))
 
-        # Parse opening hours
-        opening_hours_raw = p.get("opening_hours")
-        opening_hours_parsed = parse_opening_hours(opening_hours_raw)
-        
-        clean.append({
-            "id": poi_id,
-            "name": p["name"],
-            "lat": p["lat"],
-            "lng": p["lng"],
-            "category": cat,
-            "region": region,
-            "rating": p.get("rating"),
-            "description": p.get("description"),
-            "thumbnail": p.get("thumbnail"),
-            "website": p.get("website"),
-            "wikipedia": p.get("wikipedia"),
-            "phone": p.get("phone"),
-            "opening_hours": opening_hours_parsed,
-            "opening_hours_raw": opening_hours_raw,
-            "cuisine": p.get("cuisine"),
-            "stars": p.get("stars"),
-            "email": p.get("email"),
-            "address": {
-                "street": p.get("addr_street"),
-                "city": p.get("addr_city"),
-                "postcode": p.get("addr_postcode")
-            } if any([p.get("addr_street"), p.get("addr_city"), p.get("addr_postcode")]) else None,
-            "popularity": 0.5  # Default popularity score
-        })
-
-    # Remove duplicates
-    clean = deduplicate(clean)
-
-    print(f"Cleaned POIs: {len(clean)}")
-
-    with open(OUTPUT, "w", encoding="utf-8") as f:
-        json.dump(clean, f, indent=2, ensure_ascii=False)
-
-    print(f"✅ Saved to: {OUTPUT}")
+    print(f"Cleaned POIs: {count}", file=out)
+    print(f"✅ Saved to: {target}", file=out)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Facet Index
+Bitset index over category, region, source and completeness flags
+
+Every facet value (category=waterfall, region=Suðurland, has_images, ...)
+is a bitset over record positions, stored as a Python int. Compound
+filters and counts are then bitwise AND/OR/NOT plus a popcount instead
+of a comprehension over the whole place list:
+
+    index = FacetIndex.for_file("data/iceland_clean_geohash.json")
+    index.count(category="waterfall", region="Suðurland", has_images=False)
+    index.counts("category", has_description=False)
+
+for_file() caches the index next to the dataset (data/.facets/) keyed on
+the file's size and mtime, so it is built once per dataset version.
+
+Usage:
+    python etl/facets.py data/iceland_clean_geohash.json
+    python etl/facets.py data/iceland_clean_geohash.json --category waterfall --missing images
+"""
+import argparse
+import os
+
+from json_io import read_json, write_json
+
+FACET_VERSION = 1
+CACHE_DIR = ".facets"
+
+# Facet name -> function returning the record's value(s) for it
+FACETS = {
+    "category": lambda r: r.get("category"),
+    "region": lambda r: r.get("region"),
+    "source": lambda r: r.get("sources") or r.get("source"),
+}
+
+
+def _non_empty(value):
+    if isinstance(value, str):
+        return bool(value.strip())
+    return bool(value)
+
+
+# Flag name -> predicate; each flag gets one bitset
+FLAGS = {
+    "has_images": lambda r: _non_empty(r.get("images")) or _non_empty((r.get("media") or {}).get("images")),
+    "has_description": lambda r: any(_non_empty(r.get(k)) for k in ("description", "descriptions", "content")),
+    "has_geohash": lambda r: _non_empty(r.get("geohash")),
+    "has_website": lambda r: _non_empty(r.get("website")),
+    "has_map": lambda r: _non_empty(r.get("mapPreview") or r.get("mapImage") or r.get("map_preview")),
+}
+
+
+def popcount(bits):
+    try:
+        return bits.bit_count()
+    except AttributeError:  # Python < 3.10
+        return bin(bits).count("1")
+
+
+def positions(bits):
+    """Record positions set in a bitset, ascending"""
+    return [i for i, bit in enumerate(bin(bits)[:1:-1]) if bit == "1"]
+
+
+def _bitset(positions_list, size):
+    """Build a bitset from positions in one pass (no per-bit big-int copies)"""
+    buf = bytearray((size + 7) // 8)
+    for i in positions_list:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+class FacetIndex:
+    """Bitsets per facet value and per completeness flag over a record list"""
+
+    def __init__(self, size, facets, flags, ids=None, records=None):
+        self.size = size
+        self.facets = facets      # {facet: {value: bits}}
+        self.flags = flags        # {flag: bits}
+        self.ids = ids or []
+        self.records = records
+        self.all = (1 << size) - 1
+
+    @classmethod
+    def build(cls, records, facets=FACETS, flags=FLAGS):
+        """Index records in a single pass"""
+        records = list(records)
+        facet_positions = {name: {} for name in facets}
+        flag_positions = {name: [] for name in flags}
+
+        for i, record in enumerate(records):
+            for name, get in facets.items():
+                values = get(record)
+                if values is None:
+                    continue
+                for value in values if isinstance(values, (list, tuple)) else (values,):
+                    facet_positions[name].setdefault(str(value), []).append(i)
+            for name, test in flags.items():
+                if test(record):
+                    flag_positions[name].append(i)
+
+        size = len(records)
+        return cls(
+            size,
+            {name: {v: _bitset(p, size) for v, p in values.items()} for name, values in facet_positions.items()},
+            {name: _bitset(p, size) for name, p in flag_positions.items()},
+            [r.get("id") for r in records],
+            records,
+        )
+
+    @classmethod
+    def for_file(cls, path, cache=True):
+        """
+        Index a dataset file, reusing data/.facets/<name>.json while the
+        file's size and mtime are unchanged.
+        """
+        st = os.stat(path)
+        key = f"{FACET_VERSION}:{st.st_size}:{st.st_mtime_ns}"
+        cache_path = os.path.join(os.path.dirname(path) or ".", CACHE_DIR, os.path.basename(path))
+
+        if cache and os.path.exists(cache_path):
+            cached = read_json(cache_path)
+            if cached.get("key") == key:
+                return cls.from_dict(cached)
+
+        data = read_json(path)
+        if isinstance(data, dict):
+            data = data.get("places", list(data.values()))
+        index = cls.build(data)
+
+        if cache:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            write_json(cache_path, {"key": key, **index.to_dict()})
+        return index
+
+    def to_dict(self):
+        """Cacheable form; bitsets as hex strings"""
+        return {
+            "size": self.size,
+            "ids": self.ids,
+            "facets": {name: {v: format(b, "x") for v, b in values.items()} for name, values in self.facets.items()},
+            "flags": {name: format(b, "x") for name, b in self.flags.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["size"],
+            {name: {v: int(b, 16) for v, b in values.items()} for name, values in data["facets"].items()},
+            {name: int(b, 16) for name, b in data["flags"].items()},
+            data["ids"],
+        )
+
+    def values(self, facet):
+        return sorted(self.facets[facet])
+
+    def select(self, **conditions):
+        """
+        Bitset for a compound filter.
+
+        facet=value or facet=[v1, v2] (OR within a facet), flag=True/False;
+        conditions are ANDed. Unknown values match nothing.
+        """
+        bits = self.all
+        for name, wanted in conditions.items():
+            if name in self.flags:
+                flag = self.flags[name]
+                bits &= flag if wanted else self.all & ~flag
+            elif name in self.facets:
+                values = wanted if isinstance(wanted, (list, tuple, set)) else (wanted,)
+                union = 0
+                for value in values:
+                    union |= self.facets[name].get(str(value), 0)
+                bits &= union
+            else:
+                raise KeyError(f"Unknown facet or flag: {name}")
+        return bits
+
+    def count(self, **conditions):
+        return popcount(self.select(**conditions))
+
+    def counts(self, facet, **conditions):
+        """{value: count} for one facet within a filter"""
+        where = self.select(**conditions)
+        counts = {value: popcount(bits & where) for value, bits in self.facets[facet].items()}
+        return {value: n for value, n in counts.items() if n}
+
+    def find(self, **conditions):
+        """Matching records (or ids when loaded from cache)"""
+        hits = positions(self.select(**conditions))
+        if self.records is not None:
+            return [self.records[i] for i in hits]
+        return [self.ids[i] for i in hits]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Facet counts for a POI dataset")
+    parser.add_argument("path", help="Dataset JSON (list or {\"places\": [...]})")
+    parser.add_argument("--category", nargs="+")
+    parser.add_argument("--region", nargs="+")
+    parser.add_argument("--source", nargs="+")
+    parser.add_argument("--has", nargs="+", default=[], choices=[f[4:] for f in FLAGS], help="Required flags")
+    parser.add_argument("--missing", nargs="+", default=[], choices=[f[4:] for f in FLAGS], help="Flags that must be absent")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write data/.facets/")
+    args = parser.parse_args()
+
+    index = FacetIndex.for_file(args.path, cache=not args.no_cache)
+    conditions = {name: getattr(args, name) for name in FACETS if getattr(args, name)}
+    conditions.update({f"has_{flag}": True for flag in args.has})
+    conditions.update({f"has_{flag}": False for flag in args.missing})
+
+    print(f"📊 {args.path}: {index.size} records")
+    print(f"   Matching {conditions or 'all'}: {index.count(**conditions)}")
+    for flag in FLAGS:
+        if flag not in conditions:
+            print(f"   {flag:16s}: {index.count(**conditions, **{flag: True})}")
+    for facet in FACETS:
+        counts = index.counts(facet, **conditions)
+        if counts:
+            print(f"\n   By {facet}:")
+            for value, n in sorted(counts.items(), key=lambda x: -x[1])[:20]:
+                print(f"     {value:25s}: {n:5d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,14 +11,18 @@ Categories:
 """
 
 import requests
-import json
 import time
 from datetime import datetime
 
+from osm_tags import TagVocabulary, write_tagged
+
 
 OVERPASS_API = "https://overpass-api.de/api/interpreter"
 ICELAND_BBOX = "(63.0,-25.0,67.6,-12.0)"  # South, West, North, East
 
+# Shared OSM tag strings; records keep integer-coded tag arrays
+TAGS = TagVocabulary()
+
 # Comprehensive query for ALL relevant POIs in Iceland
 QUERIES = [
     # NATURE
@@ -121,7 +125,7 @@ def process_element(element):
         "latitude": element.get("lat"),
         "longitude": element.get("lon"),
         "country": "IS",
-        "tags": tags,
+        "tags": TAGS.encode(tags),
         "osm_id": element.get("id"),
         "osm_type": element.get("type"),
         "fetched_at": datetime.now().isoformat(),
@@ -159,8 +163,7 @@ def fetch_all_places():
     # Save to file
     output_file = "data/iceland_places_raw.json"
     print(f"💾 Saving to {output_file}")
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(all_places, f, indent=2, ensure_ascii=False)
+    write_tagged(output_file, all_places, TAGS)
     
     # Statistics
     print()
@@ -168,6 +171,7 @@ def fetch_all_places():
     print("📊 STATISTICS")
     print("=" * 60)
     print(f"Total places: {len(all_places)}")
+    print(f"Distinct tag strings: {len(TAGS)}")
     
     # Count by category
     categories = {}
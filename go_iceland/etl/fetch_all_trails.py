@@ -11,11 +11,12 @@ Includes:
 """
 
 import requests
-import json
 import time
 from datetime import datetime
 from math import radians, sin, cos, sqrt, atan2
 
+from json_io import write_records
+
 
 OVERPASS_API = "https://overpass-api.de/api/interpreter"
 ICELAND_BBOX = "(63.0,-25.0,67.6,-12.0)"
@@ -243,8 +244,7 @@ def fetch_all_trails():
     # Save
     output_file = "data/iceland_trails_raw.json"
     print(f"💾 Saving to {output_file}")
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(trails, f, indent=2, ensure_ascii=False)
+    write_records(output_file, trails)
     
     # Statistics
     print()
@@ -3,9 +3,10 @@ GO ICELAND - OSM Data Fetcher
 Fetches 2000-4500 POIs from OpenStreetMap for Iceland
 """
 import requests
-import json
 from time import sleep
 
+from json_io import write_records
+
 OUTPUT = "./data/iceland_raw.json"
 OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 
@@ -100,6 +101,7 @@ def main():
                     "description": tags.get("description"),
                     "website": tags.get("website"),
                     "wikipedia": tags.get("wikipedia"),
+                    "wikidata": tags.get("wikidata"),
                     "phone": tags.get("phone"),
                     "opening_hours": tags.get("opening_hours"),
                     "cuisine": tags.get("cuisine"),
@@ -115,8 +117,7 @@ def main():
 
     print(f"\nTotal POIs fetched: {len(all_pois)}")
 
-    with open(OUTPUT, "w", encoding="utf-8") as f:
-        json.dump(all_pois, f, indent=2, ensure_ascii=False)
+    write_records(OUTPUT, all_pois)
 
     print(f"✅ Saved to: {OUTPUT}")
 
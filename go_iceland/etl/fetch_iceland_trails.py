@@ -4,7 +4,6 @@
 Sækir ALLAR gönguleiðir á Íslandi frá OSM + reiknar stats
 """
 
-import json
 import math
 import time
 from pathlib import Path
@@ -13,6 +12,9 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from elevation import DEM_FILE, elevation_stats, naismith_hours, open_dem
+from json_io import write_records
+
 # Overpass API endpoint
 OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 
@@ -44,8 +46,8 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return R * c
 
 
-def calculate_trail_stats(points: List[Tuple[float, float]]) -> Dict:
-    """Calculate distance, elevation gain, duration from points"""
+def calculate_trail_stats(points: List[Tuple[float, float]], dem=None) -> Dict:
+    """Calculate distance, elevation gain, duration from points (elevation needs a DEM)"""
     
     if len(points) < 2:
         return {
@@ -61,14 +63,19 @@ def calculate_trail_stats(points: List[Tuple[float, float]]) -> Dict:
         lat2, lon2 = points[i + 1]
         total_distance += haversine_distance(lat1, lon1, lat2, lon2)
     
-    # Estimate duration (Naismith's rule: 5km/h + 1h per 600m elevation)
-    # For now, simple estimate: 4km/h average
-    duration_hours = total_distance / 4.0
+    elevation = elevation_stats(points, dem) if dem else None
+    if elevation:
+        # Naismith's rule: 5km/h + 1h per 600m elevation
+        duration_hours = naismith_hours(total_distance, elevation['elevation_gain_m'])
+    else:
+        # No elevation data: simple estimate, 4km/h average
+        elevation = {'elevation_gain_m': 0}
+        duration_hours = total_distance / 4.0
     
     return {
         'distance_km': round(total_distance, 2),
-        'elevation_gain_m': 0,  # Need GPX with elevation data
-        'duration_hours': round(duration_hours, 1)
+        'duration_hours': round(duration_hours, 1),
+        **elevation
     }
 
 
@@ -130,7 +137,7 @@ def fetch_iceland_trails() -> List[Dict]:
         return []
 
 
-def process_trail_relation(relation: Dict) -> Optional[Dict]:
+def process_trail_relation(relation: Dict, dem=None) -> Optional[Dict]:
     """Process OSM relation into trail object"""
     
     tags = relation.get('tags', {})
@@ -151,7 +158,7 @@ def process_trail_relation(relation: Dict) -> Optional[Dict]:
         return None
     
     # Calculate stats
-    stats = calculate_trail_stats(points)
+    stats = calculate_trail_stats(points, dem)
     
     # Determine difficulty
     difficulty = determine_difficulty(stats['distance_km'], stats['elevation_gain_m'])
@@ -167,6 +174,8 @@ def process_trail_relation(relation: Dict) -> Optional[Dict]:
         'distance_km': stats['distance_km'],
         'duration_hours': stats['duration_hours'],
         'elevation_gain_m': stats['elevation_gain_m'],
+        'elevation_loss_m': stats.get('elevation_loss_m'),
+        'max_elevation_m': stats.get('max_elevation_m'),
         'difficulty': difficulty,
         
         # Location
@@ -184,6 +193,7 @@ def process_trail_relation(relation: Dict) -> Optional[Dict]:
         # Polyline (simplified - keep every 10th point for Firebase)
         'polyline': points[::10] if len(points) > 100 else points,
         'polyline_full_available': len(points) > 100,
+        'elevation_profile': stats.get('elevation_profile'),
         
         # Metadata
         'surface': tags.get('surface', tags.get('highway', 'trail')),
@@ -207,7 +217,7 @@ def process_trail_relation(relation: Dict) -> Optional[Dict]:
     return trail
 
 
-def process_trail_way(way: Dict) -> Optional[Dict]:
+def process_trail_way(way: Dict, dem=None) -> Optional[Dict]:
     """Process OSM way into trail object"""
     
     tags = way.get('tags', {})
@@ -224,7 +234,7 @@ def process_trail_way(way: Dict) -> Optional[Dict]:
     points = [(p['lat'], p['lon']) for p in geometry]
     
     # Calculate stats
-    stats = calculate_trail_stats(points)
+    stats = calculate_trail_stats(points, dem)
     
     # Skip very short trails
     if stats['distance_km'] < 0.5:
@@ -241,6 +251,8 @@ def process_trail_way(way: Dict) -> Optional[Dict]:
         'distance_km': stats['distance_km'],
         'duration_hours': stats['duration_hours'],
         'elevation_gain_m': stats['elevation_gain_m'],
+        'elevation_loss_m': stats.get('elevation_loss_m'),
+        'max_elevation_m': stats.get('max_elevation_m'),
         'difficulty': difficulty,
         
         'start': {
@@ -256,6 +268,7 @@ def process_trail_way(way: Dict) -> Optional[Dict]:
         
         'polyline': points[::5] if len(points) > 50 else points,
         'polyline_full_available': len(points) > 50,
+        'elevation_profile': stats.get('elevation_profile'),
         
         'surface': tags.get('surface', 'trail'),
         'sac_scale': tags.get('sac_scale'),
@@ -382,8 +395,7 @@ def save_trails(trails: List[Dict], output_file: str):
     output_path = Path(output_file)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(trails, f, indent=2, ensure_ascii=False)
+    write_records(output_path, trails)
     
     print(f"\n✅ Saved {len(trails)} trails to: {output_file}")
 
@@ -395,13 +407,20 @@ def main():
     # Fetch from OSM
     elements = fetch_iceland_trails()
     
+    # Local DEM for elevation gain (optional)
+    dem = open_dem()
+    if dem:
+        print(f"⛰️  Elevation from {DEM_FILE}")
+    else:
+        print(f"⚠️  No DEM at {DEM_FILE} - elevation gain left at 0 (see etl/elevation.py)")
+    
     trails = []
     
     # Process relations (official routes)
     print("\n📍 Processing trail relations...")
     for elem in elements:
         if elem['type'] == 'relation':
-            trail = process_trail_relation(elem)
+            trail = process_trail_relation(elem, dem)
             if trail:
                 trails.append(trail)
                 print(f"   ✅ {trail['name']} - {trail['distance_km']} km")
@@ -410,7 +429,7 @@ def main():
     print("\n📍 Processing trail ways...")
     for elem in elements:
         if elem['type'] == 'way':
-            trail = process_trail_way(elem)
+            trail = process_trail_way(elem, dem)
             if trail:
                 trails.append(trail)
                 print(f"   ✅ {trail['name']} - {trail['distance_km']} km")
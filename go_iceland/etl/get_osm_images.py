@@ -3,51 +3,60 @@
 get_osm_images.py
 Extracts image URLs from OSM tags (image, image:url, photo fields)
 """
-import json
 import os
 
+from json_io import STDIO, console, iter_records, stage_paths, write_records
+
 INPUT = './data/iceland_clean_geohash.json'
 OUTPUT = './data/iceland_with_osm_images.json'
 
-def extract_osm_images():
-    """Read enriched POIs and extract image URLs from OSM tags"""
-    if not os.path.exists(INPUT):
-        print(f"❌ Input file not found: {INPUT}")
-        print("Run enrich_pois.py and utils_geohash.py first")
-        return
+def add_osm_images(poi):
+    """Append image URLs from the POI's OSM tags; returns True if one was added"""
+    tags = poi.get('tags', {})
     
-    with open(INPUT, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Check common OSM image fields
+    img_url = (
+        tags.get('image') or 
+        tags.get('image:url') or 
+        tags.get('photo') or
+        tags.get('wikimedia_commons')
+    )
     
-    images_added = 0
-    for poi in data:
-        tags = poi.get('tags', {})
+    if img_url:
+        if 'images' not in poi:
+            poi['images'] = []
         
-        # Check common OSM image fields
-        img_url = (
-            tags.get('image') or 
-            tags.get('image:url') or 
-            tags.get('photo') or
-            tags.get('wikimedia_commons')
-        )
-        
-        if img_url:
-            if 'images' not in poi:
-                poi['images'] = []
-            
-            # Avoid duplicates
-            if img_url not in poi['images']:
-                poi['images'].append(img_url)
-                images_added += 1
+        # Avoid duplicates
+        if img_url not in poi['images']:
+            poi['images'].append(img_url)
+            return True
+    return False
+
+def extract_osm_images(source=INPUT, target=OUTPUT):
+    """Read enriched POIs and extract image URLs from OSM tags (records are streamed)"""
+    out = console(target)
+    if source != STDIO and not os.path.exists(source):
+        print(f"❌ Input file not found: {source}", file=out)
+        print("Run enrich_pois.py and utils_geohash.py first", file=out)
+        return
+    
+    stats = {'images_added': 0}
+    
+    def process(pois):
+        for poi in pois:
+            if add_osm_images(poi):
+                stats['images_added'] += 1
+            yield poi
     
     # Save output
-    os.makedirs(os.path.dirname(OUTPUT), exist_ok=True)
-    with open(OUTPUT, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    if target != STDIO:
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    total = write_records(target, process(iter_records(source)))
     
-    print(f"✅ Extracted OSM images for {images_added} POIs")
-    print(f"📁 Saved to: {OUTPUT}")
-    print(f"📊 Total POIs: {len(data)}")
+    print(f"✅ Extracted OSM images for {stats['images_added']} POIs", file=out)
+    print(f"📁 Saved to: {target}", file=out)
+    print(f"📊 Total POIs: {total}", file=out)
 
 if __name__ == '__main__':
-    extract_osm_images()
+    # python etl/get_osm_images.py [input] [output]; "-" = NDJSON on stdin/stdout
+    extract_osm_images(*stage_paths(INPUT, OUTPUT))
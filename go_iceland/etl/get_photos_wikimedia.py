@@ -1,105 +1,121 @@
 #!/usr/bin/env python3
 """
 get_photos_wikimedia.py
-Fetches free images from Wikimedia Commons based on POI names
+Fetches free images from Wikimedia Commons for POIs
+
+OSM wikimedia_commons tags and File: entries in images[] are resolved to
+URLs in batches of 50 titles; POIs still short of images get a name
+search, then a geosearch around their coordinates. Commons answers are
+cached in data/.commons_cache.json (see commons.py).
 """
-import json
 import os
-import time
-import requests
-from urllib.parse import quote
+
+from commons import CommonsClient, commons_titles
+from json_io import STDIO, console, iter_records, stage_paths, write_records
+from parallel import chunks
 
 INPUT = './data/iceland_with_osm_images.json'
 OUTPUT = './data/iceland_with_all_images.json'
 
-def fetch_wikimedia_images(name, limit=3):
-    """Search Wikimedia Commons for images matching the POI name"""
-    search_query = f"{name} Iceland"
-    url = (
-        f"https://commons.wikimedia.org/w/api.php"
-        f"?action=query"
-        f"&format=json"
-        f"&generator=search"
-        f"&gsrsearch={quote(search_query)}"
-        f"&gsrlimit={limit}"
-        f"&prop=imageinfo"
-        f"&iiprop=url|size"
-        f"&iiurlwidth=800"
-    )
-    
-    try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        
-        images = []
-        pages = data.get('query', {}).get('pages', {})
-        
-        for page_id, page_data in pages.items():
-            imageinfo = page_data.get('imageinfo', [])
-            if imageinfo:
-                img_url = imageinfo[0].get('url') or imageinfo[0].get('thumburl')
-                if img_url and img_url.startswith('http'):
-                    images.append(img_url)
-        
-        return images
-    
-    except Exception as e:
-        print(f"⚠️  Wikimedia error for '{name}': {e}")
-        return []
+TARGET_IMAGES = 3
+# POIs per batch of title lookups (titles are sent MAX_TITLES per request)
+BATCH_SIZE = 200
+
+def poi_titles(poi):
+    """Commons File: titles referenced by the POI's OSM tag and images[]"""
+    titles = commons_titles((poi.get('tags') or {}).get('wikimedia_commons'))
+    for img in poi.get('images') or []:
+        titles.extend(commons_titles(img))
+    return titles
+
+def fetch_wikimedia_images(client, poi, limit=TARGET_IMAGES):
+    """Commons images for a POI: name search first, nearby geotagged files otherwise"""
+    found = client.search(poi['name'], limit) if poi.get('name') else []
+    if not found and poi.get('lat') is not None and poi.get('lng') is not None:
+        found = client.geosearch(poi['lat'], poi['lng'], limit=limit)
+    return [info['url'] for info in found]
 
-def enrich_with_wikimedia():
-    """Add Wikimedia Commons images to POIs"""
-    if not os.path.exists(INPUT):
-        print(f"❌ Input file not found: {INPUT}")
-        print("Run enrich_pois.py and utils_geohash.py first")
+def add_wikimedia_images(poi, client, resolved):
+    """
+    Swap Commons titles for URLs and top the POI up to TARGET_IMAGES images.
+
+    Returns:
+        Number of images added, or None if the POI needed nothing
+    """
+    images = []
+    added = 0
+    for img in poi.get('images') or []:
+        titles = commons_titles(img)
+        if not titles:
+            images.append(img)
+        for title in titles:
+            info = resolved.get(title)
+            if info:
+                if info['url'] not in images:
+                    images.append(info['url'])
+            elif img not in images:
+                # Not resolved (lookup failed or file missing): keep the entry as it was
+                images.append(img)
+    for title in commons_titles((poi.get('tags') or {}).get('wikimedia_commons')):
+        info = resolved.get(title)
+        if info and info['url'] not in images:
+            images.append(info['url'])
+            added += 1
+
+    if len(images) >= TARGET_IMAGES:
+        poi['images'] = images
+        return added or None
+
+    for url in fetch_wikimedia_images(client, poi):
+        if url not in images:
+            images.append(url)
+            added += 1
+    if images or 'images' in poi:
+        poi['images'] = images
+    return added
+
+def enrich_with_wikimedia(source=INPUT, target=OUTPUT):
+    """Add Wikimedia Commons images to POIs (records are streamed)"""
+    out = console(target)
+    if source != STDIO and not os.path.exists(source):
+        print(f"❌ Input file not found: {source}", file=out)
+        print("Run enrich_pois.py and utils_geohash.py first", file=out)
         return
     
-    with open(INPUT, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    print(f"🔍 Searching Wikimedia Commons for POIs in {source}...", file=out)
+    print("⏳ This may take several minutes...", file=out)
     
-    print(f"🔍 Searching Wikimedia Commons for {len(data)} POIs...")
-    print("⏳ This may take several minutes...")
+    stats = {'enriched': 0}
+    client = CommonsClient()
     
-    enriched = 0
-    for i, poi in enumerate(data):
-        name = poi.get('name', '')
-        
-        # Skip if already has images
-        if poi.get('images') and len(poi['images']) >= 3:
-            continue
-        
-        # Fetch Wikimedia images
-        wikimedia_images = fetch_wikimedia_images(name, limit=3)
-        
-        if wikimedia_images:
-            if 'images' not in poi:
-                poi['images'] = []
-            
-            # Add unique images
-            for img in wikimedia_images:
-                if img not in poi['images']:
-                    poi['images'].append(img)
+    def process(pois):
+        done = 0
+        for batch in chunks(pois, BATCH_SIZE):
+            resolved = client.resolve([t for poi in batch for t in poi_titles(poi)])
+            for poi in batch:
+                done += 1
+                added = add_wikimedia_images(poi, client, resolved)
+                yield poi
+                
+                if added:
+                    stats['enriched'] += 1
+                    print(f"  [{done}] ✅ {poi.get('name', '')}: +{added} images", file=out)
             
-            enriched += 1
-            print(f"  [{i+1}/{len(data)}] ✅ {name}: +{len(wikimedia_images)} images")
-        
-        # Rate limiting
-        time.sleep(0.5)
-        
-        # Progress update every 50 POIs
-        if (i + 1) % 50 == 0:
-            print(f"  Progress: {i+1}/{len(data)} POIs processed ({enriched} enriched)")
+            client.save()
+            print(f"  Progress: {done} POIs processed ({stats['enriched']} enriched, "
+                  f"{client.requests} Commons requests)", file=out)
     
     # Save output
-    os.makedirs(os.path.dirname(OUTPUT), exist_ok=True)
-    with open(OUTPUT, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    if target != STDIO:
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    total = write_records(target, process(iter_records(source)))
     
-    print(f"\n✅ Wikimedia enrichment complete!")
-    print(f"📁 Saved to: {OUTPUT}")
-    print(f"📊 Total POIs: {len(data)}")
-    print(f"🖼️  POIs with new images: {enriched}")
+    print(f"\n✅ Wikimedia enrichment complete!", file=out)
+    print(f"📁 Saved to: {target}", file=out)
+    print(f"📊 Total POIs: {total}", file=out)
+    print(f"🖼️  POIs with new images: {stats['enriched']}", file=out)
+    print(f"🌐 Commons requests: {client.requests}", file=out)
 
 if __name__ == '__main__':
-    enrich_with_wikimedia()
+    # python etl/get_photos_wikimedia.py [input] [output]; "-" = NDJSON on stdin/stdout
+    enrich_with_wikimedia(*stage_paths(INPUT, OUTPUT))
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Image Index
+Liveness checks and near-duplicate detection for place image URLs
+
+Image URLs arrive from OSM tags, Wikimedia, Wikipedia pageimages and
+Pexels unchecked. Every distinct URL gets a HEAD request (bounded
+concurrency, GET fallback for servers that refuse HEAD) recording
+status, content type and length. Live images then have a small
+thumbnail fetched and a 64-bit difference hash (dHash) computed, and
+hashes within HAMMING_THRESHOLD bits are collapsed onto one canonical
+URL (the largest file).
+
+Results are kept per URL in data/.image_index.json and re-checked after
+RECHECK_DAYS, so repeated runs only touch new URLs. Failures that may be
+temporary (timeouts, 429, 5xx, unexpected content types) are recorded but
+retried on the next run.
+
+Records are rewritten with dead URLs (a definite 404 or 410) dropped and
+duplicates replaced by their canonical URL, so the app neither requests
+broken images nor downloads the same photo twice.
+
+Usage:
+    python etl/image_index.py [input] [output]
+    python etl/image_index.py data/iceland_with_all_images.json data/iceland_images_checked.json --workers 32
+"""
+import argparse
+import io
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from json_io import console, iter_records, read_json, write_json, write_records
+
+INPUT = "./data/iceland_with_all_images.json"
+OUTPUT = "./data/iceland_images_checked.json"
+INDEX_FILE = "./data/.image_index.json"
+
+DEFAULT_WORKERS = 16
+RECHECK_DAYS = 30
+THUMB_WIDTH = 320
+# dHash bits that may differ between two copies of the same photo
+HAMMING_THRESHOLD = 6
+USER_AGENT = "GoIceland/1.0 (image index)"
+
+# Servers that reject or ignore HEAD
+_HEAD_REFUSED = {403, 405, 501}
+# The only answers that mean the image is gone for good
+_GONE = {404, 410}
+_COMMONS_FILE = re.compile(r"^(?:File|Image):", re.IGNORECASE)
+_IMAGE_EXT = re.compile(r"\.(jpe?g|png|gif|webp|tiff?|svg)$", re.IGNORECASE)
+
+
+def normalize_url(src):
+    """
+    Fetchable URL for an images[] entry, or None.
+    Bare Commons file names (OSM wikimedia_commons=File:...) go through Special:FilePath.
+    """
+    if not isinstance(src, str):
+        return None
+    src = src.strip()
+    if src.startswith("//"):
+        src = "https:" + src
+    if src.startswith(("http://", "https://")):
+        return src
+    if _COMMONS_FILE.match(src) or _IMAGE_EXT.search(src):
+        name = _COMMONS_FILE.sub("", src).strip().replace(" ", "_")
+        return f"https://commons.wikimedia.org/wiki/Special:FilePath/{quote(name)}"
+    return None
+
+
+def thumbnail_url(url, width=THUMB_WIDTH):
+    """A small rendition of url on hosts that offer one (otherwise url itself)"""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host == "upload.wikimedia.org" and "/thumb/" not in parts.path:
+        # /wikipedia/commons/a/ab/Name.jpg -> /wikipedia/commons/thumb/a/ab/Name.jpg/320px-Name.jpg
+        match = re.match(r"^(/[^/]+/[^/]+)/(\w/\w\w/)([^/]+)$", parts.path)
+        if match and not match.group(3).lower().endswith((".svg", ".tif", ".tiff")):
+            prefix, shard, name = match.groups()
+            return urlunsplit(parts._replace(path=f"{prefix}/thumb/{shard}{name}/{width}px-{name}"))
+    if host == "commons.wikimedia.org" and "/Special:FilePath/" in parts.path:
+        return urlunsplit(parts._replace(query=urlencode({"width": width})))
+    if host in ("images.unsplash.com", "images.pexels.com"):
+        query = dict(parse_qsl(parts.query))
+        query.update({"w": str(width), "fm": "jpg"} if host == "images.unsplash.com" else {"w": str(width)})
+        return urlunsplit(parts._replace(query=urlencode(query)))
+    return url
+
+
+def dhash(image):
+    """64-bit difference hash: horizontal gradient signs of a 9x8 grayscale"""
+    small = image.convert("L").resize((9, 8), Image.LANCZOS)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def _bands(bits, count):
+    """Split a 64-bit hash into `count` (band index, value) pieces"""
+    width = 64 // count
+    for i in range(count):
+        size = width if i < count - 1 else 64 - width * (count - 1)
+        yield i, (bits >> (width * i)) & ((1 << size) - 1)
+
+
+class ImageIndex:
+    """url -> {"status", "ok", "dead", "type", "length", "final", "checked", "phash"}"""
+
+    def __init__(self, entries=None, path=INDEX_FILE):
+        self.entries = entries or {}
+        self.path = path
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        entries = read_json(path) if os.path.exists(path) else {}
+        return cls(entries, path)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        write_json(self.path, self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, url):
+        return self.entries.get(url)
+
+    def stale(self, url, max_age_days=RECHECK_DAYS):
+        """Never checked, checked too long ago, or last check failed transiently"""
+        entry = self.entries.get(url)
+        if entry is None or not (entry.get("ok") or entry.get("dead")):
+            return True
+        return time.time() - entry.get("checked", 0) > max_age_days * 86400
+
+    # -- checking -----------------------------------------------------------
+
+    def _head(self, session, url):
+        entry = {"checked": int(time.time())}
+        try:
+            response = session.head(url, allow_redirects=True, timeout=15)
+            if response.status_code in _HEAD_REFUSED or not response.headers.get("Content-Type"):
+                response = session.get(url, allow_redirects=True, timeout=15, stream=True)
+                response.close()
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            length = response.headers.get("Content-Length")
+            entry.update({
+                "status": response.status_code,
+                "ok": 200 <= response.status_code < 300 and content_type.startswith("image/"),
+                "dead": response.status_code in _GONE,
+                "type": content_type or None,
+                "length": int(length) if length and length.isdigit() else None,
+                "final": response.url if response.url != url else None,
+            })
+        except Exception as e:
+            entry.update({"status": None, "ok": False, "dead": False, "error": type(e).__name__})
+        previous = self.entries.get(url) or {}
+        if not (entry["ok"] or entry["dead"]) and previous.get("ok"):
+            # Transient failure: keep the last good result, retry next run
+            entry = {**previous, "retry": entry.get("status") or entry.get("error")}
+            entry.pop("checked", None)
+        if entry["ok"] and previous.get("phash") and previous.get("length") == entry["length"]:
+            entry["phash"] = previous["phash"]
+        with self._lock:
+            self.entries[url] = entry
+        return entry
+
+    def _hash(self, session, url):
+        entry = self.entries[url]
+        try:
+            response = session.get(thumbnail_url(entry.get("final") or url), timeout=30)
+            response.raise_for_status()
+            image = Image.open(io.BytesIO(response.content))
+            entry["phash"] = f"{dhash(image):016x}"
+        except Exception as e:
+            entry["phash_error"] = type(e).__name__
+
+    def check(self, urls, workers=DEFAULT_WORKERS, session=None, max_age_days=RECHECK_DAYS, out=None):
+        """
+        HEAD-check stale URLs, then hash live ones that have no phash yet.
+
+        Returns:
+            (checked, hashed)
+        """
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        session.headers.setdefault("User-Agent", USER_AGENT)
+
+        todo = [url for url in dict.fromkeys(urls) if self.stale(url, max_age_days)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for i, _ in enumerate(pool.map(lambda url: self._head(session, url), todo), 1):
+                if i % 500 == 0:
+                    print(f"   [{i}/{len(todo)}] checked", file=out)
+
+            to_hash = []
+            if Image is not None:
+                to_hash = [url for url in todo if self.entries[url].get("ok") and not self.entries[url].get("phash")]
+                list(pool.map(lambda url: self._hash(session, url), to_hash))
+        return len(todo), len(to_hash)
+
+    # -- duplicates ---------------------------------------------------------
+
+    def duplicates(self, threshold=HAMMING_THRESHOLD, urls=None):
+        """
+        {url: canonical url} for every live URL whose hash is within
+        threshold bits of another. The canonical URL of a group is its
+        largest file.
+
+        Candidates come from multi-index hashing: split into threshold+1
+        bands, any two hashes within threshold bits agree exactly on at
+        least one band, so only URLs sharing a band are compared.
+        """
+        hashed = [
+            (url, int(entry["phash"], 16))
+            for url, entry in self.entries.items()
+            if entry.get("ok") and entry.get("phash") and (urls is None or url in urls)
+        ]
+        band_count = threshold + 1
+        buckets = {}
+        for i, (_, bits) in enumerate(hashed):
+            for band in _bands(bits, band_count):
+                buckets.setdefault(band, []).append(i)
+
+        parent = list(range(len(hashed)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for members in buckets.values():
+            for a_pos, a in enumerate(members):
+                for b in members[a_pos + 1:]:
+                    ra, rb = find(a), find(b)
+                    if ra != rb and hamming(hashed[a][1], hashed[b][1]) <= threshold:
+                        parent[rb] = ra
+
+        groups = {}
+        for i in range(len(hashed)):
+            groups.setdefault(find(i), []).append(hashed[i][0])
+
+        canonical = {}
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            best = max(members, key=lambda url: self.entries[url].get("length") or 0)
+            for url in members:
+                if url != best:
+                    canonical[url] = best
+        return canonical
+
+    def clean(self, record, canonical):
+        """
+        Drop dead (404/410) image URLs and map duplicates to their canonical
+        URL (images[] and media.images[]). Unchecked URLs and transient
+        failures are kept.
+
+        Returns:
+            (removed, replaced)
+        """
+        removed = replaced = 0
+        media = record.get("media") if isinstance(record.get("media"), dict) else {}
+        for holder in (record, media):
+            images = holder.get("images")
+            if not isinstance(images, list):
+                continue
+            kept = []
+            for src in images:
+                url = normalize_url(src)
+                entry = self.entries.get(url) if url else None
+                if entry is not None and entry.get("dead"):
+                    removed += 1
+                    continue
+                if url in canonical:
+                    src = canonical[url]
+                    replaced += 1
+                if src not in kept:
+                    kept.append(src)
+                else:
+                    removed += 1
+            holder["images"] = kept
+        return removed, replaced
+
+
+def record_urls(record):
+    media = record.get("media") if isinstance(record.get("media"), dict) else {}
+    for src in (record.get("images") or []) + (media.get("images") or []):
+        url = normalize_url(src)
+        if url:
+            yield url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check image URLs and collapse near-duplicates")
+    parser.add_argument("input", nargs="?", default=INPUT)
+    parser.add_argument("output", nargs="?", default=OUTPUT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent requests")
+    parser.add_argument("--threshold", type=int, default=HAMMING_THRESHOLD, help="Max dHash bit difference")
+    parser.add_argument("--max-age", type=int, default=RECHECK_DAYS, help="Re-check URLs older than N days")
+    parser.add_argument("--index", default=INDEX_FILE)
+    args = parser.parse_args()
+
+    out = console(args.output)
+    records = list(iter_records(args.input))
+    urls = list(dict.fromkeys(url for record in records for url in record_urls(record)))
+    index = ImageIndex.load(args.index)
+    print(f"🔎 {len(records)} records, {len(urls)} distinct image URLs ({len(index)} indexed)", file=out)
+
+    checked, hashed = index.check(urls, args.workers, max_age_days=args.max_age, out=out)
+    index.save()
+    canonical = index.duplicates(args.threshold, urls=set(urls))
+
+    removed = replaced = 0
+    for record in records:
+        r, c = index.clean(record, canonical)
+        removed += r
+        replaced += c
+    write_records(args.output, records)
+
+    dead = sum(1 for url in urls if (index.get(url) or {}).get("dead"))
+    retry = sum(1 for url in urls if index.stale(url, args.max_age))
+    print(f"✅ {checked} checked, {hashed} hashed: {dead} dead URLs, {retry} to retry, "
+          f"{len(canonical)} duplicates -> {len(set(canonical.values()))} canonical", file=out)
+    print(f"   {removed} image entries removed, {replaced} replaced -> {args.output}", file=out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Image Variants
+Thumbnail / card / hero variants and blurhash placeholders for place images
+
+Every distinct image URL in the dataset (images[] and media.images[]) is
+fetched once, decoded once, and resized to each VARIANTS width (never
+upscaled) as WebP, plus AVIF when Pillow supports it. A blurhash string
+is computed from the same decode. Downloads run on a thread pool and the
+decode/resize/encode work on parallel_map's process pool.
+
+Records keep images[] as plain URLs (the app reads them as strings) and
+gain an image_variants[] list aligned with it (with media.images[] when
+there is no images[]): image_variants[i] is the entry for images[i], or
+null when that image could not be fetched or decoded. Each entry:
+
+    {"src": "<original url>", "width": 3000, "height": 2000, "blurhash": "LEHV6n...",
+     "variants": {"thumb": {"width": 240, "height": 160, "webp": ".../thumb.webp", "avif": ...},
+                  "card": {...}, "hero": {...}}}
+
+and media.thumbnail is filled from the first available thumb when
+missing. The app loads these as network URLs, so --base-url (where
+--output-dir is published) is required. Results are remembered per source URL in
+data/.image_variants.json, so re-runs only touch new images.
+
+Usage:
+    python etl/image_variants.py data/firestore_top_places.json data/firestore_top_places_variants.json \
+        --base-url https://storage.googleapis.com/go-iceland.firebasestorage.app/images
+    python firebase/storage_uploader.py images/ images/        # then publish the files
+"""
+import argparse
+import hashlib
+import io
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+from json_io import read_json, write_json
+from parallel import parallel_map
+
+OUTPUT_DIR = "./images"
+MANIFEST = "./data/.image_variants.json"
+
+# Variant name -> max width in px
+VARIANTS = {"thumb": 240, "card": 640, "hero": 1600}
+QUALITY = {"webp": 78, "avif": 55}
+DOWNLOAD_WORKERS = 16
+BATCH_SIZE = 200
+USER_AGENT = "GoIceland/1.0 (image variants)"
+
+
+def image_formats():
+    formats = ["webp"]
+    if Image is not None and features.check("avif"):
+        formats.append("avif")
+    return formats
+
+
+# ---------------------------------------------------------------------------
+# Blurhash (https://blurha.sh) - small pure-Python encoder
+# ---------------------------------------------------------------------------
+
+_BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+_SRGB_TO_LINEAR = [
+    (v / 255) / 12.92 if v / 255 <= 0.04045 else ((v / 255 + 0.055) / 1.055) ** 2.4 for v in range(256)
+]
+
+
+def _base83(value, length):
+    return "".join(_BASE83[(value // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+
+def _to_srgb(value):
+    v = max(0.0, min(1.0, value))
+    v = v * 12.92 if v <= 0.0031308 else 1.055 * v ** (1 / 2.4) - 0.055
+    return int(v * 255 + 0.5)
+
+
+def _sign_pow(value, exp):
+    return math.copysign(abs(value) ** exp, value)
+
+
+def blurhash(image, x_components=4, y_components=3):
+    """Blurhash string for a PIL image (computed on a 32px-wide copy)"""
+    small = image.convert("RGB")
+    small.thumbnail((32, 32))
+    width, height = small.size
+    raw = [_SRGB_TO_LINEAR[c] for c in small.tobytes()]
+    pixels = list(zip(raw[0::3], raw[1::3], raw[2::3]))
+
+    factors = []
+    for j in range(y_components):
+        cos_y = [math.cos(math.pi * j * y / height) for y in range(height)]
+        for i in range(x_components):
+            cos_x = [math.cos(math.pi * i * x / width) for x in range(width)]
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width
+                for x in range(width):
+                    basis = cos_x[x] * cos_y[y]
+                    pr, pg, pb = pixels[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = (1 if i == 0 and j == 0 else 2) / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+    if ac:
+        quantised = max(0, min(82, int(max(abs(c) for f in ac for c in f) * 166 - 0.5)))
+        max_value = (quantised + 1) / 166
+    else:
+        quantised, max_value = 0, 1
+    result += _base83(quantised, 1)
+    result += _base83((_to_srgb(dc[0]) << 16) + (_to_srgb(dc[1]) << 8) + _to_srgb(dc[2]), 4)
+    for f in ac:
+        q = [max(0, min(18, int(_sign_pow(c / max_value, 0.5) * 9 + 9.5))) for c in f]
+        result += _base83(q[0] * 19 * 19 + q[1] * 19 + q[2], 2)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Processing
+# ---------------------------------------------------------------------------
+
+def image_key(src):
+    return hashlib.sha1(src.encode("utf-8")).hexdigest()[:16]
+
+
+def process_image(item, output_dir=OUTPUT_DIR, base_url=None, formats=("webp",)):
+    """
+    Decode one image and write its variants (runs in a worker process).
+
+    Args:
+        item: (src, raw bytes)
+
+    Returns:
+        image_variants entry, or {"src", "error"}
+    """
+    src, data = item
+    try:
+        image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    except Exception as e:
+        return {"src": src, "error": f"decode failed: {e}"}
+
+    key = image_key(src)
+    folder = os.path.join(output_dir, key)
+    os.makedirs(folder, exist_ok=True)
+    prefix = f"{base_url.rstrip('/')}/{key}" if base_url else folder.replace(os.sep, "/")
+
+    entry = {"src": src, "width": image.width, "height": image.height, "blurhash": blurhash(image), "variants": {}}
+    previous = None
+    for name, max_width in VARIANTS.items():
+        width = min(max_width, image.width)
+        if previous and previous["width"] == width:
+            # Source is narrower than this size: same file as the previous variant
+            entry["variants"][name] = previous
+            continue
+        variant = image.copy()
+        variant.thumbnail((width, image.height), Image.LANCZOS)
+        info = {"width": variant.width, "height": variant.height}
+        for fmt in formats:
+            path = os.path.join(folder, f"{name}.{fmt}")
+            variant.save(path, fmt.upper(), quality=QUALITY[fmt])
+            info[fmt] = f"{prefix}/{name}.{fmt}"
+        entry["variants"][name] = previous = info
+    return entry
+
+
+def fetch(src, session=None, assets_dir="."):
+    """(src, bytes or the exception); non-URL entries are read from assets_dir"""
+    try:
+        if not src.startswith(("http://", "https://")):
+            path = src if os.path.isabs(src) else os.path.join(assets_dir, src)
+            with open(path, "rb") as f:
+                return src, f.read()
+        response = session.get(src, timeout=30, headers={"User-Agent": USER_AGENT})
+        response.raise_for_status()
+        return src, response.content
+    except Exception as e:
+        return src, e
+
+
+def _record_images(record):
+    media = record.get("media") if isinstance(record.get("media"), dict) else {}
+    seen = []
+    for src in (record.get("images") or []) + (media.get("images") or []):
+        if isinstance(src, str) and src and src not in seen:
+            seen.append(src)
+    return seen
+
+
+def _aligned_images(record):
+    """The list image_variants[] lines up with: images[], else media.images[]"""
+    media = record.get("media") if isinstance(record.get("media"), dict) else {}
+    return record.get("images") or media.get("images") or []
+
+
+def build_variants(sources, manifest, output_dir=OUTPUT_DIR, base_url=None, assets_dir=".", workers=None):
+    """
+    Fill manifest {src: entry} for every source not already in it.
+
+    Returns:
+        (processed, failed)
+    """
+    todo = [src for src in sources if src not in manifest or "error" in manifest[src]]
+    if not todo:
+        return 0, 0
+    formats = image_formats()
+    work = partial(process_image, output_dir=output_dir, base_url=base_url, formats=formats)
+    session = None
+    if any(src.startswith(("http://", "https://")) for src in todo):
+        import requests
+        session = requests.Session()
+
+    processed = failed = 0
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+        for start in range(0, len(todo), BATCH_SIZE):
+            batch = todo[start:start + BATCH_SIZE]
+            fetched = list(pool.map(partial(fetch, session=session, assets_dir=assets_dir), batch))
+            ok = [(src, data) for src, data in fetched if isinstance(data, bytes)]
+            for src, data in fetched:
+                if not isinstance(data, bytes):
+                    manifest[src] = {"src": src, "error": f"fetch failed: {data}"}
+                    failed += 1
+            for entry in parallel_map(work, ok, workers, chunk_size=4):
+                manifest[entry["src"]] = entry
+                if "error" in entry:
+                    failed += 1
+                else:
+                    processed += 1
+            print(f"   [{min(start + BATCH_SIZE, len(todo))}/{len(todo)}] {processed} processed, {failed} failed")
+    return processed, failed
+
+
+def attach_variants(records, manifest):
+    """Add image_variants[] (and media.thumbnail) to each record; returns records updated"""
+    updated = 0
+    for record in records:
+        entries = [
+            manifest[src] if isinstance(src, str) and "variants" in manifest.get(src, {}) else None
+            for src in _aligned_images(record)
+        ]
+        first = next((entry for entry in entries if entry), None)
+        if first is None:
+            continue
+        # Failed images stay as null so image_variants[i] still matches images[i]
+        record["image_variants"] = entries
+        media = record.get("media")
+        thumb = first["variants"]["thumb"].get("webp") or ""
+        # Local paths (variants built without a base URL) are not loadable by the app
+        if isinstance(media, dict) and not media.get("thumbnail") and thumb.startswith(("http://", "https://")):
+            media["thumbnail"] = thumb
+        updated += 1
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate responsive image variants + blurhash for place images")
+    parser.add_argument("input", help="Dataset JSON (list or {\"places\": [...]})")
+    parser.add_argument("output", help="Output dataset JSON")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="Where variant files are written")
+    parser.add_argument("--base-url", required=True,
+                        help="Public URL prefix the files in --output-dir are served from (written into records)")
+    parser.add_argument("--assets", default=".", help="Directory for non-URL image entries")
+    parser.add_argument("--manifest", default=MANIFEST)
+    parser.add_argument("--workers", type=int, help="Decode/resize processes")
+    args = parser.parse_args()
+
+    if Image is None:
+        print("❌ Pillow is required: pip install Pillow")
+        return
+
+    data = read_json(args.input)
+    records = data.get("places", []) if isinstance(data, dict) and "places" in data else data
+    if isinstance(records, dict):
+        records = list(records.values())
+
+    sources = list(dict.fromkeys(src for record in records for src in _record_images(record)))
+    manifest = read_json(args.manifest) if os.path.exists(args.manifest) else {}
+    print(f"🖼️  {len(records)} records, {len(sources)} distinct images ({', '.join(image_formats())})")
+
+    processed, failed = build_variants(sources, manifest, args.output_dir, args.base_url, args.assets, args.workers)
+    os.makedirs(os.path.dirname(args.manifest) or ".", exist_ok=True)
+    write_json(args.manifest, manifest)
+
+    updated = attach_variants(records, manifest)
+    write_json(args.output, data)
+    print(f"✅ {processed} processed, {failed} failed, {updated} records with variants -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
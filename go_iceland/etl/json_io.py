@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - JSON I/O
+Shared reader/writer for the data/ artifacts
+
+- Uses orjson when installed (several times faster), stdlib json otherwise
+- Writes compact JSON by default; set PRETTY_JSON=1 or pass pretty=True for indented output
+- *.ndjson paths are read and written as one record per line
+- write_records() streams from any iterable, so a stage never has to hold
+  its whole output in memory just to serialize it
+- "-" as a path means NDJSON on stdin/stdout, so stages can be piped:
+
+    python etl/enrich_pois.py data/iceland_raw.json - | python etl/utils_geohash.py - out.ndjson
+
+Usage:
+    from json_io import read_json, iter_records, write_json, write_records
+
+    places = read_json("data/iceland_clean.json")
+    write_records("data/iceland_clean_geohash.json", (add_geohash(p) for p in places))
+"""
+import json
+import os
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+STDIO = "-"
+
+
+def pretty_default():
+    return os.getenv("PRETTY_JSON", "").lower() in ("1", "true", "yes")
+
+
+def is_ndjson(path):
+    return path == STDIO or str(path).endswith(".ndjson")
+
+
+def stage_paths(default_input, default_output):
+    """[input] [output] from the command line, falling back to the stage defaults"""
+    args = sys.argv[1:3]
+    source = args[0] if len(args) > 0 else default_input
+    target = args[1] if len(args) > 1 else default_output
+    return source, target
+
+
+def console(target):
+    """Where a stage should print progress: stderr while stdout carries records"""
+    return sys.stderr if target == STDIO else sys.stdout
+
+
+def encode(obj, pretty=False):
+    """Serialize to UTF-8 bytes (non-ASCII kept as-is, like ensure_ascii=False)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode(data):
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iter_records(path):
+    """
+    Yield records from a JSON array or an NDJSON file.
+
+    NDJSON (and stdin) is read line by line; a JSON array still has to be
+    parsed whole.
+    """
+    if path == STDIO:
+        for line in sys.stdin.buffer:
+            if line.strip():
+                yield decode(line)
+    elif is_ndjson(path):
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield decode(line)
+    else:
+        yield from read_json(path)
+
+
+def read_json(path):
+    """Load a JSON document, or an NDJSON file as a list"""
+    if is_ndjson(path):
+        return list(iter_records(path))
+    with open(path, "rb") as f:
+        return decode(f.read())
+
+
+def write_records(path, records, pretty=None):
+    """
+    Stream records to path as a JSON array (or NDJSON for *.ndjson paths).
+
+    The file is written next to the target and moved into place at the end,
+    so a failed run never leaves a truncated artifact behind.
+
+    Args:
+        path: Output path
+        records: Any iterable of JSON-serializable records (a generator is fine)
+        pretty: Indent output (default: PRETTY_JSON env var)
+
+    Returns:
+        Number of records written
+    """
+    if path == STDIO:
+        out = sys.stdout.buffer
+        count = 0
+        for record in records:
+            out.write(encode(record))
+            out.write(b"\n")
+            count += 1
+        out.flush()
+        return count
+
+    pretty = pretty_default() if pretty is None else pretty
+    ndjson = is_ndjson(path)
+    tmp_path = f"{path}.tmp"
+    count = 0
+
+    with open(tmp_path, "wb") as f:
+        if not ndjson:
+            f.write(b"[")
+        for record in records:
+            if ndjson:
+                f.write(encode(record))
+                f.write(b"\n")
+            else:
+                f.write(b"," if count else b"")
+                if pretty:
+                    # Nest the record one level under the array
+                    f.write(b"\n  " + encode(record, pretty=True).replace(b"\n", b"\n  "))
+                else:
+                    f.write(encode(record))
+            count += 1
+        if not ndjson:
+            f.write(b"\n]\n" if pretty and count else b"]\n")
+
+    os.replace(tmp_path, path)
+    return count
+
+
+def write_json(path, data, pretty=None):
+    """Write a whole document; lists go through write_records"""
+    if isinstance(data, list):
+        return write_records(path, data, pretty)
+
+    pretty = pretty_default() if pretty is None else pretty
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode(data, pretty))
+        f.write(b"\n")
+    os.replace(tmp_path, path)
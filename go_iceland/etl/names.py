@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Name Normalization
+Icelandic-aware place name keys and hash-based name matching
+
+Names are folded (þ -> th, ð -> d, æ -> ae, ö -> o, accents dropped),
+tokenized, English generic words are dropped ("Skógafoss waterfall") and
+a generic Icelandic suffix is split off into its own canonical token, so
+inflected and ASCII spellings share one key:
+
+    name_tokens("Hraunfossar")          -> ("hraun", "foss")
+    name_tokens("Vatnajökli")           -> ("vatna", "jokull")
+    name_tokens("Thingvellir")          -> ("thingvellir",)
+    name_tokens("Lake Mývatn")          -> ("myvatn",)
+
+Results are memoized in a bounded LRU cache (NAME_CACHE_SIZE), since the
+same names are normalized over and over across stages.
+
+NameMatcher replaces `any(f in name for f in famous)` loops: patterns are
+stored under their token keys and a name is matched by looking up its
+contiguous token windows, i.e. a handful of dict lookups per name.
+
+Usage:
+    FAMOUS = NameMatcher(["Gullfoss", "Jökulsárlón", "Þingvellir"])
+    FAMOUS.match("Hótel Gullfoss")      # -> "Gullfoss"
+    wiki_title("Hraunfossar / Barnafoss")
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from urllib.parse import quote
+
+NAME_CACHE_SIZE = 65536
+
+# Letters NFKD does not decompose
+_FOLD = str.maketrans({"þ": "th", "ð": "d", "æ": "ae", "ö": "o", "ø": "o", "œ": "oe", "ß": "ss"})
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# English words that only restate the category
+GENERIC_WORDS = frozenset({"waterfall", "waterfalls", "falls", "glacier", "lake", "volcano", "crater", "canyon"})
+
+# Canonical suffix -> folded spellings (inflections included), longest first
+GENERIC_SUFFIXES = {
+    "foss": ("fossum", "fossar", "fossa", "fossi", "foss"),
+    "jokull": ("jokull", "jokuls", "jokli", "jokul"),
+    "fjordur": ("fjordur", "fjardar", "fjord", "firdi"),
+    "fjall": ("fjalli", "fjalls", "fjall", "fjoll"),
+    "vatn": ("vatns", "vatni", "vatn"),
+    "laug": ("laugar", "laug"),
+    "fell": ("fells", "felli", "fell"),
+    "lon": ("loni", "lons", "lon"),
+}
+_SUFFIXES = sorted(
+    ((spelling, canonical) for canonical, spellings in GENERIC_SUFFIXES.items() for spelling in spellings),
+    key=lambda x: -len(x[0]),
+)
+MIN_STEM = 3
+
+
+def fold(text):
+    """Lower-case ASCII folding with Icelandic letters spelled out"""
+    text = text.lower().translate(_FOLD)
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return _TOKEN.findall(fold(text))
+
+
+def split_suffix(token):
+    """("hraunfossar") -> ("hraun", "foss"); tokens without a generic suffix unchanged"""
+    for spelling, canonical in _SUFFIXES:
+        if token.endswith(spelling) and len(token) - len(spelling) >= MIN_STEM:
+            return token[:-len(spelling)], canonical
+        if token == spelling:
+            return (canonical,)
+    return (token,)
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def name_tokens(name):
+    """Normalized match key for a place name, as a tuple of tokens"""
+    tokens = []
+    for token in tokenize(name or ""):
+        if token not in GENERIC_WORDS:
+            tokens.extend(split_suffix(token))
+    return tuple(tokens)
+
+
+def name_key(name):
+    return " ".join(name_tokens(name))
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def wiki_title(name):
+    """Wikipedia page title for a place name, URL-quoted for the REST API"""
+    title = " ".join((name or "").split())
+    title = title[:1].upper() + title[1:]
+    return quote(title.replace(" ", "_"), safe="_()',-.")
+
+
+def _windows(tokens, max_len):
+    """Contiguous token windows, longest first"""
+    for size in range(min(len(tokens), max_len), 0, -1):
+        for start in range(len(tokens) - size + 1):
+            yield tokens[start:start + size]
+
+
+class NameMatcher:
+    """
+    Patterns keyed by name_tokens(); a name matches a pattern whose tokens
+    appear contiguously in it (exact names first).
+
+    With partial=True, match() also accepts a pattern that *contains* the
+    name ("Gullfoss" -> "Hótel Gullfoss" when there is no exact Gullfoss).
+    """
+
+    def __init__(self, patterns=(), partial=False):
+        self.exact = {}
+        self.contained = {}
+        self.partial = partial
+        self.max_len = 1
+        items = patterns.items() if isinstance(patterns, dict) else patterns
+        for item in items:
+            name, value = item if isinstance(item, tuple) else (item, item)
+            self.add(name, value)
+
+    def __len__(self):
+        return len(self.exact)
+
+    def add(self, name, value=None):
+        tokens = name_tokens(name)
+        if not tokens:
+            return
+        self.exact.setdefault(tokens, name if value is None else value)
+        self.max_len = max(self.max_len, len(tokens))
+        if self.partial:
+            for window in _windows(tokens, len(tokens)):
+                self.contained.setdefault(window, self.exact[tokens])
+
+    def match(self, name):
+        """Value of the best pattern for name, or None"""
+        tokens = name_tokens(name)
+        if not tokens:
+            return None
+        if tokens in self.exact:
+            return self.exact[tokens]
+        for window in _windows(tokens, self.max_len):
+            # A bare "foss"/"vatn" inside a longer name is not a match
+            if window in self.exact and not (len(window) == 1 and window[0] in GENERIC_SUFFIXES):
+                return self.exact[window]
+        return self.contained.get(tokens)
+
+    def __contains__(self, name):
+        return self.match(name) is not None
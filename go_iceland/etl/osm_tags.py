@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - OSM Tag Dictionary
+Interned key/value vocabulary for the raw OSM `tags` on every POI
+
+The same keys (tourism, natural, name:en, wheelchair, ...) and values
+(yes, viewpoint, ...) repeat on thousands of records. Each distinct string
+is stored once in a vocabulary, and a record's tags become a flat array of
+integer codes [key, value, key, value, ...].
+
+Persisted format (a JSON document, like the master {"places": [...]} files):
+    {"tag_vocabulary": ["tourism", "viewpoint", ...],
+     "places": [{..., "tags": [0, 1, ...]}, ...]}
+
+Usage:
+    vocab = TagVocabulary()
+    poi["tags"] = vocab.encode(element.get("tags", {}))
+    write_tagged("data/iceland_places_raw.json", places, vocab)
+
+    places = read_places("data/iceland_places_raw.json")   # tags as plain dicts
+"""
+import sys
+from array import array
+
+from json_io import STDIO, is_ndjson, iter_records, read_json, write_json
+
+VOCABULARY_KEY = "tag_vocabulary"
+
+
+class TagVocabulary:
+    """Bidirectional string <-> int table; each string is interned once"""
+
+    def __init__(self, strings=()):
+        self.strings = []
+        self.codes = {}
+        for s in strings:
+            self.code(s)
+
+    def __len__(self):
+        return len(self.strings)
+
+    def code(self, s):
+        code = self.codes.get(s)
+        if code is None:
+            code = len(self.strings)
+            s = sys.intern(s)
+            self.strings.append(s)
+            self.codes[s] = code
+        return code
+
+    def encode(self, tags):
+        """Tag dict -> array of codes [k0, v0, k1, v1, ...]"""
+        codes = array("I")
+        for key, value in tags.items():
+            codes.append(self.code(key))
+            codes.append(self.code(str(value)))
+        return codes
+
+    def decode(self, codes):
+        """Codes -> plain tag dict (a dict passes through unchanged)"""
+        if isinstance(codes, dict):
+            return codes
+        strings = self.strings
+        return {strings[codes[i]]: strings[codes[i + 1]] for i in range(0, len(codes), 2)}
+
+
+def write_tagged(path, places, vocab, pretty=None):
+    """Persist places with integer-coded tags plus the vocabulary"""
+    def records():
+        for place in places:
+            if isinstance(place.get("tags"), array):
+                place = {**place, "tags": place["tags"].tolist()}
+            yield place
+
+    write_json(path, {VOCABULARY_KEY: vocab.strings, "places": list(records())}, pretty)
+
+
+def read_tagged(path):
+    """
+    Load (vocabulary, places) without decoding tags.
+
+    Plain lists (the older format) load with an empty vocabulary and dict tags,
+    which TagVocabulary.decode passes through.
+    """
+    data = read_json(path)
+    if isinstance(data, dict) and VOCABULARY_KEY in data:
+        return TagVocabulary(data[VOCABULARY_KEY]), data["places"]
+    if isinstance(data, dict):
+        return TagVocabulary(), data.get("places", [data])
+    return TagVocabulary(), data
+
+
+def iter_places(path, decode_tags=True):
+    """
+    Yield places from a tag-coded document, a plain list or an NDJSON stream.
+
+    Args:
+        decode_tags: Turn coded tags back into plain dicts
+    """
+    if path == STDIO or is_ndjson(path):
+        yield from iter_records(path)
+        return
+
+    vocab, places = read_tagged(path)
+    for place in places:
+        if decode_tags and "tags" in place:
+            place["tags"] = vocab.decode(place["tags"])
+        yield place
+
+
+def read_places(path):
+    """All places with tags decoded to plain dicts"""
+    return list(iter_places(path))
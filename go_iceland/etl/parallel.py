@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Parallel Map
+Runs a pure per-record function over POI records on all CPU cores
+
+Records are sent to worker processes in chunks and results come back in
+input order. Only a few chunks are in flight at a time, so a generator
+input stays a stream and memory stays flat.
+
+The function must be defined at module top level (it is pickled by name),
+and the calling script needs the usual `if __name__ == "__main__":` guard.
+
+Environment:
+    ETL_WORKERS     Worker processes (default: CPU count; 1 = run inline)
+
+Usage:
+    from parallel import parallel_map
+    clean = list(parallel_map(clean_poi, raw))
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def default_workers():
+    return int(os.getenv("ETL_WORKERS", os.cpu_count() or 1))
+
+
+def chunks(records, size):
+    """Split any iterable into lists of up to size records"""
+    it = iter(records)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _apply(func, chunk):
+    return [func(record) for record in chunk]
+
+
+def parallel_map(func, records, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Ordered, lazy map of func over records using a process pool.
+
+    Args:
+        func: Top-level function taking and returning one record
+        records: Any iterable (a generator is fine)
+        workers: Worker processes (default: ETL_WORKERS or CPU count)
+        chunk_size: Records per task; larger chunks mean less IPC overhead
+
+    Yields:
+        func(record) for every record, in input order
+    """
+    workers = workers or default_workers()
+    batches = chunks(records, chunk_size)
+    head = list(islice(batches, 2))
+    batches = chain(head, batches)
+
+    # Not worth starting processes for a single chunk
+    if workers <= 1 or len(head) < 2:
+        for chunk in batches:
+            yield from _apply(func, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for chunk in batches:
+            pending.append(pool.submit(_apply, func, chunk))
+            # Keep every worker busy plus one chunk queued each, then drain in order
+            if len(pending) >= workers * 2:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
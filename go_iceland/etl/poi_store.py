@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Columnar POI Store
+Parquet storage for POI datasets with typed columns, projection and pushdown
+
+Typed columns:   id, name, category, region, lat, lng, geohash, image_count
+JSON columns:    images, content, description, extra (every other field)
+
+lat/lng are filled from whichever coordinate shape the record uses (lat,
+latitude, lon, coordinates.lat, ...), so every row can be filtered on
+them; a column the record did not have as a key is listed under
+"_derived" in extra and left out again on export, so JSON -> Parquet ->
+JSON gives back the same records.
+
+Readers ask for the columns they need and filter on typed columns, so a
+checker that only looks at images and content never decodes the rest.
+
+Usage:
+    python etl/poi_store.py import data/iceland_clean_geohash.json
+    python etl/poi_store.py export data/iceland_clean_geohash.parquet out.json
+
+    from poi_store import read_store
+    places = read_store("data/iceland_clean_geohash.parquet",
+                        columns=["name", "images"],
+                        filters=[("category", "=", "waterfall"), ("image_count", "=", 0)])
+
+Requires: pyarrow (pip install pyarrow)
+"""
+import json
+import os
+import sys
+
+from json_io import read_json, write_records
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+TYPED_FIELDS = ["id", "name", "category", "region", "geohash"]
+JSON_FIELDS = ["images", "content", "description"]
+COORDINATE_FIELDS = {"lat", "lng"}
+# extra key listing coordinate columns filled from another shape
+DERIVED_KEY = "_derived"
+
+# Rows per row group; small enough that region/category pushdown can skip groups
+ROW_GROUP_SIZE = 2000
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for the columnar store: pip install pyarrow")
+
+
+def schema():
+    _require_pyarrow()
+    return pa.schema([
+        ("id", pa.string()),
+        ("name", pa.string()),
+        ("category", pa.dictionary(pa.int16(), pa.string())),
+        ("region", pa.dictionary(pa.int16(), pa.string())),
+        ("lat", pa.float64()),
+        ("lng", pa.float64()),
+        ("geohash", pa.string()),
+        ("image_count", pa.int32()),
+        ("images", pa.string()),
+        ("content", pa.string()),
+        ("description", pa.string()),
+        ("extra", pa.string()),
+    ])
+
+
+def _coordinates(record):
+    """lat/lng from any of the shapes used across the pipeline"""
+    coords = record.get("coordinates") or {}
+    lat = record.get("lat", record.get("latitude", coords.get("lat")))
+    lng = record.get("lng", record.get("lon", record.get("longitude", coords.get("lng"))))
+    return lat, lng
+
+
+def _str(value):
+    return None if value is None else str(value)
+
+
+def to_row(record):
+    """Split a POI dict into typed and JSON-encoded columns"""
+    lat, lng = _coordinates(record)
+    row = {field: _str(record.get(field)) for field in TYPED_FIELDS}
+    row["lat"] = lat
+    row["lng"] = lng
+    row["image_count"] = len(record.get("images") or [])
+    for field in JSON_FIELDS:
+        # "null" keeps explicit nulls apart from absent fields
+        row[field] = json.dumps(record[field], ensure_ascii=False) if field in record else None
+
+    known = set(TYPED_FIELDS) | set(JSON_FIELDS) | COORDINATE_FIELDS
+    extra = {k: v for k, v in record.items() if k not in known}
+    derived = [field for field in ("lat", "lng") if field not in record and row[field] is not None]
+    if derived:
+        extra[DERIVED_KEY] = derived
+    row["extra"] = json.dumps(extra, ensure_ascii=False) if extra else None
+    return row
+
+
+def from_row(row):
+    """Rebuild a POI dict from a (possibly projected) row"""
+    record = {}
+    derived = ()
+    for field, value in row.items():
+        if field == "extra":
+            if value:
+                extra = json.loads(value)
+                derived = extra.pop(DERIVED_KEY, ())
+                record.update(extra)
+        elif field in JSON_FIELDS:
+            if value is not None:
+                record[field] = json.loads(value)
+        elif field != "image_count" and value is not None:
+            record[field] = value
+    for field in derived:
+        record.pop(field, None)
+    return record
+
+
+def write_store(records, path, row_group_size=ROW_GROUP_SIZE):
+    """
+    Write POI records to a Parquet file, one row group at a time.
+
+    Args:
+        records: Iterable of POI dicts (a generator is fine)
+        path: Output .parquet path
+
+    Returns:
+        Number of records written
+    """
+    _require_pyarrow()
+    count = 0
+    with pq.ParquetWriter(path, schema(), compression="zstd") as writer:
+        batch = []
+        for record in records:
+            batch.append(to_row(record))
+            if len(batch) >= row_group_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema()))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema()))
+            count += len(batch)
+    return count
+
+
+def read_table(path, columns=None, filters=None):
+    """
+    Read a pyarrow Table with column projection and predicate pushdown.
+
+    Args:
+        columns: Column names to read (None = all)
+        filters: pyarrow filters on typed columns, e.g. [("region", "=", "South")]
+    """
+    _require_pyarrow()
+    return pq.read_table(path, columns=columns, filters=filters)
+
+
+def read_store(path, columns=None, filters=None):
+    """Read POI dicts, decoding only the requested columns"""
+    return [from_row(row) for row in read_table(path, columns, filters).to_pylist()]
+
+
+def load_json_records(path):
+    """Load a JSON dataset: a plain list, the master {"places": [...]} format or {id: place}"""
+    data = read_json(path)
+    if isinstance(data, dict):
+        return data.get("places") or list(data.values())
+    return data
+
+
+def import_json(json_path, store_path=None):
+    store_path = store_path or os.path.splitext(json_path)[0] + ".parquet"
+    count = write_store(load_json_records(json_path), store_path)
+    print(f"✅ {count} POIs → {store_path} ({os.path.getsize(json_path) // 1024} KB → {os.path.getsize(store_path) // 1024} KB)")
+    return store_path
+
+
+def export_json(store_path, json_path=None):
+    json_path = json_path or os.path.splitext(store_path)[0] + ".json"
+    count = write_records(json_path, read_store(store_path))
+    print(f"✅ {count} POIs → {json_path}")
+    return json_path
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("import", "export"):
+        print("Usage:")
+        print("  python etl/poi_store.py import <input.json> [output.parquet]")
+        print("  python etl/poi_store.py export <input.parquet> [output.json]")
+        sys.exit(1)
+
+    command, source = sys.argv[1], sys.argv[2]
+    target = sys.argv[3] if len(sys.argv) > 3 else None
+    if command == "import":
+        import_json(source, target)
+    else:
+        export_json(source, target)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Preview Cache
+Map previews keyed by rendered viewport instead of POI id
+
+Two POIs whose pins land on the same (quantized) pixel at the same zoom,
+size and style produce the same static map. The key is a hash of that
+viewport plus the overlay, the image is stored once in Storage under
+map_previews/v/<key>.<ext>, and every POI with the same key points at
+the shared blob. A manifest (data/.preview_cache.json) remembers which
+keys are already uploaded, so re-runs make no API calls for them.
+
+Usage:
+    cache = PreviewCache.load()
+    view = Viewport.for_point(lat, lng, zoom=13, width=400, height=300, style=MAPBOX_STYLE)
+    url = cache.get(view.key)
+    if url is None:
+        ... render or download at (view.lat, view.lng), upload to view.blob_path("png") ...
+        cache.put(view.key, public_url)
+    cache.save()
+"""
+import hashlib
+import os
+
+from json_io import read_json, write_json
+from static_maps import from_pixels, to_pixels
+
+# Next to the pipeline data wherever the caller runs from (travel_super_app/scripts too)
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+CACHE_FILE = os.path.join(DATA_DIR, ".preview_cache.json")
+BLOB_PREFIX = "map_previews/v"
+
+# Pins closer than this many pixels share a preview (<= 1 px shift at 2)
+QUANTUM = int(os.getenv("PREVIEW_QUANTUM", 2))
+
+PIN_OVERLAY = "pin-s+ff0000"
+
+
+class Viewport:
+    """A quantized static-map viewport and its cache key"""
+
+    __slots__ = ("lat", "lng", "zoom", "width", "height", "style", "overlay", "key")
+
+    def __init__(self, lat, lng, zoom, width, height, style, overlay, key):
+        self.lat = lat
+        self.lng = lng
+        self.zoom = zoom
+        self.width = width
+        self.height = height
+        self.style = style
+        self.overlay = overlay
+        self.key = key
+
+    @classmethod
+    def for_point(cls, lat, lng, zoom, width, height, style, overlay=PIN_OVERLAY, quantum=QUANTUM):
+        """Viewport centred on the point snapped to a quantum-pixel grid"""
+        x, y = to_pixels(lat, lng, zoom)
+        qx, qy = round(x / quantum) * quantum, round(y / quantum) * quantum
+        snapped_lat, snapped_lng = from_pixels(qx, qy, zoom)
+        overlay_hash = hashlib.blake2b(overlay.encode("utf-8"), digest_size=6).hexdigest()
+        raw = f"{style}|{zoom}|{width}x{height}|{qx}|{qy}|{overlay_hash}"
+        key = hashlib.blake2b(raw.encode("utf-8"), digest_size=10).hexdigest()
+        return cls(round(snapped_lat, 7), round(snapped_lng, 7), zoom, width, height, style, overlay, key)
+
+    def blob_path(self, ext="png"):
+        return f"{BLOB_PREFIX}/{self.key}.{ext}"
+
+
+class PreviewCache:
+    """key -> public URL manifest for uploaded previews"""
+
+    def __init__(self, entries=None, path=CACHE_FILE):
+        self.entries = entries or {}
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path=CACHE_FILE):
+        entries = read_json(path) if os.path.exists(path) else {}
+        return cls(entries, path)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        write_json(self.path, self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        url = self.entries.get(key)
+        if url is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return url
+
+    def put(self, key, url):
+        self.entries[key] = url
+
+
+def group_by_viewport(pois, zoom, width, height, style, overlay=PIN_OVERLAY):
+    """
+    {key: (Viewport, [pois])} for every POI with coordinates, first-seen order.
+    """
+    groups = {}
+    for poi in pois:
+        lat, lng = poi.get("lat"), poi.get("lng", poi.get("lon"))
+        if lat is None or lng is None:
+            continue
+        view = Viewport.for_point(lat, lng, zoom, width, height, style, overlay)
+        if view.key in groups:
+            groups[view.key][1].append(poi)
+        else:
+            groups[view.key] = (view, [poi])
+    return groups
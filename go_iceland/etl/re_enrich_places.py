@@ -1,11 +1,12 @@
 """
 Re-enrich all places with images and descriptions from Wikipedia/OSM
 """
-import json
 import requests
 from time import sleep
 import os
 
+from json_io import read_json, write_records
+
 def get_wikipedia_data(place_name, lat, lon):
     """Get Wikipedia article and images for a place"""
     try:
@@ -72,8 +73,7 @@ def enrich_places():
     """Enrich all places with images and descriptions"""
     
     # Load places from Firestore download
-    with open('data/iceland_places_master.json', encoding='utf-8') as f:
-        places = json.load(f)
+    places = read_json('data/iceland_places_master.json')
     
     print(f"📊 Total places to enrich: {len(places)}")
     print(f"Starting enrichment...\n")
@@ -116,8 +116,7 @@ def enrich_places():
     
     # Save enriched data
     output_file = 'data/iceland_places_enriched.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(places, f, indent=2, ensure_ascii=False)
+    write_records(output_file, places)
     
     print(f"\n✅ Enriched {enriched_count} places")
     print(f"💾 Saved to: {output_file}")
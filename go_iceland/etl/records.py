@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Record Types
+Compact Place and Trail records for the ETL stages
+
+Both classes use __slots__: the common fields are plain attributes, and
+everything else rides along in `extra` untouched. Decoding accepts every
+coordinate spelling found in data/ (lat/latitude, lng/lon/longitude,
+startLat/startLng, coordinates{}, location.geopoint) and keeps one copy.
+Trail polylines are stored as a flat array of doubles instead of a list
+of lists or dicts.
+
+from_dict() validates and raises ValueError; to_dict() writes the
+canonical JSON shape the pipeline already uses.
+
+Usage:
+    from records import Place, Trail, validate_records
+
+    place = Place.from_dict(poi)
+    place.lat, place.lng
+    write_records(OUTPUT, validate_records(iter_records(INPUT), Place))
+"""
+import sys
+from array import array
+
+POLYLINE_PAIRS = "pairs"   # [[lat, lng], ...]
+POLYLINE_DICTS = "dicts"   # [{"lat": .., "lng": ..}, ...]
+POLYLINE_FLAT = "flat"     # [lat, lng, lat, lng, ...] (Firestore-safe)
+
+
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _first(data, *keys):
+    for key in keys:
+        if data.get(key) is not None:
+            return data[key]
+    return None
+
+
+def _check_coordinates(kind, record_id, lat, lng):
+    if not (_number(lat) and _number(lng)):
+        raise ValueError(f"{kind} {record_id!r}: missing or non-numeric coordinates ({lat!r}, {lng!r})")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError(f"{kind} {record_id!r}: coordinates out of range ({lat}, {lng})")
+
+
+def _check_name(kind, record_id, name):
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError(f"{kind} {record_id!r}: missing name")
+
+
+class Place:
+    """A POI with one set of coordinates; non-core fields live in extra"""
+
+    __slots__ = ("id", "name", "lat", "lng", "category", "region", "geohash", "images", "extra")
+
+    # Keys that are folded into the slots (or rebuilt from them) on decode
+    COORDINATE_KEYS = ("lat", "lng", "latitude", "longitude", "lon", "coordinates")
+
+    def __init__(self, id, name, lat, lng, category=None, region=None, geohash=None, images=None, extra=None):
+        self.id = id
+        self.name = name
+        self.lat = lat
+        self.lng = lng
+        self.category = category
+        self.region = region
+        self.geohash = geohash
+        self.images = images
+        self.extra = extra or {}
+
+    def __repr__(self):
+        return f"Place({self.id!r}, {self.name!r}, {self.lat}, {self.lng}, {self.category!r})"
+
+    @classmethod
+    def from_dict(cls, data):
+        """Decode and validate a POI dict in any of the pipeline's shapes"""
+        coords = data.get("coordinates") if isinstance(data.get("coordinates"), dict) else {}
+        location = data.get("location") if isinstance(data.get("location"), dict) else {}
+        geopoint = location.get("geopoint") or {}
+
+        lat = _first(data, "lat", "latitude")
+        lng = _first(data, "lng", "lon", "longitude")
+        if lat is None:
+            lat = _first(coords, "lat", "latitude", "_latitude")
+            lng = _first(coords, "lng", "lon", "longitude", "_longitude")
+        if lat is None:
+            lat = geopoint.get("_latitude")
+            lng = geopoint.get("_longitude")
+
+        record_id = data.get("id")
+        _check_name("place", record_id, data.get("name"))
+        _check_coordinates("place", record_id, lat, lng)
+
+        skip = {"id", "name", "category", "region", "geohash", "images", *cls.COORDINATE_KEYS}
+        if geopoint:
+            # Firestore GeoPoint copy of lat/lng; to_dict() rebuilds it
+            skip.add("location")
+
+        return cls(
+            record_id,
+            data["name"],
+            lat,
+            lng,
+            data.get("category"),
+            data.get("region"),
+            data.get("geohash") or location.get("geohash"),
+            data.get("images"),
+            {k: v for k, v in data.items() if k not in skip},
+        )
+
+    def to_dict(self):
+        """Encode to the clean POI shape (plus geohash/location when present)"""
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "lat": self.lat,
+            "lng": self.lng,
+            "category": self.category,
+            "region": self.region,
+        }
+        data.update(self.extra)
+        if self.images is not None:
+            data["images"] = self.images
+        if self.geohash is not None:
+            data["geohash"] = self.geohash
+            data["location"] = {
+                "geopoint": {"_latitude": self.lat, "_longitude": self.lng},
+                "geohash": self.geohash,
+            }
+        return data
+
+
+def _decode_point(point):
+    """(lat, lng, name) from a start/end dict"""
+    if not isinstance(point, dict):
+        return None
+    lat = _first(point, "lat", "latitude")
+    lng = _first(point, "lng", "lon", "longitude")
+    return (lat, lng, point.get("name"))
+
+
+def _decode_polyline(polyline):
+    """Flat array('d') plus the input format, for any of the three stored shapes"""
+    flat = array("d")
+    if not polyline:
+        return flat, POLYLINE_PAIRS
+    first = polyline[0]
+    if isinstance(first, dict):
+        for point in polyline:
+            flat.append(point["lat"])
+            flat.append(point["lng"])
+        return flat, POLYLINE_DICTS
+    if isinstance(first, (list, tuple)):
+        for lat, lng in polyline:
+            flat.append(lat)
+            flat.append(lng)
+        return flat, POLYLINE_PAIRS
+    if len(polyline) % 2:
+        raise ValueError(f"flat polyline has an odd number of values ({len(polyline)})")
+    flat.extend(polyline)
+    return flat, POLYLINE_FLAT
+
+
+class Trail:
+    """A hiking trail with normalized stats, endpoints and a compact polyline"""
+
+    __slots__ = (
+        "id", "name", "region", "difficulty",
+        "distance_km", "duration_hours", "elevation_gain_m",
+        "start", "end", "polyline", "polyline_format", "extra", "legacy",
+    )
+
+    # Legacy spellings folded into the canonical fields on decode. The app
+    # still reads lengthKm / durationMin / elevationGain, so the ones a trail
+    # arrived with are written back (from the canonical values) by to_dict.
+    LEGACY_KEYS = (
+        "lengthKm", "durationMin", "elevationGain",
+        "startLat", "startLng", "lat", "lng", "lon", "latitude", "longitude",
+    )
+
+    def __init__(self, id, name, region=None, difficulty=None, distance_km=None, duration_hours=None,
+                 elevation_gain_m=None, start=None, end=None, polyline=None,
+                 polyline_format=POLYLINE_PAIRS, extra=None, legacy=()):
+        self.id = id
+        self.name = name
+        self.region = region
+        self.difficulty = difficulty
+        self.distance_km = distance_km
+        self.duration_hours = duration_hours
+        self.elevation_gain_m = elevation_gain_m
+        self.start = start
+        self.end = end
+        self.polyline = polyline if polyline is not None else array("d")
+        self.polyline_format = polyline_format
+        self.extra = extra or {}
+        self.legacy = legacy
+
+    def __repr__(self):
+        return f"Trail({self.id!r}, {self.name!r}, {self.distance_km} km, {len(self.polyline) // 2} points)"
+
+    def points(self):
+        """Polyline as [(lat, lng), ...]"""
+        flat = self.polyline
+        return list(zip(flat[0::2], flat[1::2]))
+
+    @classmethod
+    def from_dict(cls, data):
+        """Decode and validate a trail dict (OSM, manual and legacy app shapes)"""
+        record_id = data.get("id")
+        _check_name("trail", record_id, data.get("name"))
+
+        duration_hours = data.get("duration_hours")
+        if duration_hours is None and data.get("durationMin") is not None:
+            duration_hours = round(data["durationMin"] / 60, 2)
+
+        start = _decode_point(data.get("start"))
+        if start is None:
+            lat = _first(data, "startLat", "lat", "latitude")
+            lng = _first(data, "startLng", "lng", "lon", "longitude")
+            if lat is not None or lng is not None:
+                start = (lat, lng, None)
+        end = _decode_point(data.get("end"))
+
+        for point in (start, end):
+            if point is not None:
+                _check_coordinates("trail", record_id, point[0], point[1])
+
+        try:
+            polyline, polyline_format = _decode_polyline(data.get("polyline"))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"trail {record_id!r}: bad polyline ({e})") from e
+
+        skip = {*cls.__slots__, *cls.LEGACY_KEYS}
+        return cls(
+            record_id,
+            data["name"],
+            data.get("region"),
+            data.get("difficulty"),
+            _first(data, "distance_km", "lengthKm"),
+            duration_hours,
+            _first(data, "elevation_gain_m", "elevationGain"),
+            start,
+            end,
+            polyline,
+            polyline_format,
+            {k: v for k, v in data.items() if k not in skip},
+            tuple(k for k in cls.LEGACY_KEYS if k in data),
+        )
+
+    def _legacy_value(self, key):
+        if key == "lengthKm":
+            return self.distance_km
+        if key == "durationMin":
+            return round(self.duration_hours * 60) if self.duration_hours is not None else None
+        if key == "elevationGain":
+            return self.elevation_gain_m
+        if self.start is None:
+            return None
+        return self.start[0] if key in ("startLat", "lat", "latitude") else self.start[1]
+
+    def to_dict(self):
+        """
+        Encode to the canonical trail shape, polyline in its original format,
+        plus the legacy keys the trail was decoded from
+        """
+        data = {"id": self.id, "name": self.name}
+        for field in ("region", "difficulty", "distance_km", "duration_hours", "elevation_gain_m"):
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        for field in ("start", "end"):
+            point = getattr(self, field)
+            if point is not None:
+                lat, lng, name = point
+                data[field] = {"lat": lat, "lng": lng, **({"name": name} if name is not None else {})}
+        for key in self.legacy:
+            value = self._legacy_value(key)
+            if value is not None:
+                data[key] = value
+        data.update(self.extra)
+
+        if self.polyline:
+            if self.polyline_format == POLYLINE_FLAT:
+                data["polyline"] = self.polyline.tolist()
+            elif self.polyline_format == POLYLINE_DICTS:
+                data["polyline"] = [{"lat": lat, "lng": lng} for lat, lng in self.points()]
+            else:
+                data["polyline"] = [[lat, lng] for lat, lng in self.points()]
+        return data
+
+
+def validate_records(records, record_type, out=sys.stderr):
+    """
+    Stage-boundary check: decode every record, skip (and report) invalid ones.
+
+    Yields:
+        Canonical dicts from record_type.from_dict(record).to_dict()
+    """
+    skipped = 0
+    for record in records:
+        try:
+            yield record_type.from_dict(record).to_dict()
+        except ValueError as e:
+            skipped += 1
+            print(f"⚠️  Skipping invalid {record_type.__name__.lower()}: {e}", file=out)
+    if skipped:
+        print(f"⚠️  {skipped} invalid {record_type.__name__.lower()} record(s) skipped", file=out)
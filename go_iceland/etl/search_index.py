@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Search Index
+Inverted index over place names and multilingual descriptions
+
+Text is folded the Icelandic way before indexing and querying (þ -> th,
+ð -> d, æ -> ae, ö -> o, accents dropped), so "Thingvellir", "Þingvellir"
+and "thingvellir" are the same term. Queries are ranked with BM25; name
+tokens count NAME_WEIGHT times as much as description tokens.
+
+Lookups:
+  - exact term: dict hit
+  - prefix ("gull" -> gullfoss): bisect over the sorted term list
+  - typo ("skogarfoss" -> skogafoss): trigram candidates, Dice similarity
+
+The index is persisted as one compact JSON file (flat [doc, tf, ...]
+postings), which is also what the app's search box can load.
+
+Usage:
+    python etl/search_index.py --build                  # iceland_places_master.json
+    python etl/search_index.py --build data/iceland_trails_enriched.json
+    python etl/search_index.py "jokulsarlon"
+    python etl/search_index.py --check                  # find_name() on known names
+
+    index = SearchIndex.build(places)
+    index.find_name("Skogafoss")        # -> place dict
+    index.search("black sand beach")    # -> [(score, place), ...]
+
+A loaded index (SearchIndex.load) returns {"id", "name"} instead of the
+full place.
+"""
+import argparse
+import math
+from bisect import bisect_left
+from collections import Counter
+
+from json_io import read_json, write_json
+from names import tokenize
+
+INDEX_FILE = "./data/search_index.json"
+DEFAULT_SOURCES = ["iceland_places_master.json"]
+INDEX_VERSION = 1
+
+NAME_WEIGHT = 3
+TEXT_FIELDS = ("description", "descriptions", "content", "description_is", "description_en")
+K1 = 1.2
+B = 0.75
+PREFIX_DISCOUNT = 0.8
+FUZZY_DISCOUNT = 0.6
+MAX_EXPANSIONS = 20
+MIN_SIMILARITY = 0.5
+NAME_SIMILARITY = 0.7     # whole-name typo match in find_name()
+# Words that may follow a name without making it a different place:
+# "Gullfoss Waterfall" is Gullfoss, "Vik Church" and "Geysir Verslun" are not
+NAME_SUFFIXES = frozenset({
+    "waterfall", "falls", "glacier", "lagoon", "beach", "canyon", "gorge", "mountain",
+    "volcano", "crater", "cave", "caves", "hot", "spring", "springs", "geyser", "lake",
+    "river", "bay", "fjord", "peninsula", "island", "islands", "cliffs", "national",
+    "park", "nature", "reserve",
+})
+
+# find_name() expectations on CHECK_SOURCE (None: no place by that name)
+CHECK_SOURCE = "./data/iceland_clean_geohash.json"
+NAME_CHECKS = {
+    "Reykjavík": None,       # not "Reykjavik Excursions"
+    "Vík": None,             # not "Vik Church"
+    "Geysir": None,          # not "Geysir Verslun"
+    "Húsavík": None,         # not "Husavik Hostel"
+    "Gullfoss": "Gullfoss",
+    "Skogafoss": "Skógafoss",
+}
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def name_core(tokens):
+    """Name tokens without trailing NAME_SUFFIXES words ("gullfoss waterfall" -> gullfoss)"""
+    end = len(tokens)
+    while end > 1 and tokens[end - 1] in NAME_SUFFIXES:
+        end -= 1
+    return tokens[:end]
+
+
+def _texts(value):
+    """All strings inside a description/content value (str, {lang: ...}, nested dicts)"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _texts(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _texts(v)
+
+
+def _record_terms(record):
+    """Weighted term counts for one record"""
+    counts = Counter()
+    for term in tokenize(record.get("name") or ""):
+        counts[term] += NAME_WEIGHT
+    for field in TEXT_FIELDS:
+        for text in _texts(record.get(field)):
+            counts.update(tokenize(text))
+    return counts
+
+
+class SearchIndex:
+    """BM25 inverted index with prefix and trigram expansion"""
+
+    def __init__(self, docs, doc_len, postings, records=None):
+        self.docs = docs            # [[id, name], ...]
+        self.doc_len = doc_len      # weighted token count per doc
+        self.postings = postings    # {term: [doc, tf, doc, tf, ...]}
+        self.records = records
+        self.terms = sorted(postings)
+        self.avg_len = (sum(doc_len) / len(doc_len)) if doc_len else 0
+        self.names = {}
+        for i, (_, name) in enumerate(docs):
+            self.names.setdefault(" ".join(tokenize(name or "")), i)
+        self._trigrams = None
+
+    @classmethod
+    def build(cls, records):
+        """Index records in one pass"""
+        records = list(records)
+        docs, doc_len, postings = [], [], {}
+        for i, record in enumerate(records):
+            counts = _record_terms(record)
+            docs.append([record.get("id"), record.get("name")])
+            doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).extend((i, tf))
+        return cls(docs, doc_len, postings, records)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        data = read_json(path)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"{path}: unsupported search index version {data.get('version')!r}")
+        return cls(data["docs"], data["doc_len"], data["postings"])
+
+    def save(self, path=INDEX_FILE):
+        write_json(path, {
+            "version": INDEX_VERSION,
+            "docs": self.docs,
+            "doc_len": self.doc_len,
+            "postings": {term: self.postings[term] for term in self.terms},
+        })
+
+    def _result(self, doc):
+        """The record, or {"id", "name"} when loaded from file"""
+        if self.records is not None:
+            return self.records[doc]
+        doc_id, name = self.docs[doc]
+        return {"id": doc_id, "name": name}
+
+    def prefix(self, stem):
+        """Terms starting with stem (sorted, at most MAX_EXPANSIONS)"""
+        found = []
+        for term in self.terms[bisect_left(self.terms, stem):]:
+            if not term.startswith(stem) or len(found) == MAX_EXPANSIONS:
+                break
+            found.append(term)
+        return found
+
+    def similar(self, term, limit=3):
+        """[(term, similarity)] for the closest indexed terms by trigram Dice similarity"""
+        if self._trigrams is None:
+            self._trigrams = {}
+            for t in self.terms:
+                for gram in trigrams(t):
+                    self._trigrams.setdefault(gram, []).append(t)
+        grams = trigrams(term)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+        scored = []
+        for candidate, n in shared.items():
+            score = 2 * n / (len(grams) + len(trigrams(candidate)))
+            if score >= MIN_SIMILARITY:
+                scored.append((score, candidate))
+        return [(t, score) for score, t in sorted(scored, reverse=True)[:limit]]
+
+    def expand(self, token):
+        """[(term, weight)] for one query token: exact, else prefix, else fuzzy"""
+        if token in self.postings:
+            return [(token, 1.0)]
+        stems = self.prefix(token) if len(token) >= 2 else []
+        if stems:
+            # Shorter completions first: "gullfos" is gullfoss before gullfosskaffi
+            return [(t, PREFIX_DISCOUNT * len(token) / len(t)) for t in stems]
+        if len(token) >= 3:
+            return [(t, FUZZY_DISCOUNT * score ** 2) for t, score in self.similar(token)]
+        return []
+
+    def rank(self, query, limit=10):
+        """Ranked [(doc position, score), ...]"""
+        n = len(self.docs)
+        scores = {}
+        for token in tokenize(query):
+            for term, weight in self.expand(token):
+                posting = self.postings[term]
+                df = len(posting) // 2
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                for j in range(0, len(posting), 2):
+                    doc, tf = posting[j], posting[j + 1]
+                    norm = K1 * (1 - B + B * self.doc_len[doc] / (self.avg_len or 1))
+                    scores[doc] = scores.get(doc, 0) + weight * idf * tf * (K1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda x: -x[1])[:limit]
+
+    def search(self, query, limit=10):
+        """Ranked [(score, record), ...]"""
+        return [(round(score, 4), self._result(doc)) for doc, score in self.rank(query, limit)]
+
+    def find_name(self, name, fuzzy=True):
+        """
+        Best place for a name: exact folded match, else a ranked hit whose
+        name starts with the query's words (or the query with its words)
+        and differs only by NAME_SUFFIXES words, else - with fuzzy - the
+        closest ranked name with as many words by trigram similarity.
+        """
+        tokens = tokenize(name)
+        key = " ".join(tokens)
+        if not key:
+            return None
+        if key in self.names:
+            return self._result(self.names[key])
+
+        docs = [doc for doc, _ in self.rank(name, limit=10)]
+        for doc in docs:
+            doc_tokens = tokenize(self.docs[doc][1] or "")
+            shorter = min(len(tokens), len(doc_tokens))
+            longer = max(tokens, doc_tokens, key=len)
+            if shorter and tokens[:shorter] == doc_tokens[:shorter] and set(longer[shorter:]) <= NAME_SUFFIXES:
+                return self._result(doc)
+        if fuzzy:
+            # Typos only: the names must have as many words (suffixes aside)
+            core = name_core(tokens)
+            grams = trigrams(" ".join(core))
+            for doc in docs:
+                other_core = name_core(tokenize(self.docs[doc][1] or ""))
+                if len(other_core) != len(core):
+                    continue
+                other = trigrams(" ".join(other_core))
+                if 2 * len(grams & other) / (len(grams) + len(other)) >= NAME_SIMILARITY:
+                    return self._result(doc)
+        return None
+
+
+def load_records(path):
+    data = read_json(path)
+    if isinstance(data, dict):
+        return data.get("places", list(data.values()))
+    return data
+
+
+def check_names(index):
+    """Run NAME_CHECKS; returns the failures as (query, expected, found)"""
+    failures = []
+    for query, expected in NAME_CHECKS.items():
+        hit = index.find_name(query)
+        found = hit["name"] if hit else None
+        if found != expected:
+            failures.append((query, expected, found))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the GO ICELAND search index")
+    parser.add_argument("query", nargs="?", help="Search text")
+    parser.add_argument("--build", nargs="*", metavar="SOURCE", help=f"Rebuild from sources (default: {DEFAULT_SOURCES[0]})")
+    parser.add_argument("--index", default=INDEX_FILE, help="Index file")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--check", action="store_true", help=f"Check find_name() on known names in {CHECK_SOURCE}")
+    args = parser.parse_args()
+
+    if args.check:
+        failures = check_names(SearchIndex.build(load_records(CHECK_SOURCE)))
+        for query, expected, found in failures:
+            print(f"   ❌ {query}: expected {expected!r}, got {found!r}")
+        print(f"{'❌' if failures else '✅'} {len(NAME_CHECKS) - len(failures)}/{len(NAME_CHECKS)} name checks passed")
+        if failures:
+            raise SystemExit(1)
+
+    if args.build is not None:
+        records = []
+        for source in args.build or DEFAULT_SOURCES:
+            records.extend(load_records(source))
+        index = SearchIndex.build(records)
+        index.save(args.index)
+        print(f"✅ Indexed {len(index.docs)} records, {len(index.terms)} terms -> {args.index}")
+
+    if args.query:
+        index = SearchIndex.load(args.index)
+        print(f"🔎 {args.query}")
+        for score, hit in index.search(args.query, args.limit):
+            print(f"   {score:7.3f}  {hit['name']} ({hit['id']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Static Map Renderer
+Offline map previews stitched from a local tile cache
+
+Tiles come from an XYZ directory (tiles/{z}/{x}/{y}.png) or an MBTiles
+file, filled once with `seed`. Each preview is stitched from the tiles
+around the point (or the trail's bounding box), the pin or polyline is
+drawn on top, and the image is written as WebP (PNG when Pillow has no
+WebP support). Rendering runs through parallel_map, so all previews are
+CPU-bound work on every core with no per-image API call or sleep.
+Previews with tiles missing from the cache are not written and are
+reported, so a later run renders them once the tiles are seeded.
+
+Seeding needs an explicit tile server (--url or TILE_URL) whose terms
+allow bulk downloads - a self-hosted or commercial one, not
+tile.openstreetmap.org. With --records it fetches only the tiles the
+previews of those records use.
+
+Usage:
+    python etl/static_maps.py seed tiles/ --url "https://tiles.example.com/{z}/{x}/{y}.png" --records data/iceland_clean.json
+    python etl/static_maps.py pois data/iceland_clean.json --tiles tiles/
+    python etl/static_maps.py trails data/iceland_trails_enriched.json --tiles tiles/
+
+    MAP_TILES=tiles/ python etl/download_previews.py            # same, via the old entry point
+"""
+import argparse
+import io
+import math
+import os
+import sqlite3
+import time
+from functools import partial
+from urllib.parse import urlsplit
+
+try:
+    from PIL import Image, ImageDraw, features
+except ImportError:
+    Image = None
+
+from json_io import read_json
+from parallel import parallel_map
+from records import Trail
+
+MAP_TILES = os.getenv("MAP_TILES")
+TILE_URL = os.getenv("TILE_URL")
+# Bulk downloading is forbidden by the OSM tile usage policy
+FORBIDDEN_TILE_HOSTS = ("tile.openstreetmap.org",)
+TILE_SIZE = 256
+OUTPUT_DIR = "./previews"
+
+# Matches the Mapbox previews (download_previews.py)
+WIDTH = int(os.getenv("MAP_PREVIEW_WIDTH", 500))
+HEIGHT = int(os.getenv("MAP_PREVIEW_HEIGHT", 500))
+ZOOM = int(os.getenv("MAP_PREVIEW_ZOOM", 14))
+MAX_TRAIL_ZOOM = 15
+TRAIL_PADDING = 40
+
+# Iceland, for seeding: (min_lng, min_lat, max_lng, max_lat)
+ICELAND_BBOX = (-24.6, 63.2, -13.4, 66.6)
+
+BACKGROUND = (221, 221, 221)
+PIN_COLOR = (255, 0, 0)
+TRAIL_COLOR = (230, 60, 20)
+OUTLINE = (255, 255, 255)
+
+
+# ---------------------------------------------------------------------------
+# Tile sources
+# ---------------------------------------------------------------------------
+
+class XYZTiles:
+    """tiles/{z}/{x}/{y}.(png|jpg|webp)"""
+
+    EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, z, x, y, ext=".png"):
+        return os.path.join(self.root, str(z), str(x), f"{y}{ext}")
+
+    def get(self, z, x, y):
+        for ext in self.EXTENSIONS:
+            path = self.path(z, x, y, ext)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    return f.read()
+        return None
+
+    def put(self, z, x, y, data):
+        path = self.path(z, x, y)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+class MBTiles:
+    """MBTiles (SQLite, TMS row order)"""
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+    def get(self, z, x, y):
+        row = self.db.execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+            (z, x, (1 << z) - 1 - y),
+        ).fetchone()
+        return row[0] if row else None
+
+
+def open_tiles(path):
+    return MBTiles(path) if path.endswith(".mbtiles") else XYZTiles(path)
+
+
+_sources = {}
+
+
+def _tiles(path):
+    """One open tile source per path per process (SQLite handles do not pickle)"""
+    if path not in _sources:
+        _sources[path] = open_tiles(path)
+    return _sources[path]
+
+
+# ---------------------------------------------------------------------------
+# Projection
+# ---------------------------------------------------------------------------
+
+def to_pixels(lat, lng, zoom):
+    """Web Mercator world pixel coordinates at zoom"""
+    scale = TILE_SIZE * (1 << zoom)
+    lat = max(min(lat, 85.0511), -85.0511)
+    siny = math.sin(math.radians(lat))
+    x = (lng + 180) / 360 * scale
+    y = (0.5 - math.log((1 + siny) / (1 - siny)) / (4 * math.pi)) * scale
+    return x, y
+
+
+def from_pixels(x, y, zoom):
+    scale = TILE_SIZE * (1 << zoom)
+    lng = x / scale * 360 - 180
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / scale))))
+    return lat, lng
+
+
+def fit_zoom(points, width, height, padding=TRAIL_PADDING, max_zoom=MAX_TRAIL_ZOOM):
+    """Highest zoom at which every point fits inside the image"""
+    for zoom in range(max_zoom, 0, -1):
+        xs, ys = zip(*(to_pixels(lat, lng, zoom) for lat, lng in points))
+        if max(xs) - min(xs) <= width - 2 * padding and max(ys) - min(ys) <= height - 2 * padding:
+            return zoom
+    return 1
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+class MissingTiles(ValueError):
+    """The tile cache lacks tiles a preview needs"""
+
+
+def view_tiles(cx, cy, zoom, width, height):
+    """
+    (tx, ty) of the tiles covering a width x height view centred on world
+    pixel (cx, cy); tx is unwrapped (tile column is tx % 2**zoom)
+    """
+    left, top = cx - width / 2, cy - height / 2
+    for ty in range(int(top // TILE_SIZE), int((top + height) // TILE_SIZE) + 1):
+        if not 0 <= ty < 1 << zoom:
+            continue
+        for tx in range(int(left // TILE_SIZE), int((left + width) // TILE_SIZE) + 1):
+            yield tx, ty
+
+
+def stitch(tiles, cx, cy, zoom, width, height):
+    """
+    Image of width x height centred on world pixel (cx, cy).
+
+    Returns:
+        (image, missing tile count); missing tiles are left as BACKGROUND
+    """
+    image = Image.new("RGB", (width, height), BACKGROUND)
+    left, top = cx - width / 2, cy - height / 2
+    missing = 0
+
+    for tx, ty in view_tiles(cx, cy, zoom, width, height):
+        data = tiles.get(zoom, tx % (1 << zoom), ty)
+        if data is None:
+            missing += 1
+            continue
+        tile = Image.open(io.BytesIO(data)).convert("RGB")
+        image.paste(tile, (round(tx * TILE_SIZE - left), round(ty * TILE_SIZE - top)))
+    return image, missing
+
+
+def render(tiles, lat, lng, zoom=ZOOM, width=WIDTH, height=HEIGHT, pin=True, polyline=None,
+           allow_missing=False):
+    """
+    Static map centred on (lat, lng).
+
+    Args:
+        pin: Draw a marker at the centre
+        polyline: [(lat, lng), ...] drawn as a line with start/end dots
+        allow_missing: Render gaps in the tile cache as background instead of raising MissingTiles
+    """
+    cx, cy = to_pixels(lat, lng, zoom)
+    image, missing = stitch(tiles, cx, cy, zoom, width, height)
+    if missing and not allow_missing:
+        raise MissingTiles(f"{missing} tile(s) missing at z{zoom} around {lat:.4f},{lng:.4f}")
+    draw = ImageDraw.Draw(image)
+    left, top = cx - width / 2, cy - height / 2
+
+    def project(point):
+        x, y = to_pixels(point[0], point[1], zoom)
+        return x - left, y - top
+
+    if polyline:
+        line = [project(p) for p in polyline]
+        if len(line) > 1:
+            draw.line(line, fill=OUTLINE, width=7, joint="curve")
+            draw.line(line, fill=TRAIL_COLOR, width=4, joint="curve")
+        for (x, y), color in ((line[0], (40, 160, 60)), (line[-1], TRAIL_COLOR)):
+            draw.ellipse((x - 6, y - 6, x + 6, y + 6), fill=color, outline=OUTLINE, width=2)
+
+    if pin:
+        x, y = width / 2, height / 2
+        draw.ellipse((x - 9, y - 9, x + 9, y + 9), fill=PIN_COLOR, outline=OUTLINE, width=3)
+    return image
+
+
+def encode_image(image, fmt=None):
+    """(bytes, extension); WebP when available"""
+    fmt = fmt or ("webp" if features.check("webp") else "png")
+    buf = io.BytesIO()
+    if fmt == "webp":
+        image.save(buf, "WEBP", quality=80, method=4)
+    else:
+        image.save(buf, "PNG", optimize=True)
+    return buf.getvalue(), fmt
+
+
+def _coordinates(poi):
+    lat = poi.get("lat", poi.get("latitude"))
+    lng = poi.get("lng", poi.get("lon", poi.get("longitude")))
+    return lat, lng
+
+
+NO_COORDINATES = "no coordinates"
+MISSING_TILES = "missing tiles"
+
+
+def preview_id(record):
+    """File name (without extension) for a record's preview: its id, else its name"""
+    return str(record.get("id") or (record.get("name") or "unknown").replace(" ", "_"))
+
+
+def render_poi(poi, tiles_path, width=WIDTH, height=HEIGHT, zoom=ZOOM, fmt=None):
+    """
+    (id, image bytes, extension) for one POI, or (id, None, reason) when it
+    has no coordinates (NO_COORDINATES) or the cache lacks tiles (MISSING_TILES)
+    """
+    lat, lng = _coordinates(poi)
+    poi_id = preview_id(poi)
+    if lat is None or lng is None:
+        return poi_id, None, NO_COORDINATES
+    try:
+        image = render(_tiles(tiles_path), lat, lng, zoom, width, height)
+    except MissingTiles:
+        return poi_id, None, MISSING_TILES
+    return (poi_id, *encode_image(image, fmt))
+
+
+def trail_points(trail):
+    """Polyline (or endpoints) of a trail dict, [] when it has neither"""
+    try:
+        record = Trail.from_dict(trail)
+    except ValueError:
+        return []
+    return record.points() or [p[:2] for p in (record.start, record.end) if p]
+
+
+def trail_view(points, width=WIDTH, height=HEIGHT):
+    """(lat, lng, zoom) of the preview fitted to a trail's points"""
+    zoom = fit_zoom(points, width, height)
+    lats, lngs = zip(*points)
+    # Centre on the bbox in pixel space so the line is centred after projection
+    x0, y0 = to_pixels(max(lats), min(lngs), zoom)
+    x1, y1 = to_pixels(min(lats), max(lngs), zoom)
+    lat, lng = from_pixels((x0 + x1) / 2, (y0 + y1) / 2, zoom)
+    return lat, lng, zoom
+
+
+def render_trail(trail, tiles_path, width=WIDTH, height=HEIGHT, fmt=None):
+    """(id, image bytes, extension) for one trail, fitted to its polyline; (id, None, reason) as render_poi"""
+    trail_id = preview_id(trail)
+    points = trail_points(trail)
+    if not points:
+        return trail_id, None, NO_COORDINATES
+
+    lat, lng, zoom = trail_view(points, width, height)
+    try:
+        image = render(_tiles(tiles_path), lat, lng, zoom, width, height, pin=len(points) == 1,
+                       polyline=points if len(points) > 1 else None)
+    except MissingTiles:
+        return trail_id, None, MISSING_TILES
+    return (trail_id, *encode_image(image, fmt))
+
+
+def render_all(records, tiles_path, output_dir, kind="pois", workers=None, skip_existing=True, **options):
+    """
+    Render previews for every record into output_dir/<id>.<ext>.
+
+    Returns:
+        (written, skipped, no coordinates, missing tiles)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    existing = {os.path.splitext(name)[0] for name in os.listdir(output_dir)} if skip_existing else set()
+    todo = [r for r in records if preview_id(r) not in existing]
+    func = partial(render_trail if kind == "trails" else render_poi, tiles_path=tiles_path, **options)
+
+    written = no_coordinates = missing = 0
+    for i, (record_id, data, ext) in enumerate(parallel_map(func, todo, workers, chunk_size=50), 1):
+        if data is None:
+            if ext == MISSING_TILES:
+                missing += 1
+            else:
+                no_coordinates += 1
+            continue
+        with open(os.path.join(output_dir, f"{record_id}.{ext}"), "wb") as f:
+            f.write(data)
+        written += 1
+        if i % 500 == 0:
+            print(f"   [{i}/{len(todo)}] rendered")
+    return written, len(records) - len(todo), no_coordinates, missing
+
+
+# ---------------------------------------------------------------------------
+# Seeding
+# ---------------------------------------------------------------------------
+
+def tile_range(bbox, zoom):
+    min_lng, min_lat, max_lng, max_lat = bbox
+    x0, y0 = to_pixels(max_lat, min_lng, zoom)
+    x1, y1 = to_pixels(min_lat, max_lng, zoom)
+    return range(int(x0 // TILE_SIZE), int(x1 // TILE_SIZE) + 1), range(int(y0 // TILE_SIZE), int(y1 // TILE_SIZE) + 1)
+
+
+def bbox_tiles(bbox, zooms):
+    """Every (z, x, y) inside bbox at each zoom"""
+    for zoom in zooms:
+        xs, ys = tile_range(bbox, zoom)
+        for x in xs:
+            for y in ys:
+                yield zoom, x, y
+
+
+def preview_tiles(records, zoom=ZOOM, width=WIDTH, height=HEIGHT):
+    """The (z, x, y) tiles render_poi / render_trail need for these records"""
+    needed = set()
+    for record in records:
+        lat, lng = _coordinates(record)
+        if lat is not None and lng is not None:
+            view = (lat, lng, zoom)
+        else:
+            points = trail_points(record)
+            if not points:
+                continue
+            view = trail_view(points, width, height)
+        cx, cy = to_pixels(view[0], view[1], view[2])
+        needed.update((view[2], tx % (1 << view[2]), ty) for tx, ty in view_tiles(cx, cy, view[2], width, height))
+    return needed
+
+
+def check_tile_url(url):
+    """Refuse a missing tile URL or one whose usage policy forbids bulk downloads"""
+    if not url:
+        raise ValueError("No tile server: pass --url or set TILE_URL (one that allows bulk downloads)")
+    host = urlsplit(url).netloc.lower()
+    if any(host == h or host.endswith("." + h) for h in FORBIDDEN_TILE_HOSTS):
+        raise ValueError(f"{host} does not allow bulk downloads (tile usage policy); use your own tile server")
+    return url
+
+
+def seed(root, tiles_to_fetch, url=TILE_URL, delay=0.1):
+    """
+    Download missing (z, x, y) tiles into an XYZ directory.
+
+    Returns:
+        (fetched, failed)
+    """
+    import requests
+
+    url = check_tile_url(url)
+    tiles = XYZTiles(root)
+    session = requests.Session()
+    session.headers["User-Agent"] = "GoIceland/1.0 (tile cache seeding)"
+    fetched = failed = 0
+    for zoom, x, y in sorted(tiles_to_fetch):
+        if tiles.get(zoom, x, y) is not None:
+            continue
+        response = session.get(url.format(z=zoom, x=x, y=y), timeout=30)
+        if response.status_code == 200:
+            tiles.put(zoom, x, y, response.content)
+            fetched += 1
+        else:
+            failed += 1
+        time.sleep(delay)
+    return fetched, failed
+
+
+def load_records(path):
+    data = read_json(path)
+    if isinstance(data, dict):
+        return data.get("places", list(data.values()))
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render map previews from a local tile cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = sub.add_parser("seed", help="Fill an XYZ tile directory for Iceland")
+    seed_parser.add_argument("root", help="Tile directory")
+    seed_parser.add_argument("--url", default=TILE_URL, required=TILE_URL is None,
+                             help="Tile URL template allowing bulk downloads (TILE_URL)")
+    seed_parser.add_argument("--records", nargs="+", metavar="JSON",
+                             help="Only the tiles these datasets' previews need (at --preview-zoom)")
+    seed_parser.add_argument("--zoom", type=int, nargs=2, default=(5, ZOOM), metavar=("MIN", "MAX"),
+                             help="Zoom range for the whole of Iceland (without --records)")
+    seed_parser.add_argument("--preview-zoom", type=int, default=ZOOM)
+    seed_parser.add_argument("--width", type=int, default=WIDTH)
+    seed_parser.add_argument("--height", type=int, default=HEIGHT)
+
+    for kind in ("pois", "trails"):
+        p = sub.add_parser(kind, help=f"Render {kind} previews")
+        p.add_argument("input", help="Dataset JSON")
+        p.add_argument("--tiles", default=MAP_TILES, required=MAP_TILES is None, help="XYZ dir or .mbtiles (MAP_TILES)")
+        p.add_argument("--output", default=os.path.join(OUTPUT_DIR, "trails") if kind == "trails" else OUTPUT_DIR)
+        p.add_argument("--width", type=int, default=WIDTH)
+        p.add_argument("--height", type=int, default=HEIGHT)
+        p.add_argument("--format", choices=["webp", "png"])
+        p.add_argument("--workers", type=int)
+        p.add_argument("--force", action="store_true", help="Re-render existing files")
+        if kind == "pois":
+            p.add_argument("--zoom", type=int, default=ZOOM)
+
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        try:
+            check_tile_url(args.url)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        if args.records:
+            records = [r for path in args.records for r in load_records(path)]
+            wanted = preview_tiles(records, args.preview_zoom, args.width, args.height)
+            print(f"🗺️  Seeding {args.root}: {len(wanted)} tiles for {len(records)} previews from {args.url}")
+        else:
+            wanted = list(bbox_tiles(ICELAND_BBOX, range(args.zoom[0], args.zoom[1] + 1)))
+            print(f"🗺️  Seeding {args.root}: {len(wanted)} tiles (z{args.zoom[0]}-{args.zoom[1]}) from {args.url}")
+        fetched, failed = seed(args.root, wanted, args.url)
+        print(f"✅ {fetched} tiles downloaded, {failed} failed")
+        return
+
+    if Image is None:
+        print("❌ Pillow is required: pip install Pillow")
+        return
+
+    records = load_records(args.input)
+    options = {"width": args.width, "height": args.height, "fmt": args.format}
+    if args.command == "pois":
+        options["zoom"] = args.zoom
+
+    print(f"🗺️  Rendering {len(records)} {args.command} previews from {args.tiles}")
+    start = time.perf_counter()
+    written, skipped, no_coordinates, missing = render_all(
+        records, args.tiles, args.output, args.command, args.workers, not args.force, **options
+    )
+    print(f"✅ {written} written, {skipped} skipped (exist), {no_coordinates} without coordinates "
+          f"in {time.perf_counter() - start:.1f}s -> {args.output}")
+    if missing:
+        print(f"⚠️  {missing} previews not written: tiles missing from {args.tiles} "
+              f"(seed them with: python etl/static_maps.py seed {args.tiles} --records {args.input})")
+
+
+if __name__ == "__main__":
+    main()
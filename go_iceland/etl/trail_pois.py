@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Trail POIs
+Places along each trail, precomputed so the app never queries it at runtime
+
+All places go into one lat/lng grid index (cells at least RADIUS_M wide).
+Each trail polyline is walked segment by segment and only the cells
+inside the segment's RADIUS_M buffer are visited, so every trail is
+tested against a handful of candidates instead of every place.
+Distances are measured in a flat projection local to each segment.
+For each place within RADIUS_M of the line the join records:
+
+    along_km    distance along the trail to the closest point
+    offset_m    distance from the line
+
+and trails gain an ordered pois_along[] list plus trailhead_poi (nearest
+parking / info centre / campsite within TRAILHEAD_RADIUS_M of the start;
+the app already reads `trailhead` as a plain name string).
+
+Trails may carry the polyline in any stored shape or only as
+polyline_encoded (the encode_polylines stage output).
+
+Usage:
+    python etl/trail_pois.py
+    python etl/trail_pois.py data/iceland_trails_encoded.json data/iceland_clean_geohash.json data/iceland_trails_pois.json --radius 300
+"""
+import argparse
+import math
+import time
+
+from encode_polylines import decode_polyline
+from json_io import read_json, write_records
+from records import Trail
+
+TRAILS = "./data/iceland_trails_encoded.json"
+PLACES = "./data/iceland_clean_geohash.json"
+OUTPUT = "./data/iceland_trails_pois.json"
+
+RADIUS_M = 250
+TRAILHEAD_RADIUS_M = 500
+TRAILHEAD_CATEGORIES = ("parking", "info_center", "camping")
+
+_M_PER_DEG = 111320.0
+# Cells are sized at the northern edge, where a degree of longitude is shortest
+_MIN_COS = math.cos(math.radians(67.5))
+
+
+def _coordinates(place):
+    lat = place.get("lat", place.get("latitude"))
+    lng = place.get("lng", place.get("lon", place.get("longitude")))
+    return lat, lng
+
+
+def _local(lat, lng, lat0, lng0, kx):
+    """(x, y) metres of a point relative to (lat0, lng0); kx = metres per degree of longitude"""
+    return (lng - lng0) * kx, (lat - lat0) * _M_PER_DEG
+
+
+class PlaceGrid:
+    """Uniform lat/lng grid of place coordinates"""
+
+    def __init__(self, places, cell_m=RADIUS_M):
+        self.dlat = cell_m / _M_PER_DEG
+        self.dlng = cell_m / (_M_PER_DEG * _MIN_COS)
+        self.places = []
+        self.coords = []
+        self.cells = {}
+        for place in places:
+            lat, lng = _coordinates(place)
+            if lat is None or lng is None:
+                continue
+            i = len(self.places)
+            self.places.append(place)
+            self.coords.append((lat, lng))
+            self.cells.setdefault((int(lat // self.dlat), int(lng // self.dlng)), []).append(i)
+
+    def __len__(self):
+        return len(self.places)
+
+    def candidates(self, lat0, lng0, lat1, lng1, pad_m):
+        """Indices of places in cells overlapping the box padded by pad_m"""
+        pad_lat = pad_m / _M_PER_DEG
+        pad_lng = pad_m / (_M_PER_DEG * max(math.cos(math.radians(max(abs(lat0), abs(lat1)) + pad_lat)), 0.01))
+        for cy in range(int((min(lat0, lat1) - pad_lat) // self.dlat), int((max(lat0, lat1) + pad_lat) // self.dlat) + 1):
+            for cx in range(int((min(lng0, lng1) - pad_lng) // self.dlng),
+                            int((max(lng0, lng1) + pad_lng) // self.dlng) + 1):
+                yield from self.cells.get((cy, cx), ())
+
+
+def trail_points(trail, endpoints=True):
+    """[(lat, lng), ...] from any polyline shape, polyline_encoded, or (if endpoints) the endpoints"""
+    try:
+        record = Trail.from_dict(trail)
+    except ValueError:
+        return []
+    points = record.points()
+    if not points and trail.get("polyline_encoded"):
+        points = decode_polyline(trail["polyline_encoded"])
+    if not points and endpoints:
+        points = [p[:2] for p in (record.start, record.end) if p]
+    return points
+
+
+def pois_along(points, grid, radius_m=RADIUS_M):
+    """
+    {place index: (along_m, offset_m)} for places within radius_m of the line,
+    keeping the closest approach when the trail passes a place twice.
+    """
+    hits = {}
+    if len(points) == 1:
+        points = points * 2
+    along = 0.0
+    for (alat, alng), (blat, blng) in zip(points, points[1:]):
+        kx = _M_PER_DEG * math.cos(math.radians((alat + blat) / 2))
+        dx, dy = _local(blat, blng, alat, alng, kx)
+        seg2 = dx * dx + dy * dy
+        seg = math.sqrt(seg2)
+        for i in grid.candidates(alat, alng, blat, blng, radius_m):
+            px, py = _local(*grid.coords[i], alat, alng, kx)
+            t = 0.0 if seg2 == 0 else max(0.0, min(1.0, (px * dx + py * dy) / seg2))
+            offset = math.hypot(px - t * dx, py - t * dy)
+            if offset <= radius_m and (i not in hits or offset < hits[i][1]):
+                hits[i] = (along + t * seg, offset)
+        along += seg
+    return hits
+
+
+def trailhead(points, grid, radius_m=TRAILHEAD_RADIUS_M, categories=TRAILHEAD_CATEGORIES):
+    """Nearest place of a trailhead category within radius_m of the start, or None"""
+    if not points:
+        return None
+    slat, slng = points[0]
+    kx = _M_PER_DEG * math.cos(math.radians(slat))
+    best = None
+    for i in grid.candidates(slat, slng, slat, slng, radius_m):
+        place = grid.places[i]
+        if place.get("category") not in categories:
+            continue
+        d = math.hypot(*_local(*grid.coords[i], slat, slng, kx))
+        if d <= radius_m and (best is None or d < best[0]):
+            best = (d, place)
+    if best is None:
+        return None
+    d, place = best
+    return {"id": place.get("id"), "name": place.get("name"), "category": place.get("category"),
+            "distance_m": round(d)}
+
+
+def join_trail(trail, grid, radius_m=RADIUS_M):
+    """Add pois_along[] and trailhead_poi to one trail dict; returns the match count"""
+    points = trail_points(trail)
+    hits = pois_along(points, grid, radius_m) if points else {}
+    trail["pois_along"] = [
+        {
+            "id": grid.places[i].get("id"),
+            "name": grid.places[i].get("name"),
+            "category": grid.places[i].get("category"),
+            "along_km": round(along / 1000, 2),
+            "offset_m": round(offset),
+        }
+        for i, (along, offset) in sorted(hits.items(), key=lambda item: item[1][0])
+    ]
+    trail["trailhead_poi"] = trailhead(points, grid)
+    return len(hits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Join places onto trails by distance from the polyline")
+    parser.add_argument("trails", nargs="?", default=TRAILS)
+    parser.add_argument("places", nargs="?", default=PLACES)
+    parser.add_argument("output", nargs="?", default=OUTPUT)
+    parser.add_argument("--radius", type=int, default=RADIUS_M, help="Max distance from the trail (m)")
+    args = parser.parse_args()
+
+    start = time.time()
+    trails = read_json(args.trails)
+    places = read_json(args.places)
+    if isinstance(places, dict):
+        places = places.get("places") or list(places.values())
+    grid = PlaceGrid(places, args.radius)
+    print(f"🥾 {len(trails)} trails, {len(grid)} places (grid {args.radius} m, {len(grid.cells)} cells)")
+
+    total = with_pois = with_head = 0
+    for trail in trails:
+        count = join_trail(trail, grid, args.radius)
+        total += count
+        with_pois += count > 0
+        with_head += trail["trailhead_poi"] is not None
+
+    write_records(args.output, trails)
+    print(f"✅ {total} trail-place links: {with_pois} trails with places, {with_head} with a trailhead "
+          f"in {time.time() - start:.2f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,9 @@
 GO ICELAND - Geohash Utility
 Adds geohash encoding to POI data for proximity queries
 """
-import json
+from json_io import console, iter_records, stage_paths, write_records
+from parallel import parallel_map
+from records import Place, validate_records
 
 INPUT = "./data/iceland_clean.json"
 OUTPUT = "./data/iceland_clean_geohash.json"
@@ -82,18 +84,15 @@ def add_geohash_levels(poi):
     return poi
 
 def main():
-    with open(INPUT, encoding="utf-8") as f:
-        data = json.load(f)
+    # python etl/utils_geohash.py [input] [output]; "-" = NDJSON on stdin/stdout
+    source, target = stage_paths(INPUT, OUTPUT)
+    out = console(target)
 
-    print(f"Adding geohash to {len(data)} POIs...")
+    print(f"Adding geohash to POIs from {source}...", file=out)
+    places = validate_records(iter_records(source), Place, out)
+    count = write_records(target, parallel_map(add_geohash_levels, places))
 
-    for p in data:
-        add_geohash_levels(p)
-
-    with open(OUTPUT, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-    print(f"✅ Added geohash → {OUTPUT}")
+    print(f"✅ Added geohash to {count} POIs → {target}", file=out)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Wikipedia Extract Store
+Offline Wikipedia intro extracts for Iceland, built from dump files
+
+Streams a local is/en Wikipedia dump and keeps only Iceland-related
+pages (coordinates inside Iceland, or an Iceland category):
+
+    CirrusSearch content dump   iswiki-*-cirrussearch-content.json.gz
+                                (opening text, coordinates, categories, QID)
+    Abstracts dump              enwiki-*-abstract.xml.gz
+                                (no coordinates: kept when the abstract
+                                mentions Iceland)
+
+Pages go into an SQLite store (data/wiki_extracts.sqlite) indexed by
+title, normalized name key (names.name_key), Wikidata QID and
+coordinates. Description enrichment then runs with no network calls and
+on every core:
+
+    python etl/wiki_extracts.py ingest iswiki-20260101-cirrussearch-content.json.gz
+    python etl/wiki_extracts.py ingest enwiki-20260101-cirrussearch-content.json.gz
+    python etl/wiki_extracts.py enrich data/iceland_clean_geohash.json data/iceland_extracts.json
+
+Places are matched by their wikipedia tag, then Wikidata QID, then name
+key (nearest page of that name), then the nearest page within
+GEO_RADIUS_M with the same distinctive name tokens (generic suffixes
+and disambiguation ignored). "Hótel Gullfoss" does not get the Gullfoss
+article.
+"""
+import argparse
+import bz2
+import gzip
+import math
+import os
+import re
+import sqlite3
+import sys
+import time
+import xml.etree.ElementTree as ET
+from functools import partial
+
+from json_io import STDIO, console, decode, iter_records, write_records
+from names import GENERIC_SUFFIXES, name_key, name_tokens
+from parallel import parallel_map
+from wikidata import ICELAND_BBOX, parse_wikipedia_tag
+
+STORE_FILE = "./data/wiki_extracts.sqlite"
+
+LANGUAGES = ("is", "en")
+MAX_EXTRACT = 1200          # characters kept per page (cut at a sentence end)
+MIN_EXTRACT = 80
+GEO_RADIUS_M = 1500
+NAME_RADIUS_KM = 60         # same-name pages further away are other places
+COMMIT_EVERY = 5000
+
+ICELAND_WORDS = ("iceland", "ísland", "íslensk", "icelandic")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+_DISAMBIGUATION = re.compile(r"\s*\([^)]*\)\s*$")
+
+
+def open_dump(path):
+    if path == STDIO:
+        return sys.stdin.buffer
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def trim(text, limit=MAX_EXTRACT):
+    """Whitespace-normalized text cut at the last sentence end before limit"""
+    text = " ".join((text or "").split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    ends = [m.start() for m in _SENTENCE_END.finditer(cut)]
+    return cut[:ends[-1]] if ends else cut.rsplit(" ", 1)[0] + "…"
+
+
+def in_iceland(lat, lng):
+    south, west, north, east = ICELAND_BBOX
+    return lat is not None and south <= lat <= north and west <= lng <= east
+
+
+def mentions_iceland(texts):
+    return any(word in (text or "").lower() for text in texts for word in ICELAND_WORDS)
+
+
+def iter_cirrus(path, lang):
+    """Iceland pages from a CirrusSearch content dump (bulk-API line pairs)"""
+    with open_dump(path) as f:
+        for line in f:
+            doc = decode(line)
+            if "index" in doc or doc.get("namespace", 0) != 0:
+                continue
+            coords = [c.get("coord", {}) for c in doc.get("coordinates") or [] if c.get("primary", True)]
+            lat, lng = (coords[0].get("lat"), coords[0].get("lon")) if coords else (None, None)
+            if not in_iceland(lat, lng):
+                lat = lng = None
+                if not mentions_iceland(doc.get("category") or []):
+                    continue
+            text = doc.get("opening_text") or doc.get("text") or ""
+            yield {
+                "lang": lang,
+                "title": doc.get("title"),
+                "extract": trim(text),
+                "lat": lat,
+                "lng": lng,
+                "qid": doc.get("wikibase_item"),
+            }
+
+
+def iter_abstracts(path, lang):
+    """Iceland pages from an abstracts XML dump"""
+    with open_dump(path) as f:
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag != "doc":
+                continue
+            title = (elem.findtext("title") or "").split(": ", 1)[-1]
+            abstract = elem.findtext("abstract") or ""
+            elem.clear()
+            if title and mentions_iceland([abstract]):
+                yield {"lang": lang, "title": title, "extract": trim(abstract), "lat": None, "lng": None, "qid": None}
+
+
+def dump_language(path):
+    """'iswiki-2026...' -> 'is'"""
+    match = re.match(r"^([a-z]{2,3})wiki-", os.path.basename(path))
+    return match.group(1) if match else None
+
+
+def title_key(title):
+    """name_key of a page title without its "(disambiguation)" suffix"""
+    return name_key(_DISAMBIGUATION.sub("", title))
+
+
+def _distinct_tokens(name):
+    return {t for t in name_tokens(_DISAMBIGUATION.sub("", name)) if t not in GENERIC_SUFFIXES}
+
+
+def same_place_name(a, b):
+    """Same distinctive tokens ("Hengifoss" / "Hengifossá (foss)"), not just a shared "-foss" """
+    ta = _distinct_tokens(a)
+    return bool(ta) and ta == _distinct_tokens(b)
+
+
+def distance_m(lat1, lng1, lat2, lng2):
+    """Equirectangular distance; plenty for < 100 km"""
+    x = math.radians(lng2 - lng1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return 6371000 * math.hypot(x, y)
+
+
+class ExtractStore:
+    """Title / name / QID / coordinate lookups over the SQLite store"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.conn.row_factory = sqlite3.Row
+
+    @classmethod
+    def open(cls, path=STORE_FILE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; run: python etl/wiki_extracts.py ingest <dump>")
+        return cls(sqlite3.connect(f"file:{path}?mode=ro", uri=True))
+
+    @classmethod
+    def create(cls, path=STORE_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE IF NOT EXISTS pages (
+                lang TEXT NOT NULL, title TEXT NOT NULL, key TEXT NOT NULL,
+                extract TEXT NOT NULL, lat REAL, lng REAL, qid TEXT,
+                PRIMARY KEY (lang, title)
+            );
+            CREATE INDEX IF NOT EXISTS pages_key ON pages (key);
+            CREATE INDEX IF NOT EXISTS pages_qid ON pages (qid);
+            CREATE INDEX IF NOT EXISTS pages_geo ON pages (lat, lng);
+        """)
+        return cls(conn)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def add_many(self, pages):
+        rows = [
+            (p["lang"], p["title"], title_key(p["title"]), p["extract"], p["lat"], p["lng"], p["qid"])
+            for p in pages
+            if p["title"] and len(p["extract"]) >= MIN_EXTRACT
+        ]
+        self.conn.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.conn.commit()
+        return len(rows)
+
+    @staticmethod
+    def _best(rows, langs):
+        """First row in language preference order"""
+        rank = {lang: i for i, lang in enumerate(langs)}
+        rows = [row for row in rows if row["lang"] in rank]
+        return dict(min(rows, key=lambda r: rank[r["lang"]])) if rows else None
+
+    def by_title(self, lang, title):
+        row = self.conn.execute("SELECT * FROM pages WHERE lang = ? AND title = ?", (lang, title)).fetchone()
+        return dict(row) if row else None
+
+    def by_qid(self, qid, langs=LANGUAGES):
+        return self._best(self.conn.execute("SELECT * FROM pages WHERE qid = ?", (qid,)).fetchall(), langs)
+
+    def by_name(self, name, lat=None, lng=None, langs=LANGUAGES):
+        """Page whose title has the same name key; the nearest one when coordinates are known"""
+        rows = self.conn.execute("SELECT * FROM pages WHERE key = ?", (name_key(name),)).fetchall()
+        if lat is not None and lng is not None:
+            located = [r for r in rows if r["lat"] is not None]
+            if located:
+                nearest = min(located, key=lambda r: distance_m(lat, lng, r["lat"], r["lng"]))
+                if distance_m(lat, lng, nearest["lat"], nearest["lng"]) > NAME_RADIUS_KM * 1000:
+                    return None
+                # The nearest page and its other-language versions
+                rows = [r for r in rows if r is nearest or (nearest["qid"] and r["qid"] == nearest["qid"])]
+        return self._best(rows, langs)
+
+    def nearby(self, lat, lng, radius_m=GEO_RADIUS_M):
+        """Pages within radius_m, nearest first, as (distance, page)"""
+        dlat = radius_m / 111320
+        dlng = dlat / max(math.cos(math.radians(lat)), 0.01)
+        rows = self.conn.execute(
+            "SELECT * FROM pages WHERE lat BETWEEN ? AND ? AND lng BETWEEN ? AND ?",
+            (lat - dlat, lat + dlat, lng - dlng, lng + dlng),
+        ).fetchall()
+        hits = [(distance_m(lat, lng, r["lat"], r["lng"]), dict(r)) for r in rows]
+        return sorted((h for h in hits if h[0] <= radius_m), key=lambda h: h[0])
+
+    def lookup(self, place, langs=LANGUAGES):
+        """Best page for a place, or None"""
+        tags = place.get("tags") if isinstance(place.get("tags"), dict) else {}
+        for value in (place.get("wikipedia"), tags.get("wikipedia")):
+            lang, title = parse_wikipedia_tag(value)
+            if lang:
+                page = self.by_title(lang, title)
+                if page:
+                    # Prefer the same article in a preferred language when we have it
+                    return (self.by_qid(page["qid"], langs) if page["qid"] else None) or page
+        qid = place.get("wikidata") or tags.get("wikidata")
+        if qid:
+            page = self.by_qid(qid, langs)
+            if page:
+                return page
+
+        name = place.get("name")
+        lat, lng = place.get("lat"), place.get("lng", place.get("lon"))
+        if name:
+            page = self.by_name(name, lat, lng, langs)
+            if page:
+                return page
+        if name and lat is not None and lng is not None:
+            for _, page in self.nearby(lat, lng):
+                if same_place_name(name, page["title"]):
+                    return page
+        return None
+
+    def close(self):
+        self.conn.close()
+
+
+def ingest(dump_path, store_path=STORE_FILE, lang=None, out=sys.stdout):
+    """Add a dump's Iceland pages to the store; returns pages kept"""
+    lang = lang or dump_language(dump_path)
+    if not lang:
+        raise ValueError(f"Cannot tell the language of {dump_path}; pass --lang")
+    is_xml = ".xml" in os.path.basename(dump_path)
+    pages = iter_abstracts(dump_path, lang) if is_xml else iter_cirrus(dump_path, lang)
+
+    store = ExtractStore.create(store_path)
+    kept = 0
+    batch = []
+    start = time.time()
+    for page in pages:
+        batch.append(page)
+        if len(batch) >= COMMIT_EVERY:
+            kept += store.add_many(batch)
+            batch = []
+            print(f"   {kept:,} {lang} pages kept ({time.time() - start:.0f}s)", file=out)
+    kept += store.add_many(batch)
+    store.close()
+    return kept
+
+
+# One read-only connection per worker process
+_STORES = {}
+
+
+def enrich_place(place, store_path=STORE_FILE, langs=LANGUAGES):
+    """Attach wikipedia_extract (and a missing description) from the local store"""
+    store = _STORES.get(store_path)
+    if store is None:
+        store = _STORES[store_path] = ExtractStore.open(store_path)
+    page = store.lookup(place, langs)
+    if page:
+        place["wikipedia_extract"] = {"lang": page["lang"], "title": page["title"], "extract": page["extract"]}
+        if not place.get("description"):
+            place["description"] = page["extract"]
+    return place
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Wikipedia extracts for Iceland places")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="Add a CirrusSearch or abstracts dump to the store")
+    p.add_argument("dump")
+    p.add_argument("--lang", help="Dump language (default: from the file name)")
+    p.add_argument("--store", default=STORE_FILE)
+
+    p = sub.add_parser("enrich", help="Attach extracts to places")
+    p.add_argument("input")
+    p.add_argument("output")
+    p.add_argument("--store", default=STORE_FILE)
+    p.add_argument("--langs", default=",".join(LANGUAGES), help="Preferred languages, in order")
+    p.add_argument("--workers", type=int)
+
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        print(f"📥 Ingesting {args.dump} -> {args.store}")
+        start = time.time()
+        kept = ingest(args.dump, args.store, args.lang)
+        print(f"✅ {kept:,} Iceland pages stored in {time.time() - start:.1f}s")
+        return
+
+    out = console(args.output)
+    ExtractStore.open(args.store).close()
+    stats = {"matched": 0, "total": 0}
+    work = partial(enrich_place, store_path=args.store, langs=tuple(args.langs.split(",")))
+
+    def process(places):
+        for place in parallel_map(work, places, args.workers):
+            stats["total"] += 1
+            stats["matched"] += "wikipedia_extract" in place
+            yield place
+
+    start = time.time()
+    write_records(args.output, process(iter_records(args.input)))
+    print(f"✅ {stats['matched']} of {stats['total']} places matched in {time.time() - start:.1f}s "
+          f"-> {args.output}", file=out)
+
+
+if __name__ == "__main__":
+    main()
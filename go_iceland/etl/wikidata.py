@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+GO ICELAND - Wikidata Index
+Local QID index built from a Wikidata JSON dump, joined onto places offline
+
+The dump (e.g. an Iceland-filtered extract of latest-all.json.gz, or
+one entity per line NDJSON; .gz/.bz2 read directly) is streamed one
+entity at a time and reduced to what the app uses:
+
+    labels      en / is
+    sitelinks   enwiki / iswiki titles
+    image       Commons file name (P18)
+    coordinates P625
+    heritage    heritage designation QIDs (P1435)
+
+Heritage designation items (P1435 targets) have no Iceland coordinates or
+country, so the ones kept entities refer to are picked up in a second
+pass over the dump, whatever their location, to label them.
+
+Entries go into an SQLite file (data/wikidata_index.sqlite) with a second
+table mapping Wikipedia titles in every language back to QIDs, so places
+that only carry an OSM wikipedia tag ("is:Geysir", "de:Gunnuhver") join
+as well. Enrichment is then one local lookup per place instead of several
+network calls.
+
+Usage:
+    python etl/wikidata.py ingest iceland-wikidata.json.gz
+    python etl/wikidata.py join data/iceland_clean_geohash.json data/iceland_wikidata.json
+
+    index = WikidataIndex.open()
+    entry = index.lookup(place)      # via wikidata QID or wikipedia tag
+"""
+import argparse
+import bz2
+import gzip
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from urllib.parse import quote
+
+from json_io import STDIO, console, decode, iter_records, write_records
+
+INDEX_FILE = "./data/wikidata_index.sqlite"
+
+LANGUAGES = ("en", "is")
+SITES = {"enwiki": "en", "iswiki": "is"}
+# *wiki sites that are not a language Wikipedia
+NON_WIKIPEDIA = {"commonswiki", "specieswiki", "wikidatawiki", "metawiki", "mediawikiwiki", "sourceswiki"}
+ICELAND = "Q189"
+# Generous Iceland bounding box (south, west, north, east)
+ICELAND_BBOX = (62.5, -25.5, 67.5, -12.0)
+COMMIT_EVERY = 10000
+
+_QID = re.compile(r"^Q\d+$")
+_LANG = re.compile(r"^[a-z]{2,3}(-[a-z]+)*$")
+
+
+def open_dump(path):
+    """Text stream over a plain, gzip or bzip2 dump"""
+    if path == STDIO:
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def iter_entities(path):
+    """
+    Entities from a Wikidata dump, one at a time. Handles the official
+    array format ("[", one entity per line with a trailing comma, "]")
+    and NDJSON.
+    """
+    with open_dump(path) as f:
+        for line in f:
+            line = line.strip().rstrip(",")
+            if not line or line in ("[", "]"):
+                continue
+            yield decode(line)
+
+
+def _claim_values(entity, prop):
+    for claim in entity.get("claims", {}).get(prop, []):
+        if claim.get("rank") == "deprecated":
+            continue
+        value = claim.get("mainsnak", {}).get("datavalue", {}).get("value")
+        if value is not None:
+            yield value
+
+
+def _in_iceland(coordinates):
+    south, west, north, east = ICELAND_BBOX
+    return coordinates and south <= coordinates["lat"] <= north and west <= coordinates["lng"] <= east
+
+
+def wikipedia_titles(entity):
+    """{lang: title} for every language Wikipedia the item is linked from"""
+    return {
+        site[:-4].replace("_", "-"): link["title"]
+        for site, link in entity.get("sitelinks", {}).items()
+        if site.endswith("wiki") and site not in NON_WIKIPEDIA
+    }
+
+
+def reduce_entity(entity, iceland_only=True):
+    """(qid, compact entry, all Wikipedia titles) for an item, or None if it is not wanted"""
+    qid = entity.get("id", "")
+    if not qid.startswith("Q"):
+        return None
+
+    coordinates = None
+    for value in _claim_values(entity, "P625"):
+        if value.get("globe", "").endswith("/Q2"):
+            coordinates = {"lat": value["latitude"], "lng": value["longitude"]}
+            break
+    countries = {v.get("id") for v in _claim_values(entity, "P17")}
+    if iceland_only and ICELAND not in countries and not _in_iceland(coordinates):
+        return None
+
+    labels = entity.get("labels", {})
+    sitelinks = entity.get("sitelinks", {})
+    entry = {
+        "labels": {lang: labels[lang]["value"] for lang in LANGUAGES if lang in labels},
+        "sitelinks": {lang: sitelinks[site]["title"] for site, lang in SITES.items() if site in sitelinks},
+        "image": next(_claim_values(entity, "P18"), None),
+        "coordinates": coordinates,
+        "heritage": [v["id"] for v in _claim_values(entity, "P1435") if "id" in v],
+        "instance_of": [v["id"] for v in _claim_values(entity, "P31") if "id" in v],
+    }
+    description = entity.get("descriptions", {}).get("en")
+    if description:
+        entry["description"] = description["value"]
+    return qid, entry, wikipedia_titles(entity)
+
+
+def commons_url(filename):
+    """Direct upload.wikimedia.org URL for a Commons file name"""
+    name = filename.replace(" ", "_")
+    digest = hashlib.md5(name.encode("utf-8")).hexdigest()
+    return f"https://upload.wikimedia.org/wikipedia/commons/{digest[0]}/{digest[:2]}/{quote(name)}"
+
+
+def parse_wikipedia_tag(value):
+    """OSM wikipedia tag "is:Geysir" -> ("is", "Geysir")"""
+    if not isinstance(value, str) or ":" not in value:
+        return None, None
+    lang, _, title = value.partition(":")
+    lang = lang.strip().lower()
+    if not _LANG.match(lang) or not title.strip():
+        return None, None
+    title = title.strip().replace("_", " ")
+    return lang, title[:1].upper() + title[1:]
+
+
+class WikidataIndex:
+    """QID -> entry lookups over the SQLite index"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    @classmethod
+    def open(cls, path=INDEX_FILE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; run: python etl/wikidata.py ingest <dump>")
+        return cls(sqlite3.connect(path))
+
+    @classmethod
+    def create(cls, path=INDEX_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE IF NOT EXISTS entities (qid TEXT PRIMARY KEY, data TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS sitelinks (
+                lang TEXT NOT NULL, title TEXT NOT NULL, qid TEXT NOT NULL,
+                PRIMARY KEY (lang, title)
+            );
+        """)
+        return cls(conn)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+
+    def add_many(self, items):
+        """Insert (qid, entry, titles) items from reduce_entity(); call commit() afterwards"""
+        rows, links = [], []
+        for qid, entry, titles in items:
+            rows.append((qid, json.dumps(entry, ensure_ascii=False, separators=(",", ":"))))
+            links.extend((lang, title, qid) for lang, title in titles.items())
+        self.conn.executemany("INSERT OR REPLACE INTO entities VALUES (?, ?)", rows)
+        self.conn.executemany("INSERT OR REPLACE INTO sitelinks VALUES (?, ?, ?)", links)
+
+    def commit(self):
+        self.conn.commit()
+
+    def get(self, qid):
+        row = self.conn.execute("SELECT data FROM entities WHERE qid = ?", (qid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def qid_for_title(self, lang, title):
+        row = self.conn.execute("SELECT qid FROM sitelinks WHERE lang = ? AND title = ?", (lang, title)).fetchone()
+        return row[0] if row else None
+
+    def place_qid(self, place):
+        """QID from a wikidata field/tag, a QID stored as wikipedia, or a wikipedia sitelink"""
+        tags = place.get("tags") if isinstance(place.get("tags"), dict) else {}
+        for value in (place.get("wikidata"), tags.get("wikidata"), place.get("wikipedia")):
+            if isinstance(value, str) and _QID.match(value.strip()):
+                return value.strip()
+        for value in (place.get("wikipedia"), tags.get("wikipedia")):
+            lang, title = parse_wikipedia_tag(value)
+            if lang:
+                qid = self.qid_for_title(lang, title)
+                if qid:
+                    return qid
+        return None
+
+    def lookup(self, place):
+        """(qid, entry) for a place, or (None, None)"""
+        qid = self.place_qid(place)
+        entry = self.get(qid) if qid else None
+        return (qid, entry) if entry else (None, None)
+
+    def heritage(self, entry):
+        """[{"qid", "label"}, ...] for an entry's heritage designations"""
+        return [
+            {"qid": qid, "label": (self.get(qid) or {}).get("labels", {}).get("en")}
+            for qid in entry.get("heritage") or []
+        ]
+
+    def close(self):
+        self.conn.close()
+
+
+def ingest(dump_path, index_path=INDEX_FILE, iceland_only=True, out=sys.stdout):
+    """Stream a dump into a fresh index; returns (seen, kept)"""
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    index = WikidataIndex.create(index_path)
+    seen = kept = 0
+    batch = []
+    designations = set()
+    start = time.time()
+    for entity in iter_entities(dump_path):
+        seen += 1
+        reduced = reduce_entity(entity, iceland_only)
+        if reduced:
+            batch.append(reduced)
+            designations.update(reduced[1]["heritage"])
+        if len(batch) >= COMMIT_EVERY:
+            index.add_many(batch)
+            index.commit()
+            kept += len(batch)
+            batch = []
+            print(f"   {seen:,} entities read, {kept:,} kept ({time.time() - start:.0f}s)", file=out)
+    index.add_many(batch)
+    index.commit()
+    kept += len(batch)
+
+    # Designations that fell outside the filter, for their labels
+    missing = {qid for qid in designations if index.get(qid) is None}
+    if missing and dump_path == STDIO:
+        print(f"⚠️  {len(missing)} heritage designations not in the dump's Iceland subset "
+              f"(stdin cannot be re-read; labels will be missing)", file=out)
+    elif missing:
+        print(f"   second pass for {len(missing)} heritage designations", file=out)
+        found = [reduced for reduced in (reduce_entity(entity, iceland_only=False)
+                                         for entity in iter_entities(dump_path)
+                                         if entity.get("id") in missing) if reduced]
+        index.add_many(found)
+        index.commit()
+        kept += len(found)
+    index.close()
+    return seen, kept
+
+
+def join_place(place, index):
+    """
+    Fill a place from its Wikidata entry (existing values win).
+
+    Returns:
+        True if the place matched an entry
+    """
+    qid, entry = index.lookup(place)
+    if not entry:
+        return False
+
+    place["wikidata"] = qid
+    sitelinks = entry["sitelinks"]
+    if not place.get("wikipedia") or _QID.match(str(place["wikipedia"])):
+        lang = "is" if "is" in sitelinks else "en" if "en" in sitelinks else None
+        place["wikipedia"] = f"{lang}:{sitelinks[lang]}" if lang else None
+    if sitelinks:
+        place["wikipedia_titles"] = sitelinks
+    if entry["labels"]:
+        place.setdefault("names", {}).update({k: v for k, v in entry["labels"].items()
+                                              if k not in place.get("names", {})})
+    if entry["image"]:
+        url = commons_url(entry["image"])
+        images = place.get("images") or []
+        if url not in images:
+            place["images"] = [url] + images
+    if entry["heritage"]:
+        place["heritage"] = index.heritage(entry)
+    if entry["coordinates"] and (place.get("lat") is None or place.get("lng") is None):
+        place["lat"], place["lng"] = entry["coordinates"]["lat"], entry["coordinates"]["lng"]
+    if entry.get("description") and not place.get("description"):
+        place["description"] = entry["description"]
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wikidata dump -> local QID index -> place enrichment")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="Build the index from a dump")
+    p.add_argument("dump", help="Wikidata JSON dump (.json, .ndjson, .gz, .bz2; - for stdin)")
+    p.add_argument("--index", default=INDEX_FILE)
+    p.add_argument("--all", action="store_true", help="Keep entities outside Iceland too")
+
+    p = sub.add_parser("join", help="Enrich places from the index")
+    p.add_argument("input")
+    p.add_argument("output")
+    p.add_argument("--index", default=INDEX_FILE)
+
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        print(f"📥 Ingesting {args.dump} -> {args.index}")
+        start = time.time()
+        seen, kept = ingest(args.dump, args.index, iceland_only=not args.all)
+        print(f"✅ {kept:,} of {seen:,} entities indexed in {time.time() - start:.1f}s")
+        return
+
+    out = console(args.output)
+    index = WikidataIndex.open(args.index)
+    stats = {"matched": 0, "total": 0}
+
+    def process(places):
+        for place in places:
+            stats["total"] += 1
+            stats["matched"] += join_place(place, index)
+            yield place
+
+    write_records(args.output, process(iter_records(args.input)))
+    index.close()
+    print(f"✅ {stats['matched']} of {stats['total']} places joined to Wikidata -> {args.output}", file=out)
+
+
+if __name__ == "__main__":
+    main()
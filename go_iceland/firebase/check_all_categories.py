@@ -1,14 +1,11 @@
 #!/usr/bin/env python3
 """Get all unique categories from Firestore"""
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_client import get_db
 from collections import Counter
 
 # Initialize
-cred = credentials.Certificate('serviceAccountKey.json')
-app = firebase_admin.initialize_app(cred, name='check_cats')
-db = firestore.client(app)
+db = get_db()
 
 # Get ALL places
 print("\n📊 Fetching all places from Firestore...")
@@ -37,5 +34,3 @@ for cat, count in categories.most_common():
     examples = places_by_cat[cat][:3]
     for ex in examples:
         print(f"    - {ex}")
-
-firebase_admin.delete_app(app)
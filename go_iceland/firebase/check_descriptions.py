@@ -1,13 +1,10 @@
 #!/usr/bin/env python3
 """Check descriptions in Firestore"""
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_client import get_db
 
 # Initialize
-cred = credentials.Certificate('serviceAccountKey.json')
-app = firebase_admin.initialize_app(cred, name='check_desc')
-db = firestore.client(app)
+db = get_db()
 
 # Get sample places by category
 categories = ['restaurant', 'cafe', 'hotel', 'waterfall', 'glacier', 'hot_spring']
@@ -49,5 +46,3 @@ for category in categories:
         print(f"     Images: {images_count}, Desc length: {len(desc_text) if desc_text else 0}")
         if desc_text and len(desc_text) > 0:
             print(f"     Preview: {desc_text[:80]}...")
-
-firebase_admin.delete_app(app)
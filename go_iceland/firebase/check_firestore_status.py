@@ -1,17 +1,15 @@
 #!/usr/bin/env python3
 """Check Firestore database status"""
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_client import get_db
+from firestore_reports import count_documents
 
 # Initialize Firebase
-cred = credentials.Certificate('serviceAccountKey.json')
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+db = get_db()
 
-# Count documents
-places_count = len(db.collection('places').get())
-trails_count = len(db.collection('trails').get())
+# Count documents (server-side aggregation, no full collection read)
+places_count = count_documents(db, 'places')
+trails_count = count_documents(db, 'trails')
 
 print(f"\n📊 FIRESTORE STATUS:")
 print(f"  Places: {places_count} documents")
@@ -1,13 +1,10 @@
 #!/usr/bin/env python3
 """Check specific trail in Firestore"""
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_client import get_db
 
 # Initialize
-cred = credentials.Certificate('serviceAccountKey.json')
-app = firebase_admin.initialize_app(cred, name='check_trail')
-db = firestore.client(app)
+db = get_db()
 
 # Get Laugavegur trail
 docs = db.collection('trails').where('name', '==', 'Laugavegur').get()
@@ -22,5 +19,3 @@ if docs:
     print(f"   Keys: {list(trail.keys())[:15]}")
 else:
     print("Trail not found")
-
-firebase_admin.delete_app(app)
@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 """Check if restaurants, hotels, hostels, camping have descriptions"""
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+import os
+import sys
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from firebase_client import get_db
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "etl"))
+from facets import FacetIndex
 
 # Initialize
-cred = credentials.Certificate('serviceAccountKey.json')
-app = firebase_admin.initialize_app(cred, name='check_places')
-db = firestore.client(app)
+db = get_db()
 
 categories_to_check = {
     'restaurant': 'Veitingastaðir',
@@ -17,50 +22,44 @@ categories_to_check = {
     'cafe': 'Kaffihús'
 }
 
+
+def description_text(data):
+    """English (or plain) description from content{} or description"""
+    if 'content' in data:
+        content = data.get('content', {})
+        if isinstance(content, dict):
+            if 'en' in content:
+                return content['en'].get('description', '')
+            return content.get('description', '')
+        return None
+    return data.get('description', '')
+
+
+def has_description(data):
+    desc_text = description_text(data)
+    return bool(desc_text and len(desc_text) > 20)
+
+
+def has_images(data):
+    return len(data.get('images', [])) > 0
+
+
+# One query for all service categories, then bitset counts per category
+docs = db.collection('places').where(filter=FieldFilter('category', 'in', list(categories_to_check))).get()
+index = FacetIndex.build(
+    (doc.to_dict() for doc in docs),
+    flags={'has_description': has_description, 'has_images': has_images},
+)
+
 print("\n📋 DESCRIPTION STATUS BY CATEGORY:\n")
 
 for cat_id, cat_name in categories_to_check.items():
-    docs = db.collection('places').where('category', '==', cat_id).get()
-    
-    total = len(docs)
-    with_desc = 0
-    with_images = 0
-    without_anything = 0
-    
-    samples = []
-    
-    for doc in docs:
-        data = doc.to_dict()
-        name = data.get('name', 'Unknown')
-        
-        # Check description
-        has_desc = False
-        desc_text = None
-        
-        if 'content' in data:
-            content = data.get('content', {})
-            if isinstance(content, dict):
-                if 'en' in content:
-                    desc_text = content['en'].get('description', '')
-                elif 'description' in content:
-                    desc_text = content.get('description', '')
-                has_desc = bool(desc_text and len(desc_text) > 20)
-        elif 'description' in data:
-            desc_text = data.get('description', '')
-            has_desc = bool(desc_text and len(desc_text) > 20)
-        
-        # Check images
-        images = data.get('images', [])
-        has_images = len(images) > 0
-        
-        if has_desc:
-            with_desc += 1
-        if has_images:
-            with_images += 1
-        if not has_desc and not has_images:
-            without_anything += 1
-            if len(samples) < 5:
-                samples.append(name)
+    total = index.count(category=cat_id)
+    with_desc = index.count(category=cat_id, has_description=True)
+    with_images = index.count(category=cat_id, has_images=True)
+    missing = index.find(category=cat_id, has_description=False, has_images=False)
+    without_anything = len(missing)
+    samples = [data.get('name', 'Unknown') for data in missing[:5]]
     
     print(f"🔸 {cat_name.upper()} ({cat_id}):")
     print(f"   Total: {total}")
@@ -73,5 +72,3 @@ for cat_id, cat_name in categories_to_check.items():
         for s in samples:
             print(f"     - {s}")
     print()
-
-firebase_admin.delete_app(app)
@@ -1,14 +1,11 @@
 #!/usr/bin/env python3
 """Check trail data structure in Firestore"""
 
-from firebase_admin import credentials, firestore
-import firebase_admin
+from firebase_client import get_db
 import json
 
 # Initialize Firebase
-cred = credentials.Certificate('serviceAccountKey.json')
-app = firebase_admin.initialize_app(cred, name='check_trail')
-db = firestore.client(app)
+db = get_db()
 
 # Get a sample trail
 doc = db.collection('trails').limit(1).get()[0]
@@ -28,4 +25,3 @@ if 'coordinates' in data:
     print(f"Has coordinates: {data['coordinates']}")
 
 # Clean up
-firebase_admin.delete_app(app)
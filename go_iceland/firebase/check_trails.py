@@ -1,13 +1,10 @@
 #!/usr/bin/env python3
 """Check trail descriptions in Firestore"""
 
-from firebase_admin import credentials, firestore
-import firebase_admin
+from firebase_client import get_db
 
 # Initialize Firebase
-cred = credentials.Certificate('serviceAccountKey.json')
-app = firebase_admin.initialize_app(cred, name='check_trails')
-db = firestore.client(app)
+db = get_db()
 
 print("📊 CHECKING TRAIL DESCRIPTIONS")
 print("=" * 60)
@@ -87,6 +84,4 @@ print(f"✅ Trails with descriptions: {with_desc}/{len(all_trails)} ({with_desc*
 print(f"❌ Trails without descriptions: {without_desc}/{len(all_trails)} ({without_desc*100//len(all_trails) if len(all_trails) > 0 else 0}%)")
 print(f"📝 Using content.en.description format: {with_content}")
 
-# Clean up
-firebase_admin.delete_app(app)
 print("\n✅ Done!")
@@ -2,16 +2,12 @@
 Script to generate master JSON file from current Firestore data
 Run this to create the initial iceland_places_master.json
 """
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_client import get_db
 import json
 from datetime import datetime
 
 # Initialize Firebase
-cred = credentials.Certificate("./firebase/serviceAccountKey.json")
-firebase_admin.initialize_app(cred)
-
-db = firestore.client()
+db = get_db()
 
 print("🔥 Exporting Firestore data to master JSON...")
 
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+🔥 PARTITIONED FIRESTORE EXPORT
+Exports whole collections to NDJSON using partition queries
+
+Each collection is split into N ranges with get_partitions() and every range
+is streamed by its own worker straight to disk, so memory stays flat no
+matter how big the collection gets.
+
+Usage:
+    python firebase/export_partitioned.py
+    python firebase/export_partitioned.py --collections places trails --workers 8
+
+Output:
+    data/export/places.ndjson
+    data/export/trails.ndjson
+"""
+
+import argparse
+import datetime
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from google.cloud.firestore_v1 import DocumentReference, GeoPoint
+
+from firebase_client import get_db
+
+DEFAULT_COLLECTIONS = ["places", "trails"]
+DEFAULT_WORKERS = 8
+OUTPUT_DIR = "./data/export"
+
+
+def to_json_value(value):
+    """json.dumps default= hook for Firestore-only types"""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, GeoPoint):
+        return {"lat": value.latitude, "lng": value.longitude}
+    if isinstance(value, DocumentReference):
+        return value.path
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def export_partition(query, part_path):
+    """
+    Stream one partition to its own NDJSON part file.
+
+    Returns:
+        Number of documents written
+    """
+    count = 0
+    with open(part_path, "w", encoding="utf-8") as f:
+        for doc in query.stream():
+            # Partition queries are collection-group queries: skip same-named
+            # subcollections (e.g. places/x/trails) and keep the top-level one
+            if doc.reference.parent.parent is not None:
+                continue
+            record = doc.to_dict()
+            record["id"] = doc.id
+            f.write(json.dumps(record, ensure_ascii=False, default=to_json_value))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def export_collection(db, collection_name, workers=DEFAULT_WORKERS, output_dir=OUTPUT_DIR):
+    """
+    Export a collection in parallel ranges and join the parts in order.
+
+    Args:
+        db: Firestore client
+        collection_name: Collection id (top-level)
+        workers: Number of partitions / worker threads
+        output_dir: Directory for the .ndjson file
+
+    Returns:
+        (output_path, document_count)
+    """
+    print(f"\n📥 Exporting '{collection_name}' with {workers} workers...")
+    start = time.time()
+
+    # get_partitions() only exists on collection groups (export_partition drops
+    # subcollection documents) and may return fewer ranges than requested
+    partitions = list(db.collection_group(collection_name).get_partitions(workers))
+    print(f"   {len(partitions)} partitions")
+
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"{collection_name}.ndjson")
+    part_paths = [f"{output_path}.part{i}" for i in range(len(partitions))]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        counts = list(pool.map(
+            export_partition,
+            [partition.query() for partition in partitions],
+            part_paths,
+        ))
+
+    # Partitions are ordered, so concatenating keeps document-path order
+    with open(output_path, "wb") as out:
+        for part_path in part_paths:
+            with open(part_path, "rb") as part:
+                shutil.copyfileobj(part, out)
+            os.remove(part_path)
+
+    total = sum(counts)
+    print(f"✅ {collection_name}: {total} documents in {time.time() - start:.1f}s → {output_path}")
+    return output_path, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Firestore collections to NDJSON in parallel")
+    parser.add_argument("--collections", nargs="+", default=DEFAULT_COLLECTIONS, help="Collections to export")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Partitions / worker threads per collection")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="Output directory")
+    parser.add_argument("--cred", help="Service account key path (default: FIREBASE_SERVICE_ACCOUNT or firebase/serviceAccountKey.json)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🔥 PARTITIONED FIRESTORE EXPORT")
+    print("=" * 60)
+
+    db = get_db(args.cred)
+
+    for collection_name in args.collections:
+        export_collection(db, collection_name, args.workers, args.output_dir)
+
+    print("\n" + "=" * 60)
+    print("✅ EXPORT COMPLETE!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
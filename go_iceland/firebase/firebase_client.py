@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+🔥 SHARED FIREBASE CLIENT
+One lazily created Firebase app, Firestore client and Storage bucket per process
+
+Every tool gets its clients from here instead of calling initialize_app at
+import time, so a long-running process (pipeline runner, notebook) reuses one
+gRPC channel and one pooled HTTP session.
+
+Environment:
+    FIREBASE_SERVICE_ACCOUNT        Service account key (default: firebase/serviceAccountKey.json,
+                                    then ./serviceAccountKey.json)
+    GOOGLE_APPLICATION_CREDENTIALS  Fallback key path
+    FIRESTORE_PROJECT_ID            Project id (default: go-iceland)
+    FIREBASE_BUCKET                 Storage bucket (default: <project>.firebasestorage.app,
+                                    i.e. go-iceland.firebasestorage.app)
+    FIRESTORE_EMULATOR_HOST         Use the local Firestore emulator, no key needed
+    FIREBASE_HTTP_POOL_SIZE         Pooled HTTP connections for Storage (default: 32)
+
+Usage:
+    from firebase_client import get_db, get_bucket
+    db = get_db()
+"""
+
+import json
+import os
+import threading
+
+import firebase_admin
+from firebase_admin import credentials, firestore, storage
+from requests.adapters import HTTPAdapter
+
+FIREBASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SERVICE_ACCOUNT = os.path.join(FIREBASE_DIR, "serviceAccountKey.json")
+DEFAULT_PROJECT_ID = "go-iceland"
+DEFAULT_HTTP_POOL_SIZE = 32
+
+_lock = threading.RLock()
+_app = None
+_db = None
+_bucket = None
+
+
+def project_id():
+    return os.getenv("FIRESTORE_PROJECT_ID", DEFAULT_PROJECT_ID)
+
+
+def bucket_name():
+    # Projects created since late 2024 get <project>.firebasestorage.app, not .appspot.com
+    return os.getenv("FIREBASE_BUCKET", f"{project_id()}.firebasestorage.app")
+
+
+def resolve_service_account(cred_path=None):
+    """
+    Pick the service account key: explicit path, then env vars, then the defaults.
+
+    Raises:
+        FileNotFoundError: No key at the chosen path
+        ValueError: The file is not a service account key (e.g. google-services.json)
+    """
+    path = (
+        cred_path
+        or os.getenv("FIREBASE_SERVICE_ACCOUNT")
+        or os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+        or DEFAULT_SERVICE_ACCOUNT
+    )
+    if path == DEFAULT_SERVICE_ACCOUNT and not os.path.exists(path) and os.path.exists("serviceAccountKey.json"):
+        # Older instructions (travel_super_app/scripts) keep the key next to the script
+        path = "serviceAccountKey.json"
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"Service account key not found: {path}\n"
+            "Download it from Firebase Console → Project Settings → Service Accounts "
+            "and save it as firebase/serviceAccountKey.json (or set FIREBASE_SERVICE_ACCOUNT)"
+        )
+
+    with open(path, "r", encoding="utf-8") as f:
+        key = json.load(f)
+    if key.get("type") != "service_account":
+        hint = " (this is an Android google-services.json)" if "project_info" in key else ""
+        raise ValueError(f"{path} is not a service account key{hint}")
+
+    return path
+
+
+def get_app(cred_path=None):
+    """
+    Return the default Firebase app, initializing it on first use.
+
+    cred_path only matters on the first call; later calls reuse the same app.
+    """
+    global _app
+    with _lock:
+        if _app is None:
+            if firebase_admin._apps:
+                _app = firebase_admin.get_app()
+            else:
+                cred = credentials.Certificate(resolve_service_account(cred_path))
+                _app = firebase_admin.initialize_app(cred, {
+                    "projectId": project_id(),
+                    "storageBucket": bucket_name(),
+                })
+        return _app
+
+
+def get_db(cred_path=None):
+    """Return the shared Firestore client (emulator if FIRESTORE_EMULATOR_HOST is set)"""
+    global _db
+    with _lock:
+        if _db is None:
+            if os.getenv("FIRESTORE_EMULATOR_HOST"):
+                # The emulator accepts anonymous credentials, so skip the key entirely
+                from google.cloud import firestore as gcloud_firestore
+                _db = gcloud_firestore.Client(project=project_id())
+            else:
+                _db = firestore.client(get_app(cred_path))
+        return _db
+
+
+def get_bucket(cred_path=None):
+    """Return the shared Storage bucket with a pooled HTTP session"""
+    global _bucket
+    with _lock:
+        if _bucket is None:
+            _bucket = storage.bucket(app=get_app(cred_path))
+            pool_size = int(os.getenv("FIREBASE_HTTP_POOL_SIZE", DEFAULT_HTTP_POOL_SIZE))
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _bucket.client._http.mount("https://", adapter)
+        return _bucket
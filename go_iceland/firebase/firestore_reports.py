@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+📊 FIRESTORE AGGREGATION REPORTS
+Status and audit numbers from server-side count()/sum()/avg() queries
+
+Every number here is one aggregation query, billed as a handful of index
+reads instead of a full collection scan.
+
+Usage:
+    python firebase/firestore_reports.py
+    python firebase/firestore_reports.py --regions Suðurland Vesturland
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from firebase_client import get_db
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "etl"))
+from enrich_pois import CATEGORY_MAP, REGION_MAP
+
+OUTPUT = "./data/firestore_report.json"
+
+# Values written by etl/enrich_pois.py
+CATEGORIES = sorted(set(CATEGORY_MAP.values()) | {"other"})
+REGIONS = sorted(set(REGION_MAP.values()) | {"Other"})
+
+
+def run_aggregation(aggregation_query):
+    """Run an AggregationQuery and return {alias: value}"""
+    results = aggregation_query.get()
+    return {result.alias: result.value for result in results[0]}
+
+
+def filtered(db, collection_name, filters=()):
+    """Collection query with (field, op, value) filters applied"""
+    query = db.collection(collection_name)
+    for field, op, value in filters:
+        query = query.where(filter=FieldFilter(field, op, value))
+    return query
+
+
+def count_documents(db, collection_name, filters=()):
+    """Server-side document count"""
+    query = filtered(db, collection_name, filters)
+    return run_aggregation(query.count(alias="count"))["count"]
+
+
+def numeric_stats(db, collection_name, fields, filters=()):
+    """
+    count plus sum/avg for each numeric field, in a single aggregation query.
+
+    Returns:
+        {"count": n, "<field>_sum": x, "<field>_avg": y, ...}
+    """
+    aggregation = filtered(db, collection_name, filters).count(alias="count")
+    for field in fields:
+        aggregation = aggregation.sum(field, alias=f"{field}_sum")
+        aggregation = aggregation.avg(field, alias=f"{field}_avg")
+    return run_aggregation(aggregation)
+
+
+def count_by(db, collection_name, field, values, filters=()):
+    """Count documents per value of field (e.g. per category or region)"""
+    counts = {}
+    for value in values:
+        count = count_documents(db, collection_name, [(field, "==", value), *filters])
+        if count:
+            counts[value] = count
+    return counts
+
+
+def places_report(db, categories=CATEGORIES, regions=REGIONS):
+    """
+    Places health report.
+
+    Missing images means images == [] (documents without an images field
+    are not matched by the equality filter).
+    """
+    no_images = [("images", "==", [])]
+    return {
+        "total": count_documents(db, "places"),
+        "stats": numeric_stats(db, "places", ["popularity", "rating"]),
+        "missing_images": count_documents(db, "places", no_images),
+        "by_category": count_by(db, "places", "category", categories),
+        "by_region": count_by(db, "places", "region", regions),
+        "missing_images_by_category": count_by(db, "places", "category", categories, no_images),
+    }
+
+
+def trails_report(db):
+    """Trails health report"""
+    return {
+        "total": count_documents(db, "trails"),
+        "stats": numeric_stats(db, "trails", ["distance_km", "duration_hours"]),
+        "by_difficulty": count_by(db, "trails", "difficulty", ["easy", "moderate", "challenging", "expert"]),
+    }
+
+
+def print_counts(title, counts):
+    print(f"\n{title}:")
+    for key, count in sorted(counts.items(), key=lambda x: -x[1]):
+        print(f"  {key:25s}: {count:5d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Firestore status report from aggregation queries")
+    parser.add_argument("--categories", nargs="+", default=CATEGORIES, help="Category values to count")
+    parser.add_argument("--regions", nargs="+", default=REGIONS, help="Region values to count")
+    parser.add_argument("--output", default=OUTPUT, help="JSON report path")
+    parser.add_argument("--cred", help="Service account key path (default: FIREBASE_SERVICE_ACCOUNT or firebase/serviceAccountKey.json)")
+    args = parser.parse_args()
+
+    db = get_db(args.cred)
+
+    print("📊 FIRESTORE AGGREGATION REPORT")
+    print("=" * 60)
+
+    report = {
+        "places": places_report(db, args.categories, args.regions),
+        "trails": trails_report(db),
+    }
+
+    places = report["places"]
+    trails = report["trails"]
+    print(f"Places: {places['total']}  (missing images: {places['missing_images']})")
+    print(f"  popularity avg: {places['stats']['popularity_avg']}")
+    print(f"  rating avg:     {places['stats']['rating_avg']}")
+    print(f"Trails: {trails['total']}")
+    print(f"  distance avg:   {trails['stats']['distance_km_avg']} km")
+    print_counts("📋 Places by category", places["by_category"])
+    print_counts("🗺️  Places by region", places["by_region"])
+    print_counts("🖼️  Missing images by category", places["missing_images_by_category"])
+    print_counts("🥾 Trails by difficulty", trails["by_difficulty"])
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n💾 Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
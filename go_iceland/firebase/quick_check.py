@@ -1,9 +1,6 @@
-from firebase_admin import credentials, firestore
-import firebase_admin
+from firebase_client import get_db
 
-cred = credentials.Certificate('serviceAccountKey.json')
-app = firebase_admin.initialize_app(cred, name='test')
-db = firestore.client(app)
+db = get_db()
 
 # Check total count
 places = list(db.collection('places').limit(10).stream())
@@ -20,5 +17,4 @@ for cat in categories:
         has_desc = has_content and 'description' in data['content']['en']
         print(f'   - {data.get("name")}: content.en.description = {has_desc}')
 
-firebase_admin.delete_app(app)
 print('\n✅ Done')
@@ -2,15 +2,10 @@
 Quick uploader - Uses existing JSON files to upload to Firestore
 """
 import json
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_client import get_db
 
 # Initialize Firebase
-cred = credentials.Certificate("firebase/serviceAccountKey.json")
-if not firebase_admin._apps:
-    firebase_admin.initialize_app(cred)
-
-db = firestore.client()
+db = get_db()
 
 print("🔥 Quick Firebase Upload")
 print("=" * 50)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+🔥 STORAGE UPLOADER
+Concurrent Firebase Storage uploads with an MD5 manifest
+
+Each upload is a single request: content-type, cache-control and the
+public-read ACL travel with the object instead of a separate
+make_public() call. Files above RESUMABLE_THRESHOLD go through a chunked
+resumable session, so a dropped connection retries one chunk rather than
+the whole file. Uploads run on a thread pool that shares the pooled HTTP
+session from firebase_client.get_bucket().
+
+The manifest (data/.upload_manifest.json) maps blob path -> content MD5
+and public URL. A path whose content is unchanged is skipped; content
+already uploaded under another path is copied server-side to the new
+path instead of being sent again.
+
+Usage:
+    python firebase/storage_uploader.py previews/ map_previews/
+    python firebase/storage_uploader.py previews/trails/ map_previews/trails/ --workers 32
+
+    uploader = StorageUploader()
+    future = uploader.submit(png_bytes, "map_previews/v/abc.png", "image/png")
+    url = future.result()
+    uploader.close()
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_client import DEFAULT_HTTP_POOL_SIZE, get_bucket
+
+# Next to the pipeline data wherever the caller runs from (travel_super_app/scripts too)
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+MANIFEST_FILE = os.path.join(DATA_DIR, ".upload_manifest.json")
+DEFAULT_WORKERS = 16
+DEFAULT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+RESUMABLE_THRESHOLD = 8 * 1024 * 1024
+CHUNK_SIZE = 8 * 1024 * 1024   # must be a multiple of 256 KB
+
+
+def md5_hex(data=None, path=None):
+    digest = hashlib.md5()
+    if path is not None:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    else:
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class UploadManifest:
+    """Thread-safe blob path -> {"md5", "url"} record of uploaded objects"""
+
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self.entries = {}
+        self._by_md5 = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            for key, entry in entries.items():
+                # Older manifests were keyed by md5
+                if "md5" not in entry:
+                    key, entry = entry["path"], {"md5": key, "url": entry["url"]}
+                self.entries[key] = entry
+                self._by_md5[entry["md5"]] = key
+
+    def get(self, blob_path):
+        with self._lock:
+            return self.entries.get(blob_path)
+
+    def find(self, md5):
+        """Some blob path already holding this content, or None"""
+        with self._lock:
+            blob_path = self._by_md5.get(md5)
+            # The path may since have been overwritten with other content
+            if blob_path is not None and self.entries[blob_path]["md5"] == md5:
+                return blob_path
+            return None
+
+    def put(self, md5, blob_path, url):
+        with self._lock:
+            self.entries[blob_path] = {"md5": md5, "url": url}
+            self._by_md5[md5] = blob_path
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+
+
+class StorageUploader:
+    """
+    Thread-pool uploader.
+
+    Args:
+        public: Upload with the publicRead ACL. Buckets with uniform
+            bucket-level access reject object ACLs; use public=False there
+            and grant allUsers read on the bucket instead.
+    """
+
+    def __init__(self, bucket=None, workers=DEFAULT_WORKERS, manifest=None,
+                 cache_control=DEFAULT_CACHE_CONTROL, public=True):
+        self.bucket = bucket or get_bucket()
+        self.manifest = manifest if manifest is not None else UploadManifest()
+        self.cache_control = cache_control
+        self.public = public
+        if workers > DEFAULT_HTTP_POOL_SIZE and not os.getenv("FIREBASE_HTTP_POOL_SIZE"):
+            print(f"⚠️  {workers} workers but {DEFAULT_HTTP_POOL_SIZE} pooled connections "
+                  "(set FIREBASE_HTTP_POOL_SIZE)")
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._stats_lock = threading.Lock()
+        self.uploaded = 0
+        self.copied = 0
+        self.skipped = 0
+        self.bytes_sent = 0
+
+    def _count(self, uploaded=0, copied=0, skipped=0, size=0):
+        with self._stats_lock:
+            self.uploaded += uploaded
+            self.copied += copied
+            self.skipped += skipped
+            self.bytes_sent += size
+
+    def _blob(self, blob_path, content_type, md5, size):
+        blob = self.bucket.blob(blob_path, chunk_size=CHUNK_SIZE if size > RESUMABLE_THRESHOLD else None)
+        blob.content_type = content_type
+        blob.cache_control = self.cache_control
+        # Sent with the object; Storage rejects the upload if the bytes do not match
+        blob.md5_hash = base64.b64encode(bytes.fromhex(md5)).decode("ascii")
+        return blob
+
+    def upload(self, data, blob_path, content_type=None):
+        """
+        Upload bytes (or a local file path) to blob_path unless the manifest
+        already has this content there. Content stored under another path
+        is copied server-side. Returns the public URL of blob_path.
+        """
+        is_file = isinstance(data, str)
+        md5 = md5_hex(path=data) if is_file else md5_hex(data)
+        existing = self.manifest.get(blob_path)
+        if existing and existing["md5"] == md5:
+            self._count(skipped=1)
+            return existing["url"]
+
+        source_path = self.manifest.find(md5)
+        if source_path is not None:
+            # The copy keeps content type and cache-control, but gets the
+            # bucket's default object ACL rather than the source's
+            blob = self.bucket.copy_blob(self.bucket.blob(source_path), self.bucket, blob_path)
+            if self.public:
+                blob.make_public()
+            self.manifest.put(md5, blob_path, blob.public_url)
+            self._count(copied=1)
+            return blob.public_url
+
+        size = os.path.getsize(data) if is_file else len(data)
+        content_type = content_type or mimetypes.guess_type(data if is_file else blob_path)[0] or "application/octet-stream"
+        blob = self._blob(blob_path, content_type, md5, size)
+        acl = {"predefined_acl": "publicRead"} if self.public else {}
+
+        if is_file:
+            blob.upload_from_filename(data, content_type=content_type, **acl)
+        else:
+            blob.upload_from_string(data, content_type=content_type, **acl)
+
+        self.manifest.put(md5, blob_path, blob.public_url)
+        self._count(uploaded=1, size=size)
+        return blob.public_url
+
+    def submit(self, data, blob_path, content_type=None):
+        """Queue an upload; returns a Future with the public URL"""
+        return self._pool.submit(self.upload, data, blob_path, content_type)
+
+    def upload_many(self, items):
+        """
+        Upload (data or path, blob_path, content_type) items concurrently.
+
+        Returns:
+            [url or Exception, ...] in input order
+        """
+        futures = [self.submit(*item) for item in items]
+        results = []
+        for i, future in enumerate(futures, 1):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+            if i % 200 == 0:
+                self.manifest.save()
+                print(f"   [{i}/{len(futures)}] {self.uploaded} uploaded, {self.copied} copied, {self.skipped} unchanged")
+        self.manifest.save()
+        return results
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        self.manifest.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload a directory to Firebase Storage concurrently")
+    parser.add_argument("source", help="Local directory")
+    parser.add_argument("prefix", help="Blob path prefix, e.g. map_previews/")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--manifest", default=MANIFEST_FILE)
+    parser.add_argument("--cache-control", default=DEFAULT_CACHE_CONTROL)
+    parser.add_argument("--private", action="store_true", help="No publicRead ACL (uniform bucket-level access)")
+    args = parser.parse_args()
+
+    files = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(args.source)
+        for name in names
+    )
+    items = [
+        (path, f"{args.prefix.rstrip('/')}/{os.path.relpath(path, args.source).replace(os.sep, '/')}", None)
+        for path in files
+    ]
+
+    print(f"📤 Uploading {len(items)} files from {args.source} with {args.workers} workers")
+    start = time.perf_counter()
+    uploader = StorageUploader(workers=args.workers, manifest=UploadManifest(args.manifest),
+                               cache_control=args.cache_control, public=not args.private)
+    results = uploader.upload_many(items)
+    uploader.close()
+
+    failed = [(item, r) for item, r in zip(items, results) if isinstance(r, Exception)]
+    for (path, _, _), error in failed[:10]:
+        print(f"   ❌ {path}: {error}")
+    elapsed = time.perf_counter() - start
+    print(f"✅ {uploader.uploaded} uploaded ({uploader.bytes_sent / 1e6:.1f} MB), {uploader.copied} copied, "
+          f"{uploader.skipped} unchanged, {len(failed)} failed in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
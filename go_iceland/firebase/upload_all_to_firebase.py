@@ -8,16 +8,24 @@ Uses Firebase Admin SDK for authenticated uploads
 import json
 import os
 from pathlib import Path
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_client import get_db
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 DATA_DIR = SCRIPT_DIR.parent / 'data'
-SERVICE_ACCOUNT_KEY = SCRIPT_DIR / 'serviceAccountKey.json'
 
 PLACES_JSON = DATA_DIR / 'iceland_enriched_full.json'
-TRAILS_JSON = DATA_DIR / 'iceland_trails_encoded.json'  # Using encoded polylines
+# Trail stage outputs (encoded polylines + pois_along, optionally + elevation);
+# the most recently written one is uploaded
+TRAILS_SOURCES = [
+    DATA_DIR / 'iceland_trails_elevation.json',
+    DATA_DIR / 'iceland_trails_pois.json',
+]
+
+def latest_trails_json():
+    """Newest existing trail stage output, or None"""
+    existing = [path for path in TRAILS_SOURCES if path.exists()]
+    return max(existing, key=lambda path: path.stat().st_mtime) if existing else None
 
 def load_json(filepath):
     """Load JSON file"""
@@ -26,16 +34,10 @@ def load_json(filepath):
 
 def initialize_firebase():
     """Initialize Firebase Admin SDK"""
-    if not SERVICE_ACCOUNT_KEY.exists():
-        print(f"❌ Service account key not found: {SERVICE_ACCOUNT_KEY}")
-        print("   Download from Firebase Console → Project Settings → Service Accounts")
-        return None
-    
     try:
-        cred = credentials.Certificate(str(SERVICE_ACCOUNT_KEY))
-        firebase_admin.initialize_app(cred)
+        db = get_db()
         print("✅ Firebase Admin SDK initialized")
-        return firestore.client()
+        return db
     except Exception as e:
         print(f"❌ Firebase initialization error: {e}")
         return None
@@ -105,15 +107,17 @@ def main():
         print(f"❌ Places file not found: {PLACES_JSON}")
         return
     
-    if not TRAILS_JSON.exists():
-        print(f"❌ Trails file not found: {TRAILS_JSON}")
+    trails_json = latest_trails_json()
+    if trails_json is None:
+        print(f"❌ Trails file not found: {TRAILS_SOURCES[-1]}")
+        print("   Run: python pipeline.py trail_pois")
         return
     
     places = load_json(PLACES_JSON)
-    trails = load_json(TRAILS_JSON)
+    trails = load_json(trails_json)
     
     print(f"   ✅ {len(places)} POIs loaded")
-    print(f"   ✅ {len(trails)} trails loaded")
+    print(f"   ✅ {len(trails)} trails loaded from {trails_json.name}")
     
     # Initialize Firebase
     print("\n🔥 Initializing Firebase...")
@@ -138,6 +142,7 @@ def main():
     print("      • Difficulty classification")
     print("      • Start/end coordinates")
     print("      • Region assignments")
+    print("      • Places along the trail and trailhead")
     print("=" * 60)
     
     confirm = input("\n⚠️  Upload to Firebase Firestore? (yes/no): ").strip().lower()
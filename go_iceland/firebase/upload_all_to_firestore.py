@@ -9,8 +9,7 @@ Requirements:
 
 import json
 import os
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_client import get_db
 from datetime import datetime
 
 
@@ -79,9 +78,11 @@ def upload_all_to_firestore():
     print()
     
     # Initialize Firebase Admin
-    key_path = "firebase/serviceAccountKey.json"
-    if not os.path.exists(key_path):
-        print(f"❌ Service account key not found: {key_path}")
+    print("🔑 Initializing Firebase Admin SDK...")
+    try:
+        db = get_db()
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
         print()
         print("📥 How to get the key:")
         print("1. Go to Firebase Console")
@@ -91,13 +92,6 @@ def upload_all_to_firestore():
         print()
         return
     
-    print("🔑 Initializing Firebase Admin SDK...")
-    cred = credentials.Certificate(key_path)
-    
-    if not firebase_admin._apps:
-        firebase_admin.initialize_app(cred)
-    
-    db = firestore.client()
     print("✅ Connected to Firestore")
     print()
     
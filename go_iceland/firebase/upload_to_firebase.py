@@ -3,9 +3,7 @@ Upload enriched POIs and trails to Firebase Firestore.
 Uses Firebase Admin SDK with service account key.
 """
 import json
-import os
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_client import get_db
 
 
 def load_json(filepath):
@@ -61,18 +59,12 @@ def upload_data():
     print("=" * 60)
     
     # Initialize Firebase Admin
-    cred_path = '../travel_super_app/serviceAccountKey.json'
-    if not os.path.exists(cred_path):
-        print(f"❌ Service account key not found: {cred_path}")
-        print("   Download from Firebase Console → Project Settings → Service Accounts")
+    try:
+        db = get_db()
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
         return
     
-    cred = credentials.Certificate(cred_path)
-    if not firebase_admin._apps:
-        firebase_admin.initialize_app(cred)
-    
-    db = firestore.client()
-    
     # Load data
     print("\n📖 Loading data...")
     pois = load_json('data/iceland_enriched_full.json')
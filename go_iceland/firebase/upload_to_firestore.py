@@ -2,28 +2,19 @@
 GO ICELAND - Firestore Uploader
 Uploads POI data to Firebase Firestore
 """
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_client import get_db
 import json
 import os
 from time import sleep
 
-SERVICE_ACCOUNT = "./firebase/serviceAccountKey.json"
 INPUT = "./data/iceland_clean_geohash.json"
 COLLECTION = "places"
 BATCH_SIZE = 500
 
 def init_firebase():
     """Initialize Firebase Admin SDK"""
-    if not os.path.exists(SERVICE_ACCOUNT):
-        print(f"❌ Service account key not found: {SERVICE_ACCOUNT}")
-        print("Download it from Firebase Console → Project Settings → Service Accounts")
-        return None
-    
     try:
-        cred = credentials.Certificate(SERVICE_ACCOUNT)
-        firebase_admin.initialize_app(cred)
-        return firestore.client()
+        return get_db()
     except Exception as e:
         print(f"❌ Firebase initialization failed: {e}")
         return None
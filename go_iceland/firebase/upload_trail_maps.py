@@ -3,27 +3,19 @@
 GO ICELAND - Upload Trail Maps to Firestore
 Updates trails with OpenStreetMap embed URLs
 """
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_client import get_db
 import json
 import os
 from time import sleep
 
-SERVICE_ACCOUNT = "./serviceAccountKey.json"
 INPUT_FILE = "../data/iceland_trails_enriched.json"
 COLLECTION = "trails"
 BATCH_SIZE = 100
 
 def init_firebase():
     """Initialize Firebase Admin SDK"""
-    if not os.path.exists(SERVICE_ACCOUNT):
-        print(f"❌ Service account key not found: {SERVICE_ACCOUNT}")
-        return None
-    
     try:
-        cred = credentials.Certificate(SERVICE_ACCOUNT)
-        firebase_admin.initialize_app(cred)
-        return firestore.client()
+        return get_db()
     except Exception as e:
         print(f"❌ Firebase initialization failed: {e}")
         return None
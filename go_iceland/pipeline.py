@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+🇮🇸 GO ICELAND - PIPELINE RUNNER
+Runs the ETL scripts as a stage DAG with cached intermediate artifacts
+
+Each stage declares the files it reads and writes. A stage is skipped when its
+script and inputs hash the same as on the last successful run and its outputs
+are still the ones it produced, so only the changed tail of the pipeline runs.
+Stages whose dependencies are done run in parallel.
+
+Usage:
+    python pipeline.py                     # Bring every default stage up to date
+    python pipeline.py osm_images          # A stage and everything upstream of it
+    python pipeline.py --refresh           # Re-fetch from OSM as well
+    python pipeline.py --dry-run           # Show what would run
+    python pipeline.py --list
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(BASE_DIR, "data", ".pipeline_state.json")
+
+# source: fetches from the network, only runs when its outputs are missing or with --refresh
+# default: part of a plain `python pipeline.py` run
+STAGES = {
+    "fetch_pois": {
+        "script": "etl/fetch_iceland_pois.py",
+        "inputs": [],
+        "outputs": ["data/iceland_raw.json"],
+        "source": True,
+        "default": True,
+    },
+    "enrich_pois": {
+        "script": "etl/enrich_pois.py",
+        "inputs": ["data/iceland_raw.json"],
+        "outputs": ["data/iceland_clean.json"],
+        "default": True,
+    },
+    "geohash": {
+        "script": "etl/utils_geohash.py",
+        "inputs": ["data/iceland_clean.json"],
+        "outputs": ["data/iceland_clean_geohash.json"],
+        "default": True,
+    },
+    "osm_images": {
+        "script": "etl/get_osm_images.py",
+        "inputs": ["data/iceland_clean_geohash.json"],
+        "outputs": ["data/iceland_with_osm_images.json"],
+        "default": True,
+    },
+    "wikimedia_images": {
+        "script": "etl/get_photos_wikimedia.py",
+        "inputs": ["data/iceland_with_osm_images.json"],
+        "outputs": ["data/iceland_with_all_images.json"],
+        "default": False,
+    },
+    "image_index": {
+        "script": "etl/image_index.py",
+        "inputs": ["data/iceland_with_all_images.json"],
+        "outputs": ["data/iceland_images_checked.json"],
+        "default": False,
+    },
+    "previews": {
+        "script": "etl/download_previews.py",
+        "inputs": ["data/iceland_clean.json"],
+        "outputs": ["previews"],
+        "env": ["MAPBOX_TOKEN"],
+        "default": False,
+    },
+    "fetch_trails": {
+        "script": "etl/fetch_iceland_trails.py",
+        "inputs": [],
+        "outputs": ["data/iceland_trails.json"],
+        "source": True,
+        "default": True,
+    },
+    "encode_polylines": {
+        "script": "etl/encode_polylines.py",
+        "inputs": ["data/iceland_trails.json"],
+        "outputs": ["data/iceland_trails_encoded.json"],
+        "default": True,
+    },
+    "trail_pois": {
+        "script": "etl/trail_pois.py",
+        "inputs": ["data/iceland_trails_encoded.json", "data/iceland_clean_geohash.json"],
+        "outputs": ["data/iceland_trails_pois.json"],
+        "default": True,
+    },
+    "elevation": {
+        "script": "etl/elevation.py",
+        "inputs": ["data/iceland_trails_pois.json", "data/iceland_dem.tif"],
+        "outputs": ["data/iceland_trails_elevation.json"],
+        "default": False,
+    },
+    "upload": {
+        "script": "firebase/upload_to_firestore.py",
+        "inputs": ["data/iceland_clean_geohash.json"],
+        "outputs": [],
+        "default": False,
+    },
+}
+
+
+def dependencies(name):
+    """Stages that produce one of this stage's inputs"""
+    inputs = set(STAGES[name]["inputs"])
+    return [other for other, stage in STAGES.items() if inputs & set(stage["outputs"])]
+
+
+def with_upstream(targets):
+    """Targets plus everything they depend on"""
+    selected = set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in selected:
+            selected.add(name)
+            todo.extend(dependencies(name))
+    return selected
+
+
+def file_hash(path, hashes):
+    """
+    sha256 of a file, memoized on (size, mtime) so unchanged multi-MB
+    artifacts are not re-read on every run.
+    """
+    st = os.stat(path)
+    key = f"{st.st_size}:{st.st_mtime_ns}"
+    cached = hashes.get(path)
+    if cached and cached["key"] == key:
+        return cached["sha256"]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    hashes[path] = {"key": key, "sha256": h.hexdigest()}
+    return hashes[path]["sha256"]
+
+
+def fingerprint(paths, hashes):
+    """Combined fingerprint of files; directories count by file listing, missing paths by name"""
+    h = hashlib.sha256()
+    for rel in paths:
+        path = os.path.join(BASE_DIR, rel)
+        h.update(rel.encode("utf-8"))
+        if os.path.isdir(path):
+            h.update("\n".join(sorted(os.listdir(path))).encode("utf-8"))
+        elif os.path.exists(path):
+            h.update(file_hash(path, hashes).encode("ascii"))
+        else:
+            h.update(b"<missing>")
+    return h.hexdigest()
+
+
+def outputs_exist(stage):
+    return all(os.path.exists(os.path.join(BASE_DIR, rel)) for rel in stage["outputs"])
+
+
+def is_up_to_date(name, state, hashes, refresh=False):
+    stage = STAGES[name]
+    if stage.get("source"):
+        return outputs_exist(stage) and not refresh
+
+    previous = state["stages"].get(name)
+    if not previous or not stage["outputs"] or not outputs_exist(stage):
+        return False
+    return (
+        previous["inputs"] == fingerprint([stage["script"], *stage["inputs"]], hashes)
+        and previous["outputs"] == fingerprint(stage["outputs"], hashes)
+    )
+
+
+def run_stage(name):
+    """Run one stage script from the go_iceland directory"""
+    stage = STAGES[name]
+    start = time.time()
+    result = subprocess.run([sys.executable, stage["script"]], cwd=BASE_DIR)
+    return result.returncode, time.time() - start
+
+
+def load_state():
+    if not os.path.exists(STATE_FILE):
+        return {"stages": {}, "hashes": {}}
+    with open(STATE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def run_pipeline(targets, workers=4, refresh=False, force=False, dry_run=False):
+    """
+    Run the selected stages in dependency order.
+
+    Returns:
+        True if every selected stage is up to date or ran successfully
+    """
+    state = load_state()
+    hashes = state["hashes"]
+    selected = with_upstream(targets)
+    done = set()
+    failed = set()
+    running = {}
+
+    def ready(name):
+        return all(dep in done for dep in dependencies(name) if dep in selected)
+
+    def blocked(name):
+        return any(dep in failed for dep in dependencies(name) if dep in selected)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set(selected)
+        while pending or running:
+            for name in sorted(pending):
+                stage = STAGES[name]
+                if blocked(name):
+                    print(f"⏭️  {name}: skipped (upstream failed)")
+                    failed.add(name)
+                    pending.discard(name)
+                elif ready(name):
+                    pending.discard(name)
+                    missing_env = [var for var in stage.get("env", []) if not os.getenv(var)]
+                    if missing_env:
+                        print(f"⏭️  {name}: skipped ({', '.join(missing_env)} not set)")
+                        done.add(name)
+                    elif not force and is_up_to_date(name, state, hashes, refresh):
+                        print(f"✅ {name}: up to date")
+                        done.add(name)
+                    elif dry_run:
+                        print(f"🔄 {name}: would run {stage['script']}")
+                        done.add(name)
+                    else:
+                        print(f"🔄 {name}: running {stage['script']}")
+                        running[pool.submit(run_stage, name)] = name
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                returncode, seconds = future.result()
+                stage = STAGES[name]
+                if returncode == 0 and outputs_exist(stage):
+                    state["stages"][name] = {
+                        "inputs": fingerprint([stage["script"], *stage["inputs"]], hashes),
+                        "outputs": fingerprint(stage["outputs"], hashes),
+                        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    }
+                    save_state(state)
+                    print(f"✅ {name}: done in {seconds:.1f}s")
+                    done.add(name)
+                else:
+                    print(f"❌ {name}: failed (exit code {returncode})")
+                    failed.add(name)
+
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the GO ICELAND data pipeline")
+    parser.add_argument("targets", nargs="*", help="Stages to bring up to date (default: all default stages)")
+    parser.add_argument("--workers", type=int, default=4, help="Stages to run in parallel")
+    parser.add_argument("--refresh", action="store_true", help="Re-run network fetch stages")
+    parser.add_argument("--force", action="store_true", help="Run selected stages even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="Only show what would run")
+    parser.add_argument("--list", action="store_true", help="List stages and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, stage in STAGES.items():
+            deps = ", ".join(dependencies(name)) or "-"
+            flag = "" if stage["default"] else " (opt-in)"
+            print(f"  {name:18s} {stage['script']:34s} after: {deps}{flag}")
+        return
+
+    unknown = [t for t in args.targets if t not in STAGES]
+    if unknown:
+        print(f"❌ Unknown stage(s): {', '.join(unknown)}")
+        print(f"   Available: {', '.join(STAGES)}")
+        sys.exit(1)
+
+    targets = args.targets or [name for name, stage in STAGES.items() if stage["default"]]
+
+    print("🇮🇸 GO ICELAND - PIPELINE")
+    print("=" * 60)
+    ok = run_pipeline(targets, args.workers, args.refresh, args.force, args.dry_run)
+    print("=" * 60)
+    print("🎉 PIPELINE COMPLETE!" if ok else "❌ PIPELINE FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,12 @@ Upload places with descriptions to Firebase Firestore
 """
 
 import json
+import os
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "firebase"))
 try:
-    import firebase_admin
-    from firebase_admin import credentials, firestore
+    from firebase_client import get_db
 except ImportError:
     print("❌ Firebase admin SDK vantar")
     print("Settu upp með: pip install firebase-admin")
@@ -31,8 +32,7 @@ def upload_places_to_firestore():
     # Initialize Firebase
     print('\n🔥 Tengist Firebase...')
     try:
-        cred = credentials.Certificate('../travel_super_app/android/app/google-services.json')
-        firebase_admin.initialize_app(cred)
+        db = get_db()
         print('✅ Firebase initialized')
     except Exception as e:
         print(f'❌ Villa við Firebase init: {e}')
@@ -41,7 +41,6 @@ def upload_places_to_firestore():
         print('   Project Settings > Service Accounts > Generate new private key')
         return
     
-    db = firestore.client()
     collection = db.collection('places')
     
     print('\n📤 Uploada staði með lýsingum...')
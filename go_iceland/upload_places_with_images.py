@@ -4,9 +4,12 @@ Upload mock places with Unsplash images to Firebase Firestore
 This ensures the app has data with proper images
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "firebase"))
+from firebase_client import get_db
 
 # Mock data with Unsplash images
 PLACES_WITH_IMAGES = [
@@ -209,11 +212,7 @@ def upload_places_to_firestore():
     """Upload places with images to Firestore"""
     
     # Initialize Firebase
-    if not firebase_admin._apps:
-        cred = credentials.Certificate('../travel_super_app/android/app/google-services.json')
-        firebase_admin.initialize_app(cred)
-    
-    db = firestore.client()
+    db = get_db()
     collection = db.collection('places')
     
     print(f"🔥 Uploading {len(PLACES_WITH_IMAGES)} places to Firestore...")
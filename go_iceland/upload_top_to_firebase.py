@@ -1,42 +1,18 @@
 """
 Upload enriched top places to Firebase Firestore
 """
-import firebase_admin
-from firebase_admin import credentials, firestore
 import json
 import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "firebase"))
+from firebase_client import get_db
+
 def init_firebase():
     """Initialize Firebase Admin SDK"""
-    # Try multiple possible locations for service account
-    possible_paths = [
-        Path("firebase/serviceAccountKey.json"),
-        Path("../firebase/serviceAccountKey.json"),
-        Path("serviceAccountKey.json")
-    ]
-    
-    service_account = None
-    for path in possible_paths:
-        if path.exists():
-            service_account = str(path)
-            break
-    
-    if not service_account:
-        print("❌ Service account key not found!")
-        print("Please add serviceAccountKey.json to firebase/ folder")
-        return None
-    
     try:
-        # Close existing app if any
-        try:
-            firebase_admin.delete_app(firebase_admin.get_app())
-        except:
-            pass
-        
-        cred = credentials.Certificate(service_account)
-        firebase_admin.initialize_app(cred)
-        return firestore.client()
+        return get_db()
     except Exception as e:
         print(f"❌ Firebase initialization failed: {e}")
         return None
@@ -1,13 +1,12 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+import os
+import sys
 from collections import Counter
 
-# Initialize
-if not firebase_admin._apps:
-    cred = credentials.Certificate("../go_iceland/firebase/go-iceland-firebase-adminsdk-key.json")
-    firebase_admin.initialize_app(cred)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "go_iceland", "firebase"))
+from firebase_client import get_db
 
-db = firestore.client()
+# Initialize
+db = get_db()
 
 print("\n📊 Checking Categories in Firestore...")
 print("=" * 70)
@@ -1,10 +1,11 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "go_iceland", "firebase"))
+from firebase_client import get_db
 
 # Initialize Firebase Admin
-cred = credentials.Certificate("C:/GitHub/Radio_App/GoIceland/go_iceland/firebase/go-iceland-firebase-adminsdk-key.json")
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+db = get_db()
 
 print("\n🗺️ Checking Trail Map Data...")
 print("=" * 60)
@@ -2,19 +2,14 @@
 Script to check which places are missing images and descriptions in Firestore
 """
 import os
-os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = r'C:\Users\Computer\go-iceland-firebase-adminsdk.json'
-
-import firebase_admin
-from firebase_admin import credentials, firestore
+import sys
 import json
 
-# Initialize Firebase
-if not firebase_admin._apps:
-    cred = credentials.ApplicationDefault()
-    firebase_admin.initialize_app(cred, {
-        'projectId': 'go-iceland'
-    })
-db = firestore.client()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "go_iceland", "firebase"))
+from firebase_client import get_db
+
+# Initialize Firebase (key from FIREBASE_SERVICE_ACCOUNT / GOOGLE_APPLICATION_CREDENTIALS)
+db = get_db()
 
 def check_missing_data():
     """Check all places for missing data"""
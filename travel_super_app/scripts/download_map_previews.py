@@ -3,7 +3,7 @@ GO ICELAND - Download Map Previews
 Downloads static map images from Mapbox and uploads to Firebase Storage
 
 Requires:
-- MAPBOX_TOKEN environment variable
+- MAPBOX_TOKEN environment variable (or --tiles for offline rendering)
 - Firebase Storage setup
 - serviceAccountKey.json
 
@@ -12,23 +12,36 @@ Usage:
     
 Optional flags:
     --width 400 --height 300 --zoom 13
+    --tiles tiles/       Render from a local XYZ/MBTiles cache (go_iceland/etl/static_maps.py)
+
+POIs whose pins fall on the same viewport share one image: previews are
+keyed by quantized viewport + overlay (go_iceland/etl/preview_cache.py),
+stored once under map_previews/v/, and remembered in a manifest so later
+runs skip them entirely.
 """
 
 import json
 import sys
 import os
 import requests
-import firebase_admin
-from firebase_admin import credentials, storage
 from urllib.parse import quote
 from time import sleep
+from functools import partial
 import argparse
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "go_iceland", "firebase"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "go_iceland", "etl"))
+from firebase_client import get_bucket
+from storage_uploader import DEFAULT_WORKERS, StorageUploader
+from preview_cache import CACHE_FILE, PreviewCache, group_by_viewport
+
 MAPBOX_TOKEN = os.getenv('MAPBOX_TOKEN', '')
 MAPBOX_STYLE = 'mapbox/outdoors-v12'  # Good for Iceland terrain
 IMAGE_WIDTH = 400
 IMAGE_HEIGHT = 300
 ZOOM_LEVEL = 13
+# Finished uploads between saves of the preview cache and upload manifest
+CHECKPOINT_EVERY = 50
 
 def get_mapbox_static_url(lat: float, lng: float, width: int, height: int, zoom: int) -> str:
     """Generate Mapbox static image URL"""
@@ -43,17 +56,14 @@ def get_mapbox_static_url(lat: float, lng: float, width: int, height: int, zoom:
     )
     return url
 
-def download_and_upload_preview(poi: dict, bucket, width: int, height: int, zoom: int) -> str:
-    """Download map preview and upload to Firebase Storage"""
-    lat = poi.get('lat')
-    lng = poi.get('lng')
-    poi_id = poi.get('id', 'unknown')
-    
-    if not lat or not lng:
-        return None
-    
+def upload_preview(uploader: StorageUploader, view, data: bytes, ext: str):
+    """Queue one shared preview image for upload; returns a Future with its public URL"""
+    return uploader.submit(data, view.blob_path(ext), f'image/{ext}')
+
+def download_and_upload_preview(view, uploader: StorageUploader, label: str = ''):
+    """Download the Mapbox preview for a viewport and queue its upload to Firebase Storage"""
     # Get Mapbox URL
-    map_url = get_mapbox_static_url(lat, lng, width, height, zoom)
+    map_url = get_mapbox_static_url(view.lat, view.lng, view.width, view.height, view.zoom)
     if not map_url:
         return None
     
@@ -62,17 +72,83 @@ def download_and_upload_preview(poi: dict, bucket, width: int, height: int, zoom
         response = requests.get(map_url, timeout=10)
         response.raise_for_status()
         
-        # Upload to Firebase Storage
-        blob = bucket.blob(f"map_previews/{poi_id}.png")
-        blob.upload_from_string(response.content, content_type='image/png')
-        blob.make_public()
-        
-        return blob.public_url
+        # Upload to Firebase Storage (in the background)
+        return upload_preview(uploader, view, response.content, 'png')
     
     except Exception as e:
-        print(f"   ❌ Failed for {poi.get('name')}: {e}")
+        print(f"   ❌ Failed for {label or view.key}: {e}")
         return None
 
+class PendingUploads:
+    """
+    Queued preview uploads. Finished ones are recorded in the preview cache,
+    and the cache and upload manifest are saved every CHECKPOINT_EVERY, so
+    a crash late in a long run keeps what was already uploaded.
+    """
+
+    def __init__(self, cache: PreviewCache, uploader: StorageUploader):
+        self.cache = cache
+        self.uploader = uploader
+        self.pending = []
+        self.uploaded = 0
+        self.failed = 0
+        self._unsaved = 0
+
+    def add(self, key: str, future):
+        self.pending.append((key, future))
+        self.collect(wait=False)
+
+    def collect(self, wait: bool = True):
+        """Record finished uploads (all of them with wait=True)"""
+        still_pending = []
+        for key, future in self.pending:
+            if not wait and not future.done():
+                still_pending.append((key, future))
+                continue
+            try:
+                self.cache.put(key, future.result())
+                self.uploaded += 1
+            except Exception as e:
+                print(f"   ❌ Upload failed for {key}: {e}")
+                self.failed += 1
+            self._unsaved += 1
+            if self._unsaved >= CHECKPOINT_EVERY:
+                self.checkpoint()
+        self.pending = still_pending
+
+    def checkpoint(self):
+        self.cache.save()
+        self.uploader.manifest.save()
+        self._unsaved = 0
+
+def upload_rendered_previews(groups: dict, cache: PreviewCache, uploads: PendingUploads, tiles: str) -> int:
+    """
+    Render uncached viewports offline in a process pool and queue each upload as it is ready.
+
+    Returns:
+        Render failures
+    """
+    from parallel import parallel_map
+    from static_maps import render_poi
+
+    todo = [view for key, (view, _) in groups.items() if cache.get(key) is None]
+    if not todo:
+        return 0
+    first = todo[0]
+    render = partial(render_poi, tiles_path=tiles, width=first.width, height=first.height, zoom=first.zoom)
+    points = [{'id': view.key, 'lat': view.lat, 'lng': view.lng} for view in todo]
+    failed = 0
+
+    # parallel_map keeps input order, so results line up with todo
+    for view, (_, data, ext) in zip(todo, parallel_map(render, points, chunk_size=50)):
+        if data is None:
+            # ext holds the reason: no coordinates or tiles missing from the cache
+            print(f"   ❌ Render failed for {view.key}: {ext}")
+            failed += 1
+            continue
+        uploads.add(view.key, upload_preview(uploads.uploader, view, data, ext))
+    return failed
+
 def main():
     parser = argparse.ArgumentParser(description="Download map previews")
     parser.add_argument("input", help="Input JSON file")
@@ -81,6 +157,9 @@ def main():
     parser.add_argument("--height", type=int, default=300, help="Image height")
     parser.add_argument("--zoom", type=int, default=13, help="Zoom level")
     parser.add_argument("--skip-existing", action="store_true", help="Skip POIs with existing mapPreview")
+    parser.add_argument("--tiles", default=os.getenv('MAP_TILES'), help="Local XYZ dir or .mbtiles to render from (no Mapbox)")
+    parser.add_argument("--cache", default=CACHE_FILE, help="Viewport -> uploaded preview manifest")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent Storage uploads")
     args = parser.parse_args()
     
     print("=" * 60)
@@ -93,7 +172,7 @@ def main():
     print()
     
     # Check Mapbox token
-    if not MAPBOX_TOKEN:
+    if not MAPBOX_TOKEN and not args.tiles:
         print("⚠️  MAPBOX_TOKEN not set - skipping preview generation")
         print("   Set with: export MAPBOX_TOKEN=pk.your_token")
         print()
@@ -109,11 +188,7 @@ def main():
     
     # Initialize Firebase
     try:
-        cred = credentials.Certificate("serviceAccountKey.json")
-        firebase_admin.initialize_app(cred, {
-            'storageBucket': f"{os.getenv('FIRESTORE_PROJECT_ID', 'go-iceland')}.appspot.com"
-        })
-        bucket = storage.bucket()
+        bucket = get_bucket()
         print("✅ Firebase Storage initialized")
     except Exception as e:
         print(f"❌ Firebase initialization failed: {e}")
@@ -130,34 +205,61 @@ def main():
     print(f"   Loaded {len(pois)} POIs")
     print()
     
-    # Download previews
-    print("🗺️  Downloading map previews...")
-    processed = 0
-    skipped = 0
+    # Group POIs by rendered viewport; each distinct viewport is one image
+    todo = [poi for poi in pois if not (args.skip_existing and poi.get('mapPreview'))]
+    skipped = len(pois) - len(todo)
+    style = f"tiles:{os.path.basename(os.path.normpath(args.tiles))}" if args.tiles else MAPBOX_STYLE
+    groups = group_by_viewport(todo, args.zoom, args.width, args.height, style)
+    cache = PreviewCache.load(args.cache)
+    print(f"   {len(todo)} POIs -> {len(groups)} distinct viewports ({len(cache)} cached)")
+    
+    # Download previews; uploads run on the uploader's thread pool meanwhile
+    uploader = StorageUploader(bucket, workers=args.workers)
+    uploads = PendingUploads(cache, uploader)
     failed = 0
     
-    for i, poi in enumerate(pois, 1):
-        if args.skip_existing and poi.get('mapPreview'):
-            skipped += 1
-            continue
-        
-        print(f"   [{i}/{len(pois)}] {poi.get('name', 'Unknown')[:40]}", end='')
-        
-        preview_url = download_and_upload_preview(poi, bucket, args.width, args.height, args.zoom)
-        
-        if preview_url:
-            poi['mapPreview'] = preview_url
-            processed += 1
-            print(" ✓")
-        else:
-            failed += 1
-            print(" ✗")
-        
-        # Rate limiting
-        sleep(0.3)
+    if args.tiles:
+        print(f"🗺️  Rendering map previews from {args.tiles}...")
+        failed = upload_rendered_previews(groups, cache, uploads, args.tiles)
+    else:
+        print("🗺️  Downloading map previews...")
+        for i, (key, (view, members)) in enumerate(groups.items(), 1):
+            if cache.get(key) is not None:
+                continue
+            
+            label = members[0].get('name', 'Unknown')[:40]
+            print(f"   [{i}/{len(groups)}] {label}" + (f" (+{len(members) - 1} sharing)" if len(members) > 1 else ""), end='')
+            
+            upload = download_and_upload_preview(view, uploader, label)
+            
+            if upload:
+                uploads.add(key, upload)
+                print(" ✓")
+            else:
+                failed += 1
+                print(" ✗")
+            
+            # Rate limiting
+            sleep(0.3)
+    
+    uploads.collect()
+    uploaded = uploads.uploaded
+    failed += uploads.failed
+    uploader.close()
+    cache.save()
+    
+    # Point every POI at its shared preview
+    processed = 0
+    for key, (_, members) in groups.items():
+        url = cache.entries.get(key)
+        if url:
+            for poi in members:
+                poi['mapPreview'] = url
+            processed += len(members)
     
     print()
     print(f"   Processed: {processed}")
+    print(f"   Images uploaded: {uploaded} (already cached: {len(groups) - uploaded - failed})")
     print(f"   Skipped: {skipped}")
     print(f"   Failed: {failed}")
     print()
@@ -13,17 +13,24 @@ This script queries OpenStreetMap for all tourist-relevant locations in Iceland:
 Expected output: 2000-4500 POIs saved to iceland_pois_raw.json
 """
 
+import os
+import sys
 import requests
-import json
 from time import sleep
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "go_iceland", "etl"))
+from osm_tags import TagVocabulary, write_tagged
+
 OUTPUT_FILE = "iceland_pois_raw.json"
 OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 
 # Iceland bounding box: South lat, West lng, North lat, East lng
 ICELAND_BBOX = "(63.0,-25.0,67.5,-12.0)"
 
+# Shared OSM tag strings; records keep integer-coded tag arrays
+TAGS = TagVocabulary()
+
 # Comprehensive query categories for Iceland tourism
 QUERIES = [
     # Natural features
@@ -158,6 +165,7 @@ def extract_poi_data(element, category):
     )
     
     wikipedia = tags.get("wikipedia") or tags.get("wikidata")
+    wikidata = tags.get("wikidata")
     website = tags.get("website") or tags.get("url")
     
     return {
@@ -170,8 +178,9 @@ def extract_poi_data(element, category):
         "subtype": tags.get("tourism") or tags.get("historic"),
         "description": description,
         "wikipedia": wikipedia,
+        "wikidata": wikidata,
         "website": website,
-        "tags": tags,
+        "tags": TAGS.encode(tags),
         "fetched_at": datetime.now().isoformat()
     }
 
@@ -216,8 +225,7 @@ def main():
     print()
     
     # Save raw data
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(all_pois, f, indent=2, ensure_ascii=False)
+    write_tagged(OUTPUT_FILE, all_pois, TAGS)
     
     print(f"💾 Saved to {OUTPUT_FILE}")
     print()
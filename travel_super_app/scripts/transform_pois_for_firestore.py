@@ -5,6 +5,10 @@ Transforms raw OSM data into Firestore-ready format
 Input: iceland_pois_raw.json (from fetch_iceland_pois.py)
 Output: places_firestore.json (ready for Firebase import)
 
+Usage:
+    python transform_pois_for_firestore.py [input] [output]
+    cat pois.ndjson | python transform_pois_for_firestore.py - - > places.ndjson
+
 This script:
 1. Cleans and deduplicates POI data
 2. Categorizes into GO ICELAND taxonomy
@@ -13,11 +17,17 @@ This script:
 5. Filters out low-quality entries
 """
 
-import json
+import os
+import sys
 import uuid
 from datetime import datetime
 import hashlib
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "go_iceland", "etl"))
+from json_io import console, stage_paths, write_records
+from osm_tags import iter_places
+from parallel import parallel_map
+
 INPUT_FILE = "iceland_pois_raw.json"
 OUTPUT_FILE = "places_firestore.json"
 MIN_QUALITY_THRESHOLD = 0.3  # Filter POIs below this quality score
@@ -191,8 +201,13 @@ def transform_poi(poi):
     
     return place
 
-def deduplicate_pois(pois):
-    """Remove duplicate POIs based on proximity and name similarity"""
+def deduplicate_pois(pois, out=sys.stdout):
+    """
+    Remove duplicate POIs based on proximity and name similarity.
+
+    Consumes a stream; only one place per ~100m cell is held, and the
+    survivors are yielded once the input is exhausted.
+    """
     unique = {}
     duplicates_removed = 0
     
@@ -211,83 +226,72 @@ def deduplicate_pois(pois):
             else:
                 duplicates_removed += 1
     
-    print(f"   Removed {duplicates_removed} duplicates")
-    return list(unique.values())
+    print(f"   Removed {duplicates_removed} duplicates", file=out)
+    yield from unique.values()
 
-def main():
-    """Main transformation function"""
-    print("=" * 60)
-    print("GO ICELAND - POI Data Transformer")
-    print("=" * 60)
-    print(f"Input: {INPUT_FILE}")
-    print(f"Output: {OUTPUT_FILE}")
-    print(f"Quality threshold: {MIN_QUALITY_THRESHOLD}")
-    print("=" * 60)
-    print()
-    
-    # Load raw data
-    print("📂 Loading raw POI data...")
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        raw_pois = json.load(f)
-    print(f"   Loaded {len(raw_pois)} raw POIs")
-    print()
-    
-    # Transform
-    print("🔄 Transforming POIs...")
-    transformed = []
-    filtered_count = 0
-    category_stats = {}
-    region_stats = {}
-    
-    for poi in raw_pois:
-        place = transform_poi(poi)
+def transform_pois(raw_pois, stats):
+    """Transform (on all cores) and quality-filter a stream of raw POIs, counting into stats"""
+    for place in parallel_map(transform_poi, raw_pois):
+        stats["loaded"] += 1
         
         # Filter by quality
         if place["quality_score"] >= MIN_QUALITY_THRESHOLD:
-            transformed.append(place)
-            
             # Stats
             cat = place["subtype"]
-            category_stats[cat] = category_stats.get(cat, 0) + 1
+            stats["categories"][cat] = stats["categories"].get(cat, 0) + 1
             
             reg = place["region"]
-            region_stats[reg] = region_stats.get(reg, 0) + 1
+            stats["regions"][reg] = stats["regions"].get(reg, 0) + 1
+            
+            yield place
         else:
-            filtered_count += 1
+            stats["filtered"] += 1
+
+def main():
+    """Main transformation function"""
+    # [input] [output]; "-" = NDJSON on stdin/stdout
+    input_file, output_file = stage_paths(INPUT_FILE, OUTPUT_FILE)
+    out = console(output_file)
     
-    print(f"   Transformed {len(transformed)} POIs")
-    print(f"   Filtered out {filtered_count} low-quality entries")
-    print()
+    print("=" * 60, file=out)
+    print("GO ICELAND - POI Data Transformer", file=out)
+    print("=" * 60, file=out)
+    print(f"Input: {input_file}", file=out)
+    print(f"Output: {output_file}", file=out)
+    print(f"Quality threshold: {MIN_QUALITY_THRESHOLD}", file=out)
+    print("=" * 60, file=out)
+    print(file=out)
     
-    # Deduplicate
-    print("🔍 Deduplicating...")
-    transformed = deduplicate_pois(transformed)
-    print(f"   Final count: {len(transformed)} unique POIs")
-    print()
+    # Load, transform, deduplicate and save as one stream
+    print("🔄 Transforming and deduplicating POIs...", file=out)
+    stats = {"loaded": 0, "filtered": 0, "categories": {}, "regions": {}}
+    places = deduplicate_pois(transform_pois(iter_places(input_file, decode_tags=False), stats), out)
+    count = write_records(output_file, places)
     
-    # Stats
-    print("📊 Statistics:")
-    print()
-    print("Top 15 categories:")
-    for cat, count in sorted(category_stats.items(), key=lambda x: x[1], reverse=True)[:15]:
-        print(f"  {cat:25s}: {count:4d}")
-    print()
+    print(f"   Loaded {stats['loaded']} raw POIs", file=out)
+    print(f"   Filtered out {stats['filtered']} low-quality entries", file=out)
+    print(f"   Final count: {count} unique POIs", file=out)
+    print(file=out)
     
-    print("By region:")
-    for reg, count in sorted(region_stats.items(), key=lambda x: x[1], reverse=True):
-        print(f"  {reg:25s}: {count:4d}")
-    print()
+    # Stats
+    print("📊 Statistics:", file=out)
+    print(file=out)
+    print("Top 15 categories:", file=out)
+    for cat, n in sorted(stats["categories"].items(), key=lambda x: x[1], reverse=True)[:15]:
+        print(f"  {cat:25s}: {n:4d}", file=out)
+    print(file=out)
     
-    # Save
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(transformed, f, indent=2, ensure_ascii=False)
+    print("By region:", file=out)
+    for reg, n in sorted(stats["regions"].items(), key=lambda x: x[1], reverse=True):
+        print(f"  {reg:25s}: {n:4d}", file=out)
+    print(file=out)
     
-    print("=" * 60)
-    print(f"✅ Saved {len(transformed)} places to {OUTPUT_FILE}")
-    print("=" * 60)
-    print()
-    print("Next step: Run upload_to_firestore.py")
-    print("=" * 60)
+    print("=" * 60, file=out)
+    print(f"✅ Saved {count} places to {output_file}", file=out)
+    print("=" * 60, file=out)
+    print(file=out)
+    print("Next step: Run upload_to_firestore.py", file=out)
+    print("=" * 60, file=out)
 
 if __name__ == "__main__":
     main()
@@ -19,28 +19,31 @@ Options:
     --collection places: Target collection name (default: places)
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
 import json
 import argparse
+import os
+import sys
 from datetime import datetime
 from time import sleep
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "go_iceland", "firebase"))
+from firebase_client import get_db
+
 INPUT_FILE = "places_firestore.json"
 DEFAULT_BATCH_SIZE = 500
 
-def init_firebase(cred_path="serviceAccountKey.json"):
+def init_firebase(cred_path=None):
     """Initialize Firebase Admin SDK"""
     try:
-        cred = credentials.Certificate(cred_path)
-        firebase_admin.initialize_app(cred)
+        db = get_db(cred_path)
         print("✅ Firebase initialized successfully")
-        return firestore.client()
+        return db
     except Exception as e:
         print(f"❌ Firebase initialization failed: {e}")
         print()
-        print("Make sure serviceAccountKey.json exists in the scripts/ directory.")
+        print("Pass --cred serviceAccountKey.json or set FIREBASE_SERVICE_ACCOUNT.")
         print("Download it from: Firebase Console → Project Settings → Service Accounts")
         exit(1)
 
@@ -130,19 +133,18 @@ def verify_upload(db, collection_name):
     print()
     
     try:
-        # Count total documents
-        docs = db.collection(collection_name).limit(1).stream()
-        doc_count = sum(1 for _ in db.collection(collection_name).stream())
+        # Count total documents (server-side aggregation, no full collection read)
+        doc_count = db.collection(collection_name).count().get()[0][0].value
         
         print(f"   Total documents: {doc_count}")
         
-        # Sample by type
+        # Count by type
         types = ["natural", "tourism", "historic", "outdoor", "place"]
         for type_name in types:
-            count = sum(1 for _ in db.collection(collection_name)
-                       .where(filter=FieldFilter("type", "==", type_name))
-                       .limit(1000)
-                       .stream())
+            count = (db.collection(collection_name)
+                     .where(filter=FieldFilter("type", "==", type_name))
+                     .count()
+                     .get()[0][0].value)
             print(f"   {type_name:15s}: {count:4d}")
         
         print()
@@ -170,7 +172,7 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Preview without uploading")
     parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Batch size")
     parser.add_argument("--collection", default="places", help="Target collection name")
-    parser.add_argument("--cred", default="serviceAccountKey.json", help="Service account key path")
+    parser.add_argument("--cred", help="Service account key path (default: FIREBASE_SERVICE_ACCOUNT or go_iceland/firebase/serviceAccountKey.json)")
     args = parser.parse_args()
     
     print("=" * 60)
@@ -4,14 +4,15 @@ Script to upload hiking trails to Firebase Firestore
 Run with: python upload_trails.py
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
 import json
+import os
+import sys
 
-# Initialize Firebase
-cred = credentials.Certificate('../android/app/google-services.json')
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "go_iceland", "firebase"))
+from firebase_client import get_db
+
+# Initialize Firebase (service account key, not the Android google-services.json)
+db = get_db()
 
 # Trail data
 trails = [